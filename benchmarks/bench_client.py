@@ -0,0 +1,83 @@
+# benchmarks/bench_client.py
+#
+# Fetches thousands of coins from the local CoinGecko stub, once page by page
+# with bare requests.get calls (the previous behaviour of get_top_cryptos) and
+# once with the pooled, throttled, concurrent client.
+#
+#   python benchmarks/bench_client.py [--coins 5000] [--latency 0.2]
+
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.stub_coingecko import StubCoinGecko
+from src.api.client import CoinGeckoClient
+from src.api.getdata import get_top_cryptos
+
+
+def sequential_fetch(base_url, limit, per_page=250):
+    records = []
+    for page in range(1, -(-limit // per_page) + 1):
+        url = f"{base_url}/coins/markets?vs_currency=usd&order=market_cap_desc&per_page={per_page}&page={page}&sparkline=false"
+        while True:
+            response = requests.get(url)
+            if response.status_code != 429:
+                break
+            time.sleep(float(response.headers.get('Retry-After', 1)))
+        response.raise_for_status()
+        records.extend(response.json())
+    return records[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CoinGecko client against a local stub.")
+    parser.add_argument('--coins', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.2, help="server latency per request, in seconds")
+    parser.add_argument('--rate-per-minute', type=float, default=600)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    with StubCoinGecko(coins=args.coins, rate_per_minute=args.rate_per_minute, burst=10, latency=args.latency) as stub:
+        start = time.perf_counter()
+        records = sequential_fetch(stub.base_url, args.coins)
+        sequential_time = time.perf_counter() - start
+        assert [r['market_cap_rank'] for r in records] == list(range(1, args.coins + 1))
+        sequential_stats = dict(stub.stats)
+
+        for key in stub.stats:
+            stub.stats[key] = 0
+        client = CoinGeckoClient(base_url=stub.base_url, rate_per_minute=args.rate_per_minute, burst=10,
+                                 max_workers=args.workers, backoff=0.2)
+        start = time.perf_counter()
+        df = get_top_cryptos(limit=args.coins, client=client)
+        client_time = time.perf_counter() - start
+        assert df is not None and len(df) == args.coins
+        assert df['id'].tolist() == [r['id'] for r in records]
+        client_stats = dict(stub.stats)
+
+        # over-budget client: the 429 answers must be absorbed by Retry-After and backoff
+        for key in stub.stats:
+            stub.stats[key] = 0
+        greedy = CoinGeckoClient(base_url=stub.base_url, rate_per_minute=args.rate_per_minute * 4, burst=40,
+                                 max_workers=args.workers, backoff=0.2, max_retries=8)
+        start = time.perf_counter()
+        greedy_df = get_top_cryptos(limit=args.coins, client=greedy)
+        greedy_time = time.perf_counter() - start
+        assert greedy_df is not None and greedy_df['id'].tolist() == df['id'].tolist()
+        greedy_stats = dict(stub.stats)
+
+    print(f"{args.coins} coins, {args.latency * 1000:.0f} ms server latency, {args.rate_per_minute:.0f} requests/min budget")
+    print(f"sequential requests.get : {sequential_time:7.2f} s  {sequential_stats}")
+    print(f"pooled concurrent client: {client_time:7.2f} s  {client_stats}")
+    print(f"client over its budget  : {greedy_time:7.2f} s  {greedy_stats}")
+
+
+if __name__ == '__main__':
+    main()
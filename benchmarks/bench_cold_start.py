@@ -0,0 +1,178 @@
+# benchmarks/bench_cold_start.py
+#
+# Cold start of a dashboard worker, each measure in a fresh Python process:
+#   - import time: `import streamlit`, then the module-level imports of the app
+#     (and which heavy modules they load on top of streamlit: pandas, numpy, plotly, requests)
+#   - time to first render: the first script run of the app, as the first page of
+#     a new worker (AppTest, against a synthetic archive and the local CoinGecko stub)
+#   - time to complete page: until the coin selector, the chart and the Top 10 table
+#     are painted; meanwhile, the 'loading' fragment of the app is rerun every --poll
+#     seconds as the browser does (the whole app, for an app without that fragment)
+# once with no history store (first worker on a disk) and once with the store of the
+# previous run (next workers).
+#
+#   python benchmarks/bench_cold_start.py [--days 730] [--coins 1000] [--latency 0.5] [--runs 3]
+#   python benchmarks/bench_cold_start.py --app path/to/other/app.py   # e.g. an older version
+
+import argparse
+import ast
+import importlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+HEAVY_MODULES = ['pandas', 'numpy', 'plotly.graph_objects', 'requests']
+
+
+def module_imports(app_path):
+    """The module-level import statements of an app file, except streamlit's."""
+    with open(app_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    statements = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            names = [node.module or '']
+        else:
+            continue
+        if not any(name.split('.')[0] == 'streamlit' for name in names):
+            statements.append(ast.unparse(node))
+    return statements
+
+
+def measure_imports(app_path):
+    started = time.perf_counter()
+    importlib.import_module('streamlit')
+    streamlit_seconds = time.perf_counter() - started
+    app_root = os.path.abspath(os.path.join(os.path.dirname(app_path), '..'))
+    sys.path.insert(0, app_root)
+    loaded = set(sys.modules)
+    started = time.perf_counter()
+    for statement in module_imports(app_path):
+        exec(statement, {})
+    return {
+        'import_streamlit': streamlit_seconds,
+        'import_app_modules': time.perf_counter() - started,
+        'heavy_modules': [name for name in HEAVY_MODULES if name in sys.modules and name not in loaded],
+    }
+
+
+def measure_render(app_path, timeout, poll):
+    import logging
+    from streamlit.testing.v1 import AppTest
+    from benchmarks.bench_interactions import fragment_rerun
+    for name in ('streamlit.deprecation_util', 'streamlit.runtime.scriptrunner_utils.script_run_context'):
+        logging.getLogger(name).disabled = True
+
+    app = AppTest.from_file(app_path, default_timeout=timeout)
+    loaded = set(sys.modules)
+    started = time.perf_counter()
+    app.run()
+    first_render = time.perf_counter() - started
+    heavy_at_first_render = [name for name in HEAVY_MODULES if name in sys.modules and name not in loaded]
+    placeholders = [element.value for element in app.info]
+
+    def complete():
+        return (len(app.sidebar.selectbox) > 0 and len(app.get('plotly_chart')) > 0
+                and any(df.value is not None and len(df.value) > 0 for df in app.dataframe))
+
+    while not complete() and time.perf_counter() - started < timeout:
+        # the browser asks for the next rerun `poll` seconds after the previous one started
+        run_started = time.perf_counter()
+        with fragment_rerun(app, 'loading'):
+            app.run()
+        if not complete():
+            time.sleep(max(0.0, poll - (time.perf_counter() - run_started)))
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    return {
+        'first_render': first_render,
+        'complete_page': time.perf_counter() - started if complete() else None,
+        'heavy_modules_at_first_render': heavy_at_first_render,
+        'placeholders': placeholders,
+    }
+
+
+def child(args):
+    """Runs one measure in this (fresh) process and prints it as JSON."""
+    if args.child == 'imports':
+        result = measure_imports(args.app)
+    else:
+        result = measure_render(args.app, args.timeout, args.poll)
+    print(json.dumps(result))
+
+
+def run_child(mode, args, work_dir, base_url):
+    environment = dict(os.environ,
+                       COINGECKO_BASE_URL=base_url, COINGECKO_RATE_PER_MINUTE='6000', PYTHONPATH=project_root)
+    environment.pop('CRYPTODASH_PROFILE', None)
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, '--app', args.app,
+         '--timeout', str(args.timeout), '--poll', str(args.poll)],
+        cwd=work_dir, env=environment, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cold start of the dashboard.")
+    parser.add_argument('--app', default=os.path.join(project_root, 'src', 'app.py'))
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--coins', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.5, help="seconds of each answer of the API stub")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--poll', type=float, default=0.25, help="seconds between two reruns until the page is complete")
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--child', choices=['imports', 'render'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.app = os.path.abspath(args.app)
+    if args.child:
+        child(args)
+        return
+
+    from benchmarks.generate_archive import generate_archive
+    from benchmarks.stub_coingecko import StubCoinGecko
+
+    work_dir = tempfile.mkdtemp(prefix='cryptodash_cold_start_')
+    try:
+        generate_archive(os.path.join(work_dir, 'data'), days=args.days, coins=args.coins)
+        with StubCoinGecko(coins=max(args.coins, 100), latency=args.latency) as stub:
+            imports = [run_child('imports', args, work_dir, stub.base_url) for _ in range(args.runs)]
+            renders = {}
+            for label, fresh_store in (('no store', True), ('existing store', False)):
+                renders[label] = []
+                for _ in range(args.runs):
+                    if fresh_store:
+                        shutil.rmtree(os.path.join(work_dir, 'data', 'store'), ignore_errors=True)
+                    renders[label].append(run_child('render', args, work_dir, stub.base_url))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    def median(results, key):
+        values = [result[key] for result in results if result[key] is not None]
+        return f"{statistics.median(values) * 1000:8.0f} ms" if values else f"{'n/a':>11}"
+
+    print(f"{args.app}: {args.coins:,} coins × {args.days:,} days, API latency {args.latency:.1f} s, "
+          f"median of {args.runs} cold processes")
+    print(f"{'import streamlit':34} {median(imports, 'import_streamlit')}")
+    print(f"{'import the app modules':34} {median(imports, 'import_app_modules')}"
+          f"   loads: {', '.join(imports[0]['heavy_modules']) or 'none of ' + ', '.join(HEAVY_MODULES)}")
+    for label, results in renders.items():
+        print(f"{f'first render ({label})':34} {median(results, 'first_render')}"
+              f"   loaded: {', '.join(results[0]['heavy_modules_at_first_render']) or 'none'}")
+        print(f"{f'complete page ({label})':34} {median(results, 'complete_page')}")
+    print(f"placeholders of the first render: {renders['no store'][0]['placeholders']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_currency.py
+#
+# Cost of a change of display currency, against the local stub with a slow upstream:
+#   - upstream: one /coins/markets call per currency (what a vs_currency per view costs)
+#   - local: the tables of the USD snapshot converted with one /exchange_rates table
+#     (MarketView per currency), and the price chart of one coin converted from the USD
+#     history (the chart of the same coin in USD is the baseline)
+# and the API calls per poll of both approaches for every display currency.
+#
+#   python benchmarks/bench_currency.py [--latency 0.5] [--coins 100] [--repeat 5]
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.stub_coingecko import StubCoinGecko
+from src.api.client import CoinGeckoClient
+from src.api.getdata import get_exchange_rates, get_top_cryptos
+from src.utils.coin_index import CoinIndex
+from src.utils.data_processing import MarketView
+from src.visualizations.plots import plot_price_evolution_with_moving_averages
+
+
+def timed(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a change of display currency.")
+    parser.add_argument('--latency', type=float, default=0.5, help="upstream latency in seconds")
+    parser.add_argument('--coins', type=int, default=100)
+    parser.add_argument('--currency', default='eur')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with StubCoinGecko(coins=args.coins, latency=args.latency, rate_per_minute=60000, burst=1000) as stub:
+        client = CoinGeckoClient(base_url=stub.base_url, rate_per_minute=60000, burst=1000)
+        upstream, _ = timed(lambda: get_top_cryptos(vs_currency=args.currency, limit=args.coins, client=client), args.repeat)
+        snapshot = get_top_cryptos(limit=args.coins, client=client)
+        rates = get_exchange_rates(client=client)
+
+    view, _ = timed(lambda: MarketView(snapshot, version=1), args.repeat)
+    converted, eur_view = timed(lambda: MarketView(snapshot, version=1, currency=args.currency, rates=rates), args.repeat)
+    coin_id = snapshot['id'].iloc[0]
+    expected = snapshot['current_price'].iloc[0] * rates.factor(args.currency)
+    assert eur_view.details.loc[coin_id, "Current Price"] == f"{rates.unit(args.currency)} {expected:,.4f}"
+
+    # the price chart of one coin over 5 years, every indicator
+    dates = pd.date_range('2021-01-01', periods=1825, freq='D')
+    df = pd.DataFrame({
+        'id': 'bitcoin', 'name': 'Bitcoin', 'date': dates,
+        'current_price': 30000 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.02, len(dates)))),
+    })
+    index = CoinIndex(df, version=1)
+    indicators = ('ma', 'ema', 'bollinger', 'rsi', 'volatility')
+    chart_usd, _ = timed(lambda: plot_price_evolution_with_moving_averages(
+        df, 'bitcoin', 'All', index=index, indicators=indicators), args.repeat)
+    chart_converted, _ = timed(lambda: plot_price_evolution_with_moving_averages(
+        df, 'bitcoin', 'All', index=index, indicators=indicators, currency=args.currency, rates=rates), args.repeat)
+
+    print(f"{args.coins} coins, upstream latency {args.latency * 1000:.0f} ms, {args.currency.upper()} "
+          f"(1 USD = {rates.factor(args.currency):.4f} {rates.unit(args.currency)})")
+    print(f"{'upstream call in ' + args.currency.upper():34} {upstream * 1000:9.2f} ms")
+    print(f"{'MarketView in USD':34} {view * 1000:9.2f} ms")
+    print(f"{'MarketView converted':34} {converted * 1000:9.2f} ms")
+    print(f"{'price chart in USD':34} {chart_usd * 1000:9.2f} ms")
+    print(f"{'price chart converted':34} {chart_converted * 1000:9.2f} ms")
+    currencies = len(rates.currencies)
+    print(f"API calls per poll for {currencies} currencies: {currencies} with a vs_currency each, 2 with the exchange rates")
+
+
+if __name__ == '__main__':
+    main()
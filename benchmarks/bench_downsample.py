@@ -0,0 +1,105 @@
+# benchmarks/bench_downsample.py
+#
+# Draws the price chart of a long synthetic series (multi-year hourly history)
+# without and with downsampling, and checks the error of the downsampled series
+# against the original:
+#   - peak error: the highest and lowest prices must be kept exactly (min/max)
+#   - envelope error: per pixel column of the chart, the distance between the
+#     min/max of the original and the downsampled lines, as a fraction of the
+#     price range (0 means both lines cover the same pixels)
+# It exits with status 1 if an error exceeds its bound.
+#
+#   python benchmarks/bench_downsample.py [--points 43800 200000] [--width 1000]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.utils.coin_index import CoinIndex
+from src.visualizations.downsample import downsample_indices, points_for_width
+from src.visualizations.plots import plot_price_evolution_with_moving_averages
+
+# Bounds checked for the default method (min/max)
+MAX_PEAK_ERROR = 0.0
+MAX_ENVELOPE_ERROR = 0.01  # 1% of the price range, about the height of one pixel row
+
+
+def synthetic_history(points, seed=0):
+    """A random walk with a few isolated spikes, one point per hour."""
+    rng = np.random.default_rng(seed)
+    prices = 30000 * np.exp(np.cumsum(rng.normal(0, 0.005, points)))
+    spikes = rng.choice(points, size=10, replace=False)
+    prices[spikes] *= rng.choice([0.7, 1.4], size=10)
+    dates = pd.date_range('2020-01-01', periods=points, freq='h')
+    return pd.DataFrame({'id': 'bitcoin', 'name': 'Bitcoin', 'date': dates, 'current_price': prices})
+
+
+def _drawn_range(x, y, edges):
+    """Min and max of the polyline (x, y) within each pixel column [edges[i], edges[i + 1]]."""
+    column = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, len(edges) - 2)
+    # the line enters and leaves every column at the interpolated values of its edges
+    at_edges = np.interp(edges, x, y)
+    low = np.minimum(at_edges[:-1], at_edges[1:])
+    high = np.maximum(at_edges[:-1], at_edges[1:])
+    np.minimum.at(low, column, y)
+    np.maximum.at(high, column, y)
+    return low, high
+
+
+def envelope_error(x, y, kept, width):
+    """Largest distance between the drawn min/max of the original and downsampled lines per pixel column."""
+    edges = np.linspace(x[0], x[-1], width + 1)
+    low, high = _drawn_range(x, y, edges)
+    kept_low, kept_high = _drawn_range(x[kept], y[kept], edges)
+    error = np.maximum(np.abs(low - kept_low), np.abs(high - kept_high)).max()
+    return float(error / (y.max() - y.min()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the downsampling of long chart ranges.")
+    parser.add_argument('--points', type=int, nargs='+', default=[43800, 200000], help="series lengths")
+    parser.add_argument('--width', type=int, default=1000, help="chart width in pixels")
+    args = parser.parse_args()
+
+    failed = False
+    for points in args.points:
+        df = synthetic_history(points)
+        index = CoinIndex(df)  # hourly points, the chart treats them like days
+        x = df['date'].to_numpy().astype(np.int64).astype(np.float64)
+        y = df['current_price'].to_numpy()
+
+        started = time.perf_counter()
+        full = plot_price_evolution_with_moving_averages(df, 'bitcoin', 'All', index=index, max_points=points)
+        full_time = time.perf_counter() - started
+        full_size = len(full.to_json())
+        print(f"{points:,} points: full chart {full_size / 1e6:6.2f} MB, built in {full_time:.2f} s "
+              f"({type(full.data[0]).__name__})")
+
+        for method in ('minmax', 'lttb'):
+            started = time.perf_counter()
+            kept = downsample_indices(df['date'].to_numpy(), y, points_for_width(args.width), method=method)
+            sample_time = time.perf_counter() - started
+            fig = plot_price_evolution_with_moving_averages(df, 'bitcoin', 'All', index=index, downsampling=method,
+                                                            max_points=points_for_width(args.width))
+            size = len(fig.to_json())
+            peak = max(abs(y.max() - y[kept].max()), abs(y.min() - y[kept].min())) / (y.max() - y.min())
+            envelope = envelope_error(x, y, kept, args.width)
+            over = method == 'minmax' and (peak > MAX_PEAK_ERROR or envelope > MAX_ENVELOPE_ERROR)
+            failed |= over
+            print(f"  {method:6s}: {len(kept):5,} points in {sample_time * 1000:6.1f} ms, chart {size / 1e6:5.2f} MB "
+                  f"(x{full_size / size:5.1f} smaller, {type(fig.data[0]).__name__}), "
+                  f"peak error {peak:.2%}, envelope error {envelope:.2%}{'  OVER BOUND' if over else ''}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
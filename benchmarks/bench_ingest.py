@@ -0,0 +1,86 @@
+# benchmarks/bench_ingest.py
+#
+# Compares the per-record ingest loop that load_historical_data used to run
+# with the batched ingest pipeline, on the bundled data/ directory.
+#
+#   python benchmarks/bench_ingest.py [--data-dir data] [--repeat 3]
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.visualizations.plots import load_historical_data
+
+
+def legacy_load_historical_data(data_dir='data'):
+    """The previous implementation: one scalar pd.to_datetime call per record."""
+    all_data = []
+    for filename in sorted(os.listdir(data_dir)):
+        if filename.startswith('crypto_data_') and filename.endswith('.json'):
+            file_path = os.path.join(data_dir, filename)
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    if not data:
+                        continue
+                    for record in data:
+                        try:
+                            record['date_processed'] = pd.to_datetime(record.get('collect_timestamp')).normalize()
+                        except ValueError:
+                            record['date_processed'] = pd.to_datetime(filename.replace('crypto_data_', '').replace('.json', ''), errors='coerce').normalize()
+                    all_data.extend(data)
+            except (json.JSONDecodeError, IOError):
+                continue
+    if not all_data:
+        return pd.DataFrame()
+    df = pd.DataFrame(all_data)
+    df['date'] = pd.to_datetime(df['date_processed'], errors='coerce')
+    df['current_price'] = pd.to_numeric(df['current_price'], errors='coerce')
+    df = df.dropna(subset=['current_price', 'date'])
+    return df.sort_values(by=['date', 'name'])
+
+
+def best_of(function, repeat, *args):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the legacy and batched history ingest.")
+    parser.add_argument('--data-dir', default=os.path.join(project_root, 'data'))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    legacy_time, legacy_df = best_of(legacy_load_historical_data, args.repeat, args.data_dir)
+    batched_time, batched_df = best_of(load_historical_data, args.repeat, args.data_dir)
+
+    # both paths must produce the same daily prices
+    key = ['id', 'date']
+    legacy_prices = legacy_df.groupby(key)['current_price'].mean()
+    batched_prices = batched_df.groupby(key)['current_price'].mean()
+    pd.testing.assert_series_equal(legacy_prices, batched_prices)
+
+    files = len([f for f in os.listdir(args.data_dir) if f.startswith('crypto_data_')])
+    print(f"files: {files}, records: {len(batched_df)}")
+    print(f"legacy per-record ingest : {legacy_time:8.3f} s ({len(legacy_df) / legacy_time:10.0f} records/s)")
+    print(f"batched ingest           : {batched_time:8.3f} s ({len(batched_df) / batched_time:10.0f} records/s)")
+    print(f"speedup                  : {legacy_time / batched_time:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
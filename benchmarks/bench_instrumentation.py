@@ -0,0 +1,90 @@
+# benchmarks/bench_instrumentation.py
+#
+# Overhead of the instrumentation layer (src/utils/instrumentation.py) per span:
+#   - disabled: what every instrumented stage pays in production
+#   - enabled: timing spans (CRYPTODASH_PROFILE=1)
+#   - memory: timing spans and tracemalloc sampling (CRYPTODASH_PROFILE=memory)
+# measured on an empty function, then on a real stage (the price chart of one coin)
+# to compare the overhead with the work it measures.
+#
+#   python benchmarks/bench_instrumentation.py [--calls 200000]
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+os.environ.pop('CRYPTODASH_PROFILE', None)  # the registry of each mode is configured below
+
+from src.utils.instrumentation import Instrumentation, get_registry
+
+
+def per_call(function, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - started) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the overhead of the instrumentation spans.")
+    parser.add_argument('--calls', type=int, default=200000)
+    args = parser.parse_args()
+
+    def work():
+        return None
+
+    baseline = per_call(work, args.calls)
+    print(f"{'mode':10} {'decorator':>14} {'span':>14}   (over a bare call of {baseline * 1e9:.0f} ns)")
+    overheads = {}
+    for mode in ('disabled', 'enabled', 'memory'):
+        registry = Instrumentation()
+        if mode != 'disabled':
+            registry.enable(memory=mode == 'memory')
+        decorated = registry.instrumented('work')(work)
+
+        def with_span():
+            with registry.span('work'):
+                return work()
+
+        calls = args.calls if mode == 'disabled' else args.calls // 10
+        decorator_overhead = per_call(decorated, calls) - baseline
+        span_overhead = per_call(with_span, calls) - baseline
+        registry.disable()
+        overheads[mode] = span_overhead
+        print(f"{mode:10} {decorator_overhead * 1e9:11.0f} ns {span_overhead * 1e9:11.0f} ns")
+
+    # a real stage: the price chart of one coin with every indicator, from a synthetic index
+    import numpy as np
+    import pandas as pd
+    from src.utils.coin_index import CoinIndex
+    from src.visualizations.plots import plot_price_evolution_with_moving_averages
+    dates = pd.date_range('2021-01-01', periods=1825, freq='D')
+    df = pd.DataFrame({
+        'id': 'bitcoin', 'name': 'Bitcoin', 'date': dates,
+        'current_price': 30000 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.02, len(dates)))),
+    })
+    index = CoinIndex(df, version=1)
+
+    def chart():
+        plot_price_evolution_with_moving_averages(df, 'bitcoin', 'All', index=index,
+                                                  indicators=('ma', 'ema', 'bollinger', 'rsi', 'volatility'))
+
+    registry = get_registry()
+    registry.enable()
+    chart()
+    spans = sum(stats['count'] for stats in registry.stats().values())
+    registry.disable()
+    registry.reset()
+    duration = min(per_call(chart, 20) for _ in range(3))
+    print(f"price chart (5 years, every indicator): {duration * 1000:.2f} ms, {spans} spans")
+    for mode, overhead in overheads.items():
+        print(f"  {mode:10} {spans * overhead * 1e6:8.2f} us of spans ({spans * overhead / duration:.4%} of the chart)")
+
+
+if __name__ == '__main__':
+    main()
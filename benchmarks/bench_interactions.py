@@ -0,0 +1,151 @@
+# benchmarks/bench_interactions.py
+#
+# Server time of each dashboard interaction, measured through Streamlit's AppTest
+# against a synthetic archive and the local CoinGecko stub.
+#
+# Each interaction is timed twice:
+#   - full rerun: the whole script runs again (every interaction before the panels
+#     were fragments, and still the coin selectbox, which every panel depends on)
+#   - fragment rerun: only the fragment holding the widget runs, as the browser
+#     requests it when the widget lives in an st.fragment
+#
+#   python benchmarks/bench_interactions.py [--days 730] [--coins 300] [--repeat 5]
+#   python benchmarks/bench_interactions.py --app path/to/other/app.py   # e.g. an older version
+
+import argparse
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import partial
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.generate_archive import generate_archive
+from benchmarks.stub_coingecko import StubCoinGecko
+
+# (label, widget type, widget label, value, key of the fragment holding the widget)
+INTERACTIONS = [
+    ('period 7d', 'radio', "Show history for:", '7d', 'chart'),
+    ('period All', 'radio', "Show history for:", 'All', 'chart'),
+    ('candlestick', 'radio', "Chart type:", 'Candlestick', 'chart'),
+    ('line', 'radio', "Chart type:", 'Line', 'chart'),
+    ('indicators', 'multiselect', "Indicators:", ['ma', 'ema', 'rsi'], 'chart'),
+    ('refresh button', 'button', "Refresh data", None, 'header'),
+    ('coin', 'selectbox', "Select a cryptocurrency:", 'Ethereum', None),
+]
+
+
+@contextmanager
+def fragment_rerun(app, fragment_key):
+    """Makes the next app.run() a rerun of the fragment registered under fragment_key only."""
+    from streamlit.errors import StreamlitAPIException
+    from streamlit.testing.v1 import local_script_runner
+    try:
+        fragment_ids = app._fragment_storage.resolve_target(fragment_key) if fragment_key else []
+    except StreamlitAPIException:  # the app has no such fragment
+        fragment_ids = []
+    if not fragment_ids:
+        yield False
+        return
+    rerun_data = local_script_runner.RerunData
+    local_script_runner.RerunData = partial(rerun_data, fragment_id=fragment_ids[0])
+    try:
+        yield True
+    finally:
+        local_script_runner.RerunData = rerun_data
+
+
+def find_widget(app, widget_type, label):
+    for widget in getattr(app, widget_type):
+        if widget.label == label:
+            return widget
+    return None
+
+
+def interact(app, widget_type, label, value):
+    widget = find_widget(app, widget_type, label)
+    if widget is None:
+        return False
+    if widget_type == 'button':
+        widget.click()
+    else:
+        widget.set_value(value)
+    return True
+
+
+def time_interaction(app, interaction, scoped, repeat):
+    """Median server time of one interaction (the app is reset by a full run before each one)."""
+    label, widget_type, widget_label, value, fragment_key = interaction
+    timings = []
+    for _ in range(repeat):
+        app.run()
+        if not interact(app, widget_type, widget_label, value):
+            return None
+        with fragment_rerun(app, fragment_key if scoped else None) as is_fragment:
+            if scoped and not is_fragment:
+                return None
+            started = time.perf_counter()
+            app.run()
+            timings.append(time.perf_counter() - started)
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the server time of the dashboard interactions.")
+    parser.add_argument('--app', default=os.path.join(project_root, 'src', 'app.py'))
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--coins', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    from streamlit.testing.v1 import AppTest
+    import src.api.client as client_module
+    from src.api.client import CoinGeckoClient
+    from src.resources import get_history_task, get_market_poller
+    for name in ('streamlit.deprecation_util', 'streamlit.runtime.scriptrunner_utils.script_run_context'):
+        logging.getLogger(name).disabled = True
+
+    app_path = os.path.abspath(args.app)
+    work_dir = tempfile.mkdtemp(prefix='cryptodash_interactions_')
+    cwd = os.getcwd()
+    try:
+        generate_archive(os.path.join(work_dir, 'data'), days=args.days, coins=args.coins)
+        os.chdir(work_dir)  # the app reads 'data/' relative to the working directory
+        with StubCoinGecko(coins=args.coins, rate_per_minute=6000, burst=100) as stub:
+            client_module._default_client = CoinGeckoClient(base_url=stub.base_url, rate_per_minute=6000, burst=100)
+            app = AppTest.from_file(app_path, default_timeout=600)
+            app.run()  # cold run: paints the placeholders and starts the loads in the background
+            # the history (index and indicators) and the first market snapshot, as the loading watcher waits for them
+            get_history_task().start().result()
+            market_poller = get_market_poller()
+            deadline = time.monotonic() + 30
+            while market_poller.snapshot() is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+            app.run()
+            if app.exception:
+                raise RuntimeError(app.exception[0].message)
+
+            print(f"{'interaction':16} {'full rerun':>12} {'fragment rerun':>15}")
+            for interaction in INTERACTIONS:
+                full = time_interaction(app, interaction, scoped=False, repeat=args.repeat)
+                scoped = time_interaction(app, interaction, scoped=True, repeat=args.repeat)
+                if full is None:
+                    sys.exit(f"{interaction[0]}: no {interaction[1]} labelled {interaction[2]!r} in the app")
+                scoped_text = f"{scoped * 1000:12.1f} ms" if scoped is not None else f"{'(full rerun)':>15}"
+                print(f"{interaction[0]:16} {full * 1000:9.1f} ms {scoped_text}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+# benchmarks/bench_market_matrix.py
+#
+# Market-wide analytics of a synthetic archive computed two ways:
+#   - pivots: the long historical frame pivoted to date × coin at every query,
+#     then pandas returns / corr / rolling corr / shares
+#   - MarketMatrix: the dense date × coin matrices built once per history version
+#     (and extended with the new day), then array operations on them
+# and checks that both give the same numbers.
+#
+#   python benchmarks/bench_market_matrix.py [--days 730] [--coins 1000] [--repeat 5]
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.generate_archive import generate_archive
+from src.utils.coin_index import CoinIndex
+from src.utils.history_loader import IncrementalHistoryLoader
+from src.utils.market_matrix import MarketMatrix
+
+
+def timed(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def pivot(df, column):
+    daily = df.groupby(['date', 'id'], observed=True)[column].mean().unstack('id')
+    return daily.reindex(pd.date_range(daily.index.min(), daily.index.max(), freq='D'))
+
+
+def largest_by_pivot(df, top):
+    caps = pivot(df, 'market_cap')
+    latest = caps.iloc[-7:].ffill().iloc[-1].dropna()
+    return latest.sort_values(ascending=False, kind='stable').index[:top].tolist()
+
+
+def correlations_by_pivot(df, top, days):
+    prices = pivot(df, 'current_price')[largest_by_pivot(df, top)].iloc[-days:]
+    return np.log(prices / prices.shift(1)).iloc[1:].corr(min_periods=20)
+
+
+def rolling_by_pivot(df, coin_ids, reference, window):
+    prices = pivot(df, 'current_price')
+    returns = np.log(prices / prices.shift(1)).iloc[1:]
+    return returns[coin_ids].rolling(window, min_periods=20).corr(returns[reference])
+
+
+def dominance_by_pivot(df, top):
+    caps = pivot(df, 'market_cap')
+    largest = largest_by_pivot(df, top)
+    shares = caps[largest].fillna(0).div(caps.sum(axis=1), axis=0) * 100
+    shares['Others'] = 100 - shares.sum(axis=1)
+    return shares
+
+
+def ranking_by_pivot(df, days):
+    prices = pivot(df, 'current_price').iloc[-days:]
+    start, end = prices.bfill().iloc[0], prices.ffill().iloc[-1]
+    returns = ((end / start - 1) * 100)[prices.notna().sum() >= 2]
+    return returns.sort_values(ascending=False, kind='stable')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the market-wide analytics.")
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--coins', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='cryptodash_matrix_')
+    try:
+        generate_archive(work_dir, days=args.days, coins=args.coins)
+        df = IncrementalHistoryLoader(data_dir=work_dir).refresh()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    last_day = df['date'].max()
+    previous_index = CoinIndex(df[df['date'] < last_day], version=1)
+    index = CoinIndex(df, version=2)
+    print(f"{args.coins:,} coins × {args.days:,} days ({len(df):,} rows)")
+
+    build, _ = timed(lambda: MarketMatrix().sync(index), args.repeat)
+    market_matrix = MarketMatrix()
+    market_matrix.sync(previous_index)
+
+    def extend():
+        market_matrix.sync(previous_index)  # back to the day before (a rebuild, not timed)
+        started = time.perf_counter()
+        mode = market_matrix.sync(index)
+        return time.perf_counter() - started, mode
+
+    extends = [extend() for _ in range(args.repeat)]
+    assert all(mode == 'extended' for _, mode in extends)
+    print(f"{'matrices built':30} {build * 1000:9.1f} ms")
+    print(f"{'extended with the new day':30} {statistics.median(t for t, _ in extends) * 1000:9.1f} ms")
+
+    rebuilt = MarketMatrix()
+    rebuilt.sync(index)
+    for name in ('price', 'market_cap', 'volume'):
+        assert np.array_equal(market_matrix.matrix(name), rebuilt.matrix(name), equal_nan=True), name
+    assert market_matrix.ids == rebuilt.ids
+
+    largest = market_matrix.largest(10)
+    reference, others = largest[0], largest[1:6]
+    print(f"{'per query':30} {'pivots':>12} {'MarketMatrix':>12}")
+    cases = [
+        ('correlations (top 30, 1y)',
+         lambda: correlations_by_pivot(df, 30, 366),
+         lambda: market_matrix.correlations(market_matrix.largest(30), days=366)),
+        ('rolling correlations (30d)',
+         lambda: rolling_by_pivot(df, others, reference, 30),
+         lambda: market_matrix.rolling_correlations(others, reference, window=30)),
+        ('dominance (top 10, all)',
+         lambda: dominance_by_pivot(df, 10),
+         lambda: market_matrix.dominance(top=10)),
+        ('return ranking (30d)',
+         lambda: ranking_by_pivot(df, 30),
+         lambda: market_matrix.return_ranking(days=30)),
+    ]
+    results = {}
+    for label, old_query, new_query in cases:
+        old, old_result = timed(old_query, args.repeat)
+        new, new_result = timed(new_query, args.repeat)
+        results[label] = old_result, new_result
+        print(f"{label:30} {old * 1000:9.1f} ms {new * 1000:9.1f} ms")
+
+    old, new = results['correlations (top 30, 1y)']
+    assert list(old.index) == list(new.index)
+    assert np.allclose(old.to_numpy(), new.to_numpy(), equal_nan=True, atol=1e-9)
+    old, new = results['rolling correlations (30d)']
+    assert np.allclose(old.to_numpy(), new.to_numpy(), equal_nan=True, atol=1e-6)
+    old, new = results['dominance (top 10, all)']
+    assert list(old.columns) == list(new.columns)
+    assert np.allclose(old.to_numpy(), new.to_numpy(), equal_nan=True)
+    old, new = results['return ranking (30d)']
+    assert np.allclose(old.to_numpy(), new['return'].to_numpy())
+    print("pivots and matrices give the same numbers")
+
+
+if __name__ == '__main__':
+    main()
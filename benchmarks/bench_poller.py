@@ -0,0 +1,74 @@
+# benchmarks/bench_poller.py
+#
+# Compares the latency of reading the market data inline (one API call per
+# cache expiry, as the 60 s TTL cache did) with reading the snapshot published
+# by the background poller, against the local stub with a slow upstream.
+#
+#   python benchmarks/bench_poller.py [--latency 0.5] [--reads 200] [--coins 100]
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.stub_coingecko import StubCoinGecko
+from src.api.client import CoinGeckoClient
+from src.api.getdata import get_top_cryptos
+from src.api.poller import MarketPoller
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.99) - 1], timings[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the background market poller.")
+    parser.add_argument('--latency', type=float, default=0.5, help="upstream latency in seconds")
+    parser.add_argument('--reads', type=int, default=200, help="page reads, one every --read-interval")
+    parser.add_argument('--read-interval', type=float, default=0.01)
+    parser.add_argument('--coins', type=int, default=100)
+    args = parser.parse_args()
+
+    with StubCoinGecko(coins=args.coins, latency=args.latency, rate_per_minute=60000, burst=1000) as stub:
+        client = CoinGeckoClient(base_url=stub.base_url, rate_per_minute=60000, burst=1000)
+        # the TTL is scaled down so that the benchmark sees several expiries
+        ttl = args.reads * args.read_interval / 4
+        inline, cached, expires = [], None, 0.0
+        for _ in range(args.reads):
+            started = time.perf_counter()
+            if cached is None or time.monotonic() >= expires:
+                cached = get_top_cryptos(limit=args.coins, client=client)
+                expires = time.monotonic() + ttl
+            inline.append(time.perf_counter() - started)
+            time.sleep(args.read_interval)
+
+        poller = MarketPoller(interval=ttl, limit=args.coins,
+                              fetch=lambda: get_top_cryptos(limit=args.coins, client=client)).start()
+        while poller.snapshot() is None:
+            time.sleep(0.01)
+        polled, versions = [], set()
+        for i in range(args.reads):
+            if i == args.reads // 2:
+                poller.request_refresh()  # the Refresh button
+            started = time.perf_counter()
+            snapshot = poller.snapshot()
+            polled.append(time.perf_counter() - started)
+            versions.add(snapshot.version)
+            time.sleep(args.read_interval)
+        poller.stop()
+
+    for label, timings in (('inline fetch + TTL', inline), ('poller snapshot', polled)):
+        p50, p99, worst = percentiles(timings)
+        print(f"{label:20}: p50 {p50 * 1000:8.3f} ms, p99 {p99 * 1000:8.3f} ms, max {worst * 1000:8.3f} ms")
+    print(f"poller published {len(versions)} snapshot versions during the reads "
+          f"(upstream latency {args.latency * 1000:.0f} ms, mean read {statistics.mean(polled) * 1e6:.1f} us)")
+
+
+if __name__ == '__main__':
+    main()
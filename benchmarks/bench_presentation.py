@@ -0,0 +1,123 @@
+# benchmarks/bench_presentation.py
+#
+# Builds the display tables of a 10,000-coin market snapshot two ways:
+#   - per cell: the formatting the app used before src/utils/data_processing.py
+#     (one format_dataframe_value call per cell, apply(axis=1) for the names,
+#     a filter of the snapshot per selected coin), repeated at every render
+#   - MarketView: every table formatted in bulk once per snapshot version,
+#     then each render only looks rows up
+# and checks that both produce the same strings.
+#
+#   python benchmarks/bench_presentation.py [--rows 10000] [--repeat 5]
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.stub_coingecko import make_coins
+from src.api.getdata import MARKET_COLUMNS
+from src.utils.data_processing import MarketView
+
+
+# --- the per-cell formatting of the app before the presentation layer ---
+def format_metric_value(value, prefix="", suffix="", decimals=2):
+    if pd.isna(value):
+        return "N/A"
+    if isinstance(value, (int, float)):
+        if suffix == "%":
+            color = "green" if value >= 0 else "red"
+            return f"<span style='color:{color}'>{prefix}{value:,.{decimals}f}{suffix}</span>"
+        return f"{prefix}{value:,.{decimals}f}{suffix}"
+    return str(value)
+
+
+def format_dataframe_value(value, prefix="", suffix="", decimals=2):
+    if pd.isna(value):
+        return "N/A"
+    if isinstance(value, (int, float)):
+        return f"{prefix}{value:,.{decimals}f}{suffix}"
+    return str(value)
+
+
+def ranking_per_cell(realtime_df, limit):
+    display_df = realtime_df.head(limit).copy()
+    display_df['Crypto'] = display_df.apply(
+        lambda row: f"{row.get('name', 'N/A')} ({row.get('symbol', 'N/A').upper()})", axis=1)
+    display_df['Current Price'] = display_df['current_price'].apply(lambda x: format_dataframe_value(x, prefix="$ ", decimals=2))
+    display_df['24h Change (%)'] = display_df['price_change_percentage_24h']
+    display_df['Market Cap'] = display_df['market_cap'].apply(lambda x: format_dataframe_value(x, prefix="$ ", decimals=0))
+    display_df['Image URL'] = display_df['image'].apply(lambda x: x if isinstance(x, str) else "https://www.coingecko.com/favicon.ico")
+    final_df = display_df[['Image URL', 'Crypto', 'Current Price', '24h Change (%)', 'Market Cap']]
+    final_df.columns = ['Image', 'Crypto', 'Current Price', '24h Change (%)', 'Market Cap']
+    return final_df
+
+
+def coin_per_cell(realtime_df, coin_id):
+    info = realtime_df[realtime_df['id'] == coin_id].iloc[0]
+    cards = [
+        format_metric_value(info.get('current_price'), prefix="$ ", decimals=4),
+        format_metric_value(info.get('price_change_percentage_24h'), suffix='%', decimals=2),
+        format_metric_value(info.get('total_volume'), prefix="$ ", decimals=0),
+        format_metric_value(info.get('market_cap'), prefix="$ ", decimals=0),
+    ]
+    details = [
+        format_dataframe_value(info.get('current_price'), prefix="$ ", decimals=4),
+        format_dataframe_value(info.get('price_change_percentage_24h'), suffix="%", decimals=2),
+        format_dataframe_value(info.get('market_cap'), prefix="$ ", decimals=0),
+        format_dataframe_value(info.get('total_volume'), prefix="$ ", decimals=0),
+        format_dataframe_value(info.get('low_24h'), prefix="$ ", decimals=4),
+        format_dataframe_value(info.get('high_24h'), prefix="$ ", decimals=4),
+    ]
+    return cards, details
+
+
+def timed(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the presentation layer.")
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    realtime_df = pd.DataFrame(make_coins(args.rows)).reindex(columns=MARKET_COLUMNS)
+    realtime_df.loc[realtime_df.index[::97], ['current_price', 'market_cap', 'image']] = np.nan  # missing values
+    coin_ids = realtime_df['id'].sample(20, random_state=0).tolist()
+
+    build, view = timed(lambda: MarketView(realtime_df, version=1), args.repeat)
+    print(f"{args.rows:,} coins; MarketView built once per snapshot in {build * 1000:.1f} ms")
+    print(f"{'per render':28} {'per cell':>12} {'MarketView':>12}")
+    for limit in (10, 100, args.rows):
+        old, old_table = timed(lambda: ranking_per_cell(realtime_df, limit), args.repeat)
+        new, new_table = timed(lambda: view.ranking_table(limit), args.repeat)
+        assert old_table.reset_index(drop=True).equals(new_table.reset_index(drop=True)), "ranking tables differ"
+        print(f"{f'ranking table ({limit:,} rows)':28} {old * 1000:9.2f} ms {new * 1000:9.2f} ms")
+
+    old, _ = timed(lambda: [coin_per_cell(realtime_df, coin_id) for coin_id in coin_ids], args.repeat)
+    new, _ = timed(lambda: [(view.metric_cards(coin_id), view.details_table(coin_id)) for coin_id in coin_ids], args.repeat)
+    print(f"{'cards + details (per coin)':28} {old / len(coin_ids) * 1000:9.2f} ms {new / len(coin_ids) * 1000:9.2f} ms")
+    for coin_id in coin_ids:
+        cards, details = coin_per_cell(realtime_df, coin_id)
+        new_cards = view.metric_cards(coin_id)
+        assert cards == [new_cards['price'], new_cards['change'], new_cards['volume'], new_cards['market_cap']], coin_id
+        assert details == view.details_table(coin_id)['Value'].tolist(), coin_id
+    print("per-cell and bulk formatting produce the same strings")
+
+
+if __name__ == '__main__':
+    main()
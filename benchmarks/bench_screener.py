@@ -0,0 +1,95 @@
+# benchmarks/bench_screener.py
+#
+# Screener queries over the whole coin universe of a market snapshot, two ways:
+#   - pandas: boolean filters, str.startswith on the names/symbols and sort_values
+#     on the snapshot frame at every query
+#   - Screener: sort orders and prefix index built once per snapshot, then only
+#     masks and binary searches per query
+# and checks that both return the same coins in the same order.
+#
+#   python benchmarks/bench_screener.py [--coins 1000,5000,10000] [--repeat 20]
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.stub_coingecko import make_coins
+from src.utils.screener import MARKET_CAP_BANDS, Screener
+
+QUERIES = {
+    'default (market cap)': dict(),
+    'search "coin 1"': dict(search='coin 1'),
+    'band + 24h change': dict(market_cap_bands=['Small ($100M - $1B)', 'Micro (< $100M)'], change_range=(0, None),
+                              sort_by='price_change_percentage_24h'),
+    'volume + MA distance': dict(min_volume=1e7, ma_distance_range=(None, -5), sort_by='ma_30_distance',
+                                 descending=False),
+}
+
+
+def pandas_query(df, search="", market_cap_bands=(), change_range=(None, None), min_volume=None,
+                 ma_distance_range=(None, None), sort_by='market_cap', descending=True, limit=100):
+    mask = pd.Series(True, index=df.index)
+    prefix = search.strip().lower()
+    if prefix:
+        names = df['name'].str.lower()
+        mask &= (names.str.startswith(prefix) | df['symbol'].str.lower().str.startswith(prefix)
+                 | names.str.split().map(lambda words: any(word.startswith(prefix) for word in words[1:])))
+    if market_cap_bands:
+        mask &= np.logical_or.reduce([df['market_cap'].between(*MARKET_CAP_BANDS[band], inclusive='left')
+                                      for band in market_cap_bands])
+    for column, (low, high) in (('price_change_percentage_24h', change_range), ('total_volume', (min_volume, None)),
+                                ('ma_30_distance', ma_distance_range)):
+        if low is not None:
+            mask &= df[column] >= low
+        if high is not None:
+            mask &= df[column] <= high
+    matches = df[mask].sort_values(sort_by, ascending=not descending, kind='stable', na_position='last')
+    return matches.head(limit), len(matches)
+
+
+def timed(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the indexed screener against pandas filters.")
+    parser.add_argument('--coins', default='1000,5000,10000')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'coins':>7}  {'query':24} {'pandas':>10} {'screener':>10}  speedup")
+    for coins in [int(value) for value in args.coins.split(',')]:
+        df = pd.DataFrame(make_coins(coins))
+        ma_30 = pd.Series(df['current_price'].to_numpy() * np.random.default_rng(0).uniform(0.8, 1.2, coins),
+                          index=df['id'])
+        build = timed(lambda: Screener(df, ma_30=ma_30), 3)
+        screener = Screener(df, ma_30=ma_30)
+        frame = df.assign(symbol=df['symbol'].str.upper(),
+                          ma_30_distance=(df['current_price'] / ma_30.to_numpy() - 1) * 100)
+        for label, query in QUERIES.items():
+            expected, expected_count = pandas_query(frame, **query)
+            result, count = screener.query(**query)
+            assert count == expected_count and result['id'].tolist() == expected['id'].tolist(), label
+            baseline = timed(lambda: pandas_query(frame, **query), args.repeat)
+            indexed = timed(lambda: screener.query(**query), args.repeat)
+            print(f"{coins:>7,}  {label:24} {baseline * 1000:7.2f} ms {indexed * 1000:7.2f} ms  {baseline / indexed:6.1f}x")
+        print(f"{coins:>7,}  {'build (once per snapshot)':24} {'':>10} {build * 1000:7.2f} ms")
+    print("pandas and the screener return the same coins in the same order")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# benchmarks/bench_shared_memory.py
+#
+# Measures the resident memory used by the history when many sessions and
+# several worker processes read it:
+#   - "copied": every session gets its own unpickled copy (what st.cache_data does)
+#   - "shared": every session reads the same memory-mapped frame
+# and, for worker processes, the private (unshared) memory of each worker.
+# Linux only (reads /proc/self/status and /proc/self/smaps_rollup).
+#
+#   python benchmarks/bench_shared_memory.py [--sessions 50] [--workers 4] [--tile 10]
+
+import argparse
+import gc
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.utils.history_loader import IncrementalHistoryLoader
+from src.utils.shared_history import publish_shared_history, open_shared_history
+
+
+def memory_mb():
+    """Returns (rss, private) memory of the current process in MB."""
+    values = {}
+    for path in ('/proc/self/status', '/proc/self/smaps_rollup'):
+        with open(path) as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if rest.strip().endswith('kB'):
+                    values[key] = int(rest.split()[0]) / 1024
+    private = values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    return values['VmRSS'], private
+
+
+def tiled_history(df, tile):
+    """Repeats the archive `tile` times, shifted in time, to simulate a longer history."""
+    if tile <= 1:
+        return df
+    span = df['date'].max() - df['date'].min() + pd.Timedelta(days=1)
+    frames = []
+    for i in range(tile):
+        part = df.copy()
+        part['date'] = part['date'] - span * (tile - 1 - i)
+        part['collect_timestamp'] = part['collect_timestamp'] - span * (tile - 1 - i)
+        frames.append(part)
+    return pd.concat(frames, ignore_index=True)
+
+
+def session_read(df):
+    # what a session does with the history: select a coin and average it per day
+    return df[df['id'] == 'bitcoin'].groupby('date', observed=True)['current_price'].mean()
+
+
+def worker(mode, shared_dir, token, pickled_path, queue):
+    _, base_private = memory_mb()
+    if mode == 'shared':
+        df = open_shared_history(token, shared_dir)
+    else:
+        with open(pickled_path, 'rb') as f:
+            df = pickle.load(f)
+    # touch every numeric page, like building the index would
+    total = sum(float(np.nansum(df[c].to_numpy())) for c in ('current_price', 'market_cap', 'total_volume'))
+    session_read(df)
+    _, private = memory_mb()
+    queue.put((mode, private - base_private, total))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure history memory with many sessions and workers.")
+    parser.add_argument('--data-dir', default=os.path.join(project_root, 'data'))
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--tile', type=int, default=10, help="repeat the archive to simulate more years")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        df = IncrementalHistoryLoader(args.data_dir, store_dir=os.path.join(tmp, 'store')).refresh()
+        df = tiled_history(df, args.tile)
+        size_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
+        print(f"history: {len(df)} records, {size_mb:.1f} MB in memory")
+
+        shared_dir = os.path.join(tmp, 'shared')
+        publish_shared_history(df, 'bench', shared_dir)
+        pickled_path = os.path.join(tmp, 'history.pkl')
+        with open(pickled_path, 'wb') as f:
+            pickle.dump(df, f)
+        payload = pickle.dumps(df)
+        del df
+        gc.collect()
+
+        # --- sessions inside one process ---
+        base_rss, _ = memory_mb()
+        copies = [pickle.loads(payload) for _ in range(args.sessions)]
+        for copy in copies:
+            session_read(copy)
+        copied_rss, _ = memory_mb()
+        del copies
+        gc.collect()
+
+        shared_df = open_shared_history('bench', shared_dir)
+        base_shared_rss, _ = memory_mb()
+        views = [shared_df for _ in range(args.sessions)]
+        for view in views:
+            session_read(view)
+        shared_rss, _ = memory_mb()
+        print(f"{args.sessions} sessions, copied : +{copied_rss - base_rss:8.1f} MB RSS")
+        print(f"{args.sessions} sessions, shared : +{shared_rss - base_shared_rss:8.1f} MB RSS")
+
+        # --- worker processes ---
+        context = multiprocessing.get_context('spawn')
+        for mode in ('copied', 'shared'):
+            queue = context.Queue()
+            processes = [
+                context.Process(target=worker, args=(mode, shared_dir, 'bench', pickled_path, queue))
+                for _ in range(args.workers)
+            ]
+            for process in processes:
+                process.start()
+            results = [queue.get() for _ in processes]
+            for process in processes:
+                process.join()
+            private = [memory for _, memory, _ in results]
+            print(f"{args.workers} workers, {mode:6s}: +{sum(private):8.1f} MB private memory in total "
+                  f"(+{np.mean(private):.1f} MB per worker)")
+
+
+if __name__ == '__main__':
+    main()
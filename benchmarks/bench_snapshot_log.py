@@ -0,0 +1,88 @@
+# benchmarks/bench_snapshot_log.py
+#
+# Appends many intraday snapshots to the log, then measures:
+#   - the time of one append (a new gzip segment, written then renamed)
+#   - the compaction of the finished days into their daily files
+#   - the history refresh, with and without a large pending intraday log:
+#     the history only reads the daily files, so it must not slow down
+#
+#   python benchmarks/bench_snapshot_log.py [--days 3] [--per-day 288] [--coins 250]
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.generate_archive import generate_archive
+from benchmarks.stub_coingecko import make_coins
+from src.api.getdata import MARKET_COLUMNS
+from src.utils.history_loader import IncrementalHistoryLoader
+from src.utils.snapshot_log import append_snapshot, compact_finished_days
+
+
+def refresh_time(data_dir, store_dir, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        loader = IncrementalHistoryLoader(data_dir, store_dir=store_dir)
+        started = time.perf_counter()
+        loader.refresh()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the intraday snapshot log.")
+    parser.add_argument('--days', type=int, default=3, help="days of intraday snapshots")
+    parser.add_argument('--per-day', type=int, default=288, help="snapshots per day (288 = every 5 minutes)")
+    parser.add_argument('--coins', type=int, default=250)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='cryptodash_log_')
+    try:
+        data_dir = os.path.join(work_dir, 'data')
+        log_dir = os.path.join(data_dir, 'intraday')
+        store_dir = os.path.join(data_dir, 'store')
+        start = datetime(2022, 1, 1)
+        generate_archive(data_dir, days=365, coins=args.coins, start=start.date() - timedelta(days=365))
+        baseline = refresh_time(data_dir, store_dir)
+
+        snapshot = pd.DataFrame(make_coins(args.coins)).reindex(columns=MARKET_COLUMNS)
+        rng = np.random.default_rng(0)
+        appends = []
+        for step in range(args.days * args.per_day):
+            collected_at = start + timedelta(seconds=86400 * step / args.per_day)
+            snapshot['current_price'] *= np.exp(rng.normal(0, 0.002, args.coins))
+            snapshot['collect_timestamp'] = collected_at.isoformat()
+            started = time.perf_counter()
+            append_snapshot(snapshot, log_dir, collected_at=collected_at)
+            appends.append(time.perf_counter() - started)
+        log_bytes = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(log_dir) for f in files)
+        pending = refresh_time(data_dir, store_dir)
+
+        started = time.perf_counter()
+        written = compact_finished_days(log_dir, data_dir, today=(start + timedelta(days=args.days)).strftime('%Y-%m-%d'))
+        compaction = time.perf_counter() - started
+        snapshots = args.days * args.per_day
+        print(f"{snapshots:,} snapshots of {args.coins} coins, log of {log_bytes / 1e6:.1f} MB "
+              f"({log_bytes / snapshots / 1e3:.1f} kB per snapshot)")
+        print(f"append           : median {statistics.median(appends) * 1000:6.1f} ms, max {max(appends) * 1000:6.1f} ms")
+        print(f"compaction       : {compaction:6.2f} s for {len(written)} days ({snapshots / compaction:,.0f} snapshots/s)")
+        print(f"history refresh  : {baseline * 1000:6.1f} ms without intraday log, "
+              f"{pending * 1000:6.1f} ms with {snapshots:,} pending snapshots")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
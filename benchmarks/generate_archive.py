@@ -0,0 +1,112 @@
+# benchmarks/generate_archive.py
+#
+# Writes a synthetic archive of crypto_data_YYYY-MM-DD.json files in the schema
+# of src/fetch_and_save.py, to measure how the dashboard scales beyond the
+# bundled data/ directory. Prices follow a deterministic random walk per coin;
+# with several snapshots per day, a daily file holds every snapshot of the day
+# (one record per coin and snapshot, told apart by collect_timestamp).
+#
+#   python benchmarks/generate_archive.py --out /tmp/archive --days 1825 --coins 5000 --snapshots-per-day 4
+
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+# The first files of the real archive were saved with French column names
+LEGACY_KEYS = {'symbol': 'symbole', 'price_change_percentage_24h': 'pourrcentage_de_prix_24h'}
+
+
+def generate_archive(out_dir, days=365, coins=1000, snapshots_per_day=1, start=date(2021, 1, 1),
+                     legacy_days=0, seed=0):
+    """
+    Writes `days` daily snapshot files of `coins` coins into out_dir.
+    Args:
+        out_dir (str): Destination directory (created if needed).
+        days (int): Number of consecutive days.
+        coins (int): Number of coins per snapshot.
+        snapshots_per_day (int): Snapshots per day, evenly spread over the day.
+        start (date): Day of the first file.
+        legacy_days (int): Number of leading files written with the legacy French keys.
+        seed (int): Seed of the random walks.
+    Returns:
+        dict: The number of files and records written and their total size in bytes.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    rank = np.arange(1, coins + 1)
+    ids = ['bitcoin', 'ethereum'][:coins] + [f"coin-{r}" for r in rank[2:]]
+    symbols = ['btc', 'eth'][:coins] + [f"c{r}" for r in rank[2:]]
+    names = ['Bitcoin', 'Ethereum'][:coins] + [f"Coin {r}" for r in rank[2:]]
+    images = [f"https://example.invalid/{coin_id}.png" for coin_id in ids]
+    supply = 2e12 / rank ** 1.2 / (100000 / rank ** 1.5)
+    price = 100000 / rank ** 1.5 * rng.uniform(0.8, 1.2, coins)
+    volume_ratio = rng.uniform(0.01, 0.2, coins)
+
+    steps = snapshots_per_day
+    previous = price.copy()  # price 24h earlier, for the 24h changes
+    history = [price.copy()] * steps  # last day of prices, for the 24h low/high
+    records_written = 0
+    bytes_written = 0
+    for day in range(days):
+        current_day = start + timedelta(days=day)
+        legacy = day < legacy_days
+        records = []
+        for step in range(steps):
+            price = price * np.exp(rng.normal(0, 0.04 / np.sqrt(steps), coins))
+            history = history[1:] + [price]
+            window = np.stack(history)
+            low, high = window.min(axis=0), window.max(axis=0)
+            change = (price / previous - 1) * 100
+            market_cap = np.round(price * supply)
+            volume = np.round(market_cap * volume_ratio * rng.uniform(0.5, 1.5, coins))
+            timestamp = (datetime.combine(current_day, datetime.min.time())
+                         + timedelta(seconds=int(86400 * step / steps) + 300)).isoformat()
+            for i in range(coins):
+                record = {
+                    'id': ids[i], 'symbol': symbols[i], 'name': names[i],
+                    'current_price': round(float(price[i]), 8), 'market_cap': int(market_cap[i]),
+                    'market_cap_change_percentage_24h': round(float(change[i]), 5),
+                    'total_volume': float(volume[i]),
+                    'price_change_percentage_24h': round(float(change[i]), 5),
+                    'image': images[i],
+                    'low_24h': round(float(low[i]), 8), 'high_24h': round(float(high[i]), 8),
+                    'collect_timestamp': timestamp,
+                }
+                if legacy:
+                    # legacy files have no low/high
+                    record = {LEGACY_KEYS.get(k, k): v for k, v in record.items() if k not in ('low_24h', 'high_24h')}
+                records.append(record)
+        previous = price
+
+        payload = json.dumps(records, ensure_ascii=False, indent=4)
+        with open(os.path.join(out_dir, f"crypto_data_{current_day.isoformat()}.json"), 'w', encoding='utf-8') as f:
+            f.write(payload)
+        records_written += len(records)
+        bytes_written += len(payload)
+    return {'files': days, 'records': records_written, 'bytes': bytes_written}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic crypto_data_*.json archive.")
+    parser.add_argument('--out', required=True, help="destination directory")
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--coins', type=int, default=1000)
+    parser.add_argument('--snapshots-per-day', type=int, default=1)
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2021, 1, 1))
+    parser.add_argument('--legacy-days', type=int, default=0, help="leading files written with the legacy French keys")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = generate_archive(args.out, args.days, args.coins, args.snapshots_per_day, args.start,
+                               args.legacy_days, args.seed)
+    print(f"{summary['files']} files, {summary['records']:,} records, {summary['bytes'] / 1e6:,.1f} MB "
+          f"written to {args.out} in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+# benchmarks/run_suite.py
+#
+# Runs every stage of the load and render paths of the dashboard on a synthetic
+# (or existing) archive and reports, per stage, the wall time, the peak Python
+# memory (tracemalloc, numpy buffers included) and the throughput. The results
+# are saved as JSON; --compare flags the stages that got slower than a previous
+# result file and exits with status 1, so it can gate a CI job.
+#
+#   python benchmarks/run_suite.py --days 1825 --coins 5000 --snapshots-per-day 4
+#   python benchmarks/run_suite.py --archive data --output benchmarks/results/base.json
+#   python benchmarks/run_suite.py --archive data --compare benchmarks/results/base.json
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.generate_archive import generate_archive
+from benchmarks.stub_coingecko import StubCoinGecko
+from src.utils.coin_index import CoinIndex
+from src.utils.history_loader import IncrementalHistoryLoader
+from src.utils.history_store import list_snapshot_files, update_history_store
+from src.utils.indicators import IndicatorEngine
+from src.utils.ingest import ingest_snapshot_files
+from src.visualizations.figure_cache import FigureCache
+from src.visualizations.plots import load_historical_data, plot_price_evolution_with_moving_averages
+
+RESULTS_DIR = os.path.join(project_root, 'benchmarks', 'results')
+PERIODS = ['7d', '1m', '1y', 'All']
+
+
+class Stage:
+    """One measured step: setup() is not timed, run(state) is, `items` is the unit of the throughput."""
+
+    def __init__(self, name, run, items, unit, setup=None):
+        self.name = name
+        self.run = run
+        self.items = items
+        self.unit = unit
+        self.setup = setup or (lambda: None)
+
+
+def measure(stage, repeat, memory=True):
+    """Returns the timings of `repeat` runs and the peak memory of one more run under tracemalloc."""
+    timings = []
+    for _ in range(repeat):
+        state = stage.setup()
+        gc.collect()
+        started = time.perf_counter()
+        stage.run(state)
+        timings.append(time.perf_counter() - started)
+
+    peak_mb = None
+    if memory:
+        # separate run: tracemalloc slows down the Python code it traces
+        state = stage.setup()
+        gc.collect()
+        tracemalloc.start()
+        stage.run(state)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+    seconds = statistics.median(timings)
+    return {
+        'seconds': seconds,
+        'best_seconds': min(timings),
+        'runs': repeat,
+        'peak_mb': peak_mb,
+        'items': stage.items,
+        'unit': stage.unit,
+        'throughput': stage.items / seconds if seconds else None,
+    }
+
+
+def build_stages(archive_dir, work_dir, coins, stub):
+    """The stages, in the order the app runs them."""
+    files = [os.path.join(archive_dir, f) for f in list_snapshot_files(archive_dir)]
+    store_dir = os.path.join(work_dir, 'store')
+
+    def fresh_store():
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    # the history every later stage works on
+    update_history_store(archive_dir, store_dir)
+    loader = IncrementalHistoryLoader(archive_dir, store_dir=store_dir, min_interval=0)
+    history = loader.refresh()
+    records = len(history)
+    index = CoinIndex(history, version=loader.version)
+    IndicatorEngine(path=os.path.join(work_dir, 'indicators.npz')).sync(index)
+    chart_ids = list(index.ids[:coins])
+    charts = len(chart_ids) * len(PERIODS)
+
+    def draw(use_index, cache=None):
+        for coin_id in chart_ids:
+            for period in PERIODS:
+                def build():
+                    return plot_price_evolution_with_moving_averages(history, coin_id, period,
+                                                                     index=index if use_index else None,
+                                                                     indicators=('ma', 'bollinger', 'rsi'))
+                if cache is None:
+                    build()
+                else:
+                    cache.get_or_build(loader.version, (coin_id, period, ('bollinger', 'ma', 'rsi')), build)
+
+    def warm_cache():
+        cache = FigureCache(max_entries=charts)
+        draw(True, cache)
+        return cache
+
+    def new_engine():
+        path = os.path.join(work_dir, 'engine.npz')
+        if os.path.exists(path):
+            os.remove(path)
+        return IndicatorEngine(path=path), CoinIndex(history, version=loader.version)
+
+    stages = [
+        Stage('load_historical_data', lambda _: load_historical_data(archive_dir), records, 'records'),
+        Stage('ingest_batched', lambda _: ingest_snapshot_files(files), records, 'records'),
+        Stage('store_build', lambda _: update_history_store(archive_dir, store_dir), records, 'records',
+              setup=fresh_store),
+        Stage('store_sync_unchanged', lambda _: update_history_store(archive_dir, store_dir), len(files), 'files'),
+        Stage('loader_start', lambda _: IncrementalHistoryLoader(archive_dir, store_dir=store_dir).refresh(),
+              records, 'records'),
+        Stage('coin_index', lambda _: CoinIndex(history, version=loader.version), records, 'records'),
+        Stage('indicators_cold', lambda state: state[0].sync(state[1]), len(index), 'coins', setup=new_engine),
+        Stage('plot_scan', lambda _: draw(False), charts, 'charts'),
+        Stage('plot_index', lambda _: draw(True), charts, 'charts'),
+        Stage('plot_cached', lambda cache: draw(True, cache), charts, 'charts', setup=warm_cache),
+    ]
+    if stub is not None:
+        stages += app_stages(archive_dir, work_dir, stub)
+    return stages
+
+
+def app_stages(archive_dir, work_dir, stub):
+    """
+    Full script runs of src/app.py (history, charts, Top 10 table) through Streamlit's AppTest.
+    The market data is fetched by the poller in the background: the cold run does not wait for it.
+    The history is loaded in the background too: the cold run waits for it and runs again, as
+    the loading watcher of the page does (bench_cold_start.py measures the first paint itself).
+    """
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    import src.api.client as client_module
+    from src.api.client import CoinGeckoClient
+    from src.resources import get_history_task
+
+    # the app reads 'data/' relative to the working directory: link the archive files there
+    app_dir = os.path.join(work_dir, 'app')
+    data_dir = os.path.join(app_dir, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    for filename in list_snapshot_files(archive_dir):
+        target = os.path.join(data_dir, filename)
+        if not os.path.exists(target):
+            os.symlink(os.path.abspath(os.path.join(archive_dir, filename)), target)
+    # realtime data from the local stub instead of CoinGecko
+    client_module._default_client = CoinGeckoClient(base_url=stub.base_url, rate_per_minute=6000, burst=100)
+    app_path = os.path.join(project_root, 'src', 'app.py')
+    # notices repeated at every run, and the bare-mode warning of the cache clear() calls
+    for name in ('streamlit.deprecation_util', 'streamlit.runtime.scriptrunner_utils.script_run_context'):
+        logging.getLogger(name).disabled = True
+
+    def run_app(app, wait_for_history=False):
+        cwd = os.getcwd()
+        os.chdir(app_dir)
+        try:
+            app = app or AppTest.from_file(app_path, default_timeout=600)
+            app.run()
+            if wait_for_history:
+                get_history_task().result()
+                app.run()
+        finally:
+            os.chdir(cwd)
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+        return app
+
+    def cold():
+        st.cache_resource.clear()
+        st.cache_data.clear()
+        shutil.rmtree(os.path.join(data_dir, 'store'), ignore_errors=True)
+
+    def warm():
+        return run_app(None)
+
+    return [
+        Stage('app_cold_run', lambda _: run_app(None, wait_for_history=True), 1, 'runs', setup=cold),
+        Stage('app_rerun', lambda app: run_app(app), 1, 'runs', setup=warm),
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, tolerance):
+    """Prints the change of every stage against a previous result file, returns the regressed stages."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['stages']
+    regressions = []
+    print(f"\nAgainst {baseline_path} (tolerance {tolerance:.0%}):")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['seconds'] / baseline[name]['seconds']
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:22s} {baseline[name]['seconds']:9.3f} s -> {result['seconds']:9.3f} s  "
+              f"x{ratio:5.2f}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the load and render paths of the dashboard.")
+    parser.add_argument('--archive', help="existing directory of crypto_data_*.json files (default: a generated one)")
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--coins', type=int, default=1000)
+    parser.add_argument('--snapshots-per-day', type=int, default=1)
+    parser.add_argument('--chart-coins', type=int, default=5, help="coins drawn by the plot stages (every period)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--stages', help="comma-separated subset of the stages to run")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc run of each stage")
+    parser.add_argument('--no-app', action='store_true', help="skip the AppTest runs of src/app.py")
+    parser.add_argument('--output', help=f"result file (default: {RESULTS_DIR}/<timestamp>.json)")
+    parser.add_argument('--compare', help="previous result file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="slowdown flagged as a regression")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    work_dir = tempfile.mkdtemp(prefix='cryptodash_bench_')
+    stub = None
+    try:
+        archive_dir = args.archive
+        archive = {'path': archive_dir}
+        if archive_dir is None:
+            archive_dir = os.path.join(work_dir, 'archive')
+            started = time.perf_counter()
+            archive = generate_archive(archive_dir, args.days, args.coins, args.snapshots_per_day)
+            archive.update(days=args.days, coins=args.coins, snapshots_per_day=args.snapshots_per_day)
+            print(f"Generated {archive['files']} files ({archive['records']:,} records, "
+                  f"{archive['bytes'] / 1e6:,.0f} MB) in {time.perf_counter() - started:.1f} s")
+        archive['files'] = len(list_snapshot_files(archive_dir))
+        archive['bytes'] = sum(os.path.getsize(os.path.join(archive_dir, f)) for f in list_snapshot_files(archive_dir))
+
+        if not args.no_app:
+            stub = StubCoinGecko(coins=100, latency=0).__enter__()
+        stages = build_stages(archive_dir, work_dir, args.chart_coins, stub)
+        if args.stages:
+            selected = args.stages.split(',')
+            stages = [stage for stage in stages if stage.name in selected]
+
+        results = {}
+        print(f"{'stage':22s} {'median':>9s} {'best':>9s} {'peak MB':>9s}  throughput")
+        for stage in stages:
+            result = measure(stage, args.repeat, memory=not args.no_memory)
+            results[stage.name] = result
+            peak = f"{result['peak_mb']:9.1f}" if result['peak_mb'] is not None else f"{'-':>9s}"
+            print(f"{stage.name:22s} {result['seconds']:8.3f}s {result['best_seconds']:8.3f}s {peak}  "
+                  f"{result['throughput']:,.{0 if result['throughput'] >= 10 else 2}f} {result['unit']}/s")
+    finally:
+        if stub is not None:
+            stub.__exit__(None, None, None)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    report = {
+        'created': datetime.now().isoformat(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'archive': archive,
+        'stages': results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+# benchmarks/stub_coingecko.py
+#
+# Local HTTP server emulating the CoinGecko endpoints used by the project
+# (/coins/markets, /coins/{id}/market_chart/range and /exchange_rates), with CoinGecko's
+# pagination (at most 250 coins per page) and rate limiting (HTTP 429 +
+# Retry-After once the request budget is spent).
+#
+#   python benchmarks/stub_coingecko.py --port 8000 --coins 5000
+#   COINGECKO_BASE_URL=http://127.0.0.1:8000/api/v3 streamlit run src/app.py
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+MAX_PER_PAGE = 250
+# (code, name, unit, value of 1 USD) of the fiat currencies of /exchange_rates
+FIAT_RATES = [
+    ('usd', 'US Dollar', '$', 1.0), ('eur', 'Euro', '€', 0.92), ('gbp', 'British Pound Sterling', '£', 0.79),
+    ('jpy', 'Japanese Yen', '¥', 151.0), ('chf', 'Swiss Franc', 'Fr.', 0.88), ('cad', 'Canadian Dollar', 'CA$', 1.37),
+    ('aud', 'Australian Dollar', 'A$', 1.52), ('cny', 'Chinese Yuan', '¥', 7.2), ('inr', 'Indian Rupee', '₹', 83.4),
+    ('krw', 'South Korean Won', '₩', 1370.0), ('brl', 'Brazil Real', 'R$', 5.1),
+]
+
+
+def make_coins(count, seed=0):
+    """Deterministic coin universe ranked by market cap (rank 1 = 'bitcoin')."""
+    rng = random.Random(seed)
+    coins = []
+    for rank in range(1, count + 1):
+        coin_id = 'bitcoin' if rank == 1 else 'ethereum' if rank == 2 else f"coin-{rank}"
+        price = 100000 / rank ** 1.5 * rng.uniform(0.8, 1.2)
+        coins.append({
+            'id': coin_id,
+            'symbol': coin_id[:3] if rank <= 2 else f"c{rank}",
+            'name': coin_id.capitalize() if rank <= 2 else f"Coin {rank}",
+            'image': f"https://example.invalid/{coin_id}.png",
+            'current_price': price,
+            'market_cap': 2e12 / rank ** 1.2,
+            'market_cap_rank': rank,
+            'total_volume': 5e10 / rank * rng.uniform(0.5, 1.5),
+            'high_24h': price * 1.03,
+            'low_24h': price * 0.97,
+            'price_change_percentage_24h': rng.uniform(-10, 10),
+            'market_cap_change_percentage_24h': rng.uniform(-10, 10),
+        })
+    return coins
+
+
+class _RateLimiter:
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Returns 0 if the request is allowed, otherwise the seconds to wait."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+
+class StubCoinGecko:
+    """
+    Runs the stub server in a background thread.
+
+        with StubCoinGecko(coins=5000, rate_per_minute=300) as stub:
+            client = CoinGeckoClient(base_url=stub.base_url)
+    """
+
+    def __init__(self, coins=1000, rate_per_minute=600, burst=10, latency=0.05, error_rate=0.0, port=0, seed=0):
+        self.coins = make_coins(coins, seed)
+        self.limiter = _RateLimiter(rate_per_minute, burst)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.stats = {'requests': 0, 'rate_limited': 0, 'errors': 0}
+        self.stats_lock = threading.Lock()
+        self.coins_by_id = {coin['id']: coin for coin in self.coins}
+        self.handlers = {'/api/v3/coins/markets': self._markets, '/api/v3/coins/': self._market_chart_range,
+                         '/api/v3/exchange_rates': self._exchange_rates}
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/api/v3"
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def _markets(self, path, query):
+        per_page = min(int(query.get('per_page', ['100'])[0]), MAX_PER_PAGE)
+        page = max(int(query.get('page', ['1'])[0]), 1)
+        start = (page - 1) * per_page
+        return 200, self.coins[start:start + per_page]
+
+    def _market_chart_range(self, path, query):
+        # /api/v3/coins/{id}/market_chart/range: hourly points up to 90 days, daily points beyond
+        parts = path.strip('/').split('/')
+        if len(parts) != 6 or parts[4:] != ['market_chart', 'range'] or parts[3] not in self.coins_by_id:
+            return 404, {'error': 'coin not found'}
+        coin = self.coins_by_id[parts[3]]
+        start, end = int(query['from'][0]), int(query['to'][0])
+        step = 3600 if end - start <= 90 * 86400 else 86400
+        first = -(-start // step) * step
+        prices, caps, volumes = [], [], []
+        for t in range(first, end + 1, step):
+            # deterministic random walk of the coin around its current price
+            factor = 1 + 0.2 * math.sin(t / 86400 / 30 + coin['market_cap_rank']) + 0.02 * math.sin(t / 3600)
+            ms = (t + 60) * 1000  # upstream points are not exactly on the hour
+            prices.append([ms, coin['current_price'] * factor])
+            caps.append([ms, coin['market_cap'] * factor])
+            volumes.append([ms, coin['total_volume'] * (2 - factor)])
+        return 200, {'prices': prices, 'market_caps': caps, 'total_volumes': volumes}
+
+    def _exchange_rates(self, path, query):
+        # values per bitcoin, as upstream
+        bitcoin_usd = self.coins[0]['current_price']
+        rates = {'btc': {'name': 'Bitcoin', 'unit': 'BTC', 'value': 1.0, 'type': 'crypto'}}
+        for code, name, unit, per_usd in FIAT_RATES:
+            rates[code] = {'name': name, 'unit': unit, 'value': bitcoin_usd * per_usd, 'type': 'fiat'}
+        return 200, {'rates': rates}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, headers=None):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                stub._count('requests')
+                url = urlparse(self.path)
+                wait = stub.limiter.take()
+                if wait:
+                    stub._count('rate_limited')
+                    self._send(429, {'status': {'error_code': 429, 'error_message': 'rate limited'}},
+                               {'Retry-After': str(math.ceil(wait))})
+                    return
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub.error_rate and stub.rng.random() < stub.error_rate:
+                    stub._count('errors')
+                    self._send(503, {'error': 'unavailable'})
+                    return
+                for prefix, handler in stub.handlers.items():
+                    if url.path == prefix or (prefix.endswith('/') and url.path.startswith(prefix)):
+                        status, body = handler(url.path, parse_qs(url.query))
+                        self._send(status, body)
+                        return
+                self._send(404, {'error': 'not found'})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local CoinGecko stub server.")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--coins', type=int, default=1000)
+    parser.add_argument('--rate-per-minute', type=float, default=600)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+    with StubCoinGecko(args.coins, args.rate_per_minute, latency=args.latency, port=args.port) as stub:
+        print(f"CoinGecko stub listening on {stub.base_url}")
+        try:
+            stub.thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
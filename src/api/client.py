@@ -0,0 +1,200 @@
+# src/api/client.py
+
+import requests
+from requests.adapters import HTTPAdapter
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BASE_URL = os.environ.get('COINGECKO_BASE_URL', 'https://api.coingecko.com/api/v3')
+# Free (demo) plan: about 30 calls per minute
+RATE_PER_MINUTE = float(os.environ.get('COINGECKO_RATE_PER_MINUTE', 30))
+MAX_PER_PAGE = 250  # upstream limit of /coins/markets
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `capacity` saved up.
+    A Retry-After answer pauses the whole bucket, so every thread backs off together.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then takes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Stops handing out tokens for `seconds` (e.g. after a 429 with Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+
+class CoinGeckoClient:
+    """
+    CoinGecko API client sharing one pooled keep-alive session between threads.
+    Every request goes through a token bucket; 429 answers honour Retry-After, and
+    connection errors and 5xx answers are retried with exponential backoff.
+    """
+
+    def __init__(self, base_url=BASE_URL, rate_per_minute=RATE_PER_MINUTE, burst=5, timeout=(5, 30),
+                 max_retries=4, backoff=1.0, max_workers=4, api_key=None):
+        """
+        Args:
+            base_url (str): API root (a local stub server can be used for testing).
+            rate_per_minute (float): Request budget shared by every thread of the client.
+            burst (int): Number of requests that can be sent back to back.
+            timeout (tuple): (connect, read) timeout in seconds.
+            max_retries (int): Retries after a failed attempt.
+            backoff (float): Base delay of the exponential backoff, in seconds.
+            max_workers (int): Pages fetched concurrently.
+            api_key (str): Optional demo API key (default: COINGECKO_API_KEY environment variable).
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate_per_minute / 60, burst)
+
+        self.session = requests.Session()
+        # one connection per page worker, plus one for the exchange rates the poller fetches alongside
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(max_workers, 1) + 1)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept'] = 'application/json'
+        api_key = api_key or os.environ.get('COINGECKO_API_KEY')
+        if api_key:
+            self.session.headers['x-cg-demo-api-key'] = api_key
+
+    def get_json(self, path, params=None):
+        """
+        Sends a GET request to the API and returns the decoded JSON answer.
+        Raises:
+            requests.exceptions.RequestException: If the request still fails after the retries.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logging.warning(f"[{datetime.now().isoformat()}] {url}: {e}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+                delay = self._retry_after(response) or self._backoff_delay(attempt)
+                if response.status_code == 429:
+                    self.bucket.pause(delay)  # every thread waits, not only this one
+                logging.warning(f"[{datetime.now().isoformat()}] {url}: HTTP {response.status_code}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            response.raise_for_status()
+            return response.json()
+
+    def _backoff_delay(self, attempt):
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get('Retry-After')
+        try:
+            return max(float(value), 0) if value is not None else None
+        except ValueError:
+            return None
+
+    def get_markets(self, vs_currency='usd', limit=100, offset=0, per_page=None):
+        """
+        Retrieves the coins ranked by market cap, fetching the pages concurrently.
+        Args:
+            vs_currency (str): The currency to compare against.
+            limit (int): The number of coins to retrieve (can exceed the 250 coins of a page).
+            offset (int): The rank of the first coin to retrieve (0 for the top coin).
+            per_page (int): Page size (default: limit, up to 250).
+        Returns:
+            list: The market records in rank order, None if a page fails (a universe cut
+            short would replace a complete one).
+        """
+        per_page = min(per_page or limit, MAX_PER_PAGE)
+        first_page = offset // per_page + 1
+        last_page = (offset + limit - 1) // per_page + 1
+
+        def fetch(page):
+            params = {
+                'vs_currency': vs_currency, 'order': 'market_cap_desc',
+                'per_page': per_page, 'page': page, 'sparkline': 'false'
+            }
+            try:
+                return self.get_json('coins/markets', params)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logging.error(f"[{datetime.now().isoformat()}] Error fetching page {page} of the markets: {e}")
+                return None
+
+        pages = list(range(first_page, last_page + 1))
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(pages)))) as executor:
+            results = list(executor.map(fetch, pages))  # map keeps the page order
+
+        records = []
+        for data in results:
+            if data is None:
+                return None
+            records.extend(data)
+            if len(data) < per_page:
+                break  # last page of the upstream list
+        start = offset - (first_page - 1) * per_page
+        return records[start:start + limit]
+
+    def get_exchange_rates(self):
+        """
+        Retrieves the exchange rates of every currency (one request, values per bitcoin).
+        Returns:
+            dict: The answer of /exchange_rates, None if the request fails.
+        """
+        try:
+            return self.get_json('exchange_rates')
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logging.error(f"[{datetime.now().isoformat()}] Error fetching the exchange rates: {e}")
+            return None
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """Returns the client shared by the whole process (created on first use)."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = CoinGeckoClient()
+        return _default_client
@@ -1,31 +1,50 @@
-import requests
 import pandas as pd
 import logging
+from datetime import datetime
+from src.api.client import get_default_client
+from src.utils.fx import ExchangeRates
+from src.utils.instrumentation import instrumented
 
-def get_top_cryptos(vs_currency='usd', limit=10, page=1):
+MARKET_COLUMNS = ['id', 'symbol', 'name', 'current_price', 'market_cap','market_cap_change_percentage_24h' , 'total_volume', 'price_change_percentage_24h', 'image', 'low_24h', 'high_24h']
+
+@instrumented('api.get_top_cryptos')
+def get_top_cryptos(vs_currency='usd', limit=10, page=1, client=None):
     """
     Retrieve the top cryptocurrencies by market cap from Coingecko API.
     Args:
         vs_currency (str): The currency to compare against (default is 'usd').
-        limit (int): The number of cryptocurrencies to retrieve (default is 10).
-        page (int): The page number for pagination (default is 1).
+        limit (int): The number of cryptocurrencies to retrieve (default is 10). Above 250,
+            the upstream pages are fetched concurrently and merged in rank order.
+        page (int): The page number for pagination (default is 1), in pages of `limit` coins.
+        client (CoinGeckoClient): The API client (default is the client shared by the process).
     Returns:
         pd.DataFrame : A pandas DataFrame containing cryptocurrency data.
         None: If the request fails or no data is returned.
     """
-    url = f"https://api.coingecko.com/api/v3/coins/markets?vs_currency={vs_currency}&order=market_cap_desc&per_page={limit}&page={page}&sparkline=false"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an error for bad responses
-        data = response.json()
-        if data :
-            df = pd.DataFrame(data)
-            df = df[['id', 'symbol', 'name', 'current_price', 'market_cap','market_cap_change_percentage_24h' , 'total_volume', 'price_change_percentage_24h', 'image', 'low_24h', 'high_24h']]
-            return df
-        else :
-            logging.info("no data found.")
-            return None
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching data from the API: {e}")
+    client = client or get_default_client()
+    data = client.get_markets(vs_currency=vs_currency, limit=limit, offset=(page - 1) * limit)
+    if data :
+        df = pd.DataFrame(data)
+        df = df.reindex(columns=MARKET_COLUMNS)
+        return df
+    else :
+        logging.info("no data found.")
         return None
-    
\ No newline at end of file
+
+
+@instrumented('api.get_exchange_rates')
+def get_exchange_rates(client=None):
+    """
+    Retrieve the exchange rates of the display currencies from Coingecko API, as factors
+    from USD (the currency of the markets and of the history).
+    Args:
+        client (CoinGeckoClient): The API client (default is the client shared by the process).
+    Returns:
+        ExchangeRates: The conversion table.
+        None: If the request fails or the answer has no USD rate.
+    """
+    client = client or get_default_client()
+    rates = ExchangeRates.from_api(client.get_exchange_rates(), fetched_at=datetime.now())
+    if rates is None:
+        logging.info("no exchange rates found.")
+    return rates
@@ -0,0 +1,179 @@
+# src/api/poller.py
+
+import logging
+import os
+import threading
+from datetime import datetime
+from src.utils.background import BackgroundTask
+from src.utils.fx import ExchangeRates
+
+# Coins fetched by the poller of the app: the universe of the screener (one page by default)
+MARKET_COINS = int(os.environ.get('COINGECKO_MARKET_COINS', 250))
+# Coins per /coins/markets request (upstream limit)
+PAGE_SIZE = 250
+# Seconds between two polls of one page: a poll costs one request per page plus one for the
+# exchange rates, so the interval grows with the pages and a worker process stays at about
+# 2 requests a minute (the free tier allows about 30 for every worker using the same key or IP)
+POLL_INTERVAL = 60
+# Seconds a snapshot waits for the exchange rates once the markets are fetched
+RATES_WAIT = 1.0
+
+
+def poll_interval(limit, interval=POLL_INTERVAL):
+    """Seconds between two polls of `limit` coins: `interval` per page of PAGE_SIZE coins."""
+    return interval * max(1, -(-limit // PAGE_SIZE))
+
+
+def fetch_markets(vs_currency='usd', limit=100):
+    # imported on the first fetch, in the poller thread: the first paint of the app
+    # does not wait for pandas and requests to load
+    from src.api.getdata import get_top_cryptos
+    return get_top_cryptos(vs_currency=vs_currency, limit=limit)
+
+
+def fetch_exchange_rates():
+    from src.api.getdata import get_exchange_rates
+    return get_exchange_rates()
+
+
+class MarketSnapshot:
+    """
+    One published result of the market poller. Snapshots are never modified once published:
+    a new fetch publishes a new snapshot, so a reader always sees a consistent set of prices.
+    The frame is shared by every session and must not be modified in place.
+    """
+
+    __slots__ = ('data', 'fetched_at', 'version', 'rates')
+
+    def __init__(self, data, fetched_at, version, rates=None):
+        self.data = data  # pd.DataFrame in the schema of get_top_cryptos, in USD
+        self.fetched_at = fetched_at  # datetime of the fetch
+        self.version = version  # incremented by every publication
+        self.rates = rates or ExchangeRates.base_only()  # USD -> display currencies
+
+    def age(self):
+        """Seconds since the data was fetched."""
+        return (datetime.now() - self.fetched_at).total_seconds()
+
+
+class MarketPoller:
+    """
+    Fetches the markets in a background thread and publishes the result as an immutable
+    MarketSnapshot that every session reads (stale-while-revalidate): readers get the latest
+    snapshot immediately, even while the next one is being fetched, and never wait on the
+    network. A failed fetch keeps the previous snapshot and is retried with a backoff.
+    Each poll also fetches the exchange rates (one request), so that every display currency
+    is converted locally from the USD markets instead of being fetched on its own.
+    """
+
+    def __init__(self, interval=60, limit=100, vs_currency='usd', retry_interval=5, fetch=None, fetch_rates=None):
+        """
+        Args:
+            interval (float): Seconds between two fetches.
+            limit (int): Number of coins fetched (by market cap).
+            vs_currency (str): The currency the prices are fetched in.
+            retry_interval (float): Delay before the first retry of a failed fetch, doubled
+                on every failure up to `interval`.
+            fetch (callable): Returns the markets as a DataFrame, or None on failure
+                (default: get_top_cryptos).
+            fetch_rates (callable): Returns the ExchangeRates from `vs_currency`, or None on
+                failure (default: get_exchange_rates with the default fetch; with a custom
+                fetch and no fetch_rates, the snapshots are in `vs_currency` only).
+        """
+        self.interval = interval
+        self.retry_interval = retry_interval
+        self.fetch = fetch or (lambda: fetch_markets(vs_currency=vs_currency, limit=limit))
+        self.fetch_rates = fetch_rates or (fetch_exchange_rates if fetch is None and vs_currency == 'usd' else None)
+        self.failures = 0
+        self.last_error = None
+        self._snapshot = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts the polling thread (once); returns immediately."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='market-poller', daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def snapshot(self):
+        """Returns the latest published MarketSnapshot (None until the first fetch succeeds)."""
+        return self._snapshot
+
+    def request_refresh(self):
+        """Asks for a fetch now instead of at the next interval; does not wait for it."""
+        self._wake.set()
+
+    def is_stale(self, snapshot=None):
+        """True when the snapshot is older than two polling intervals (fetches are failing)."""
+        snapshot = snapshot or self._snapshot
+        return snapshot is None or snapshot.age() > 2 * self.interval
+
+    def poll_once(self):
+        """
+        Fetches the markets and publishes them.
+        Returns:
+            bool: True if a new snapshot was published.
+        """
+        # the exchange rates are fetched alongside the markets; the snapshot waits for them at most
+        # RATES_WAIT seconds (retries and 429 back-offs do not delay the markets), late rates are
+        # published afterwards in a new snapshot of the same markets
+        rates_task = BackgroundTask(self.fetch_rates, name='exchange-rates').start() if self.fetch_rates else None
+        try:
+            data = self.fetch()
+            error = "no data returned"
+        except Exception as e:  # the thread must survive any failure of the fetch
+            data, error = None, str(e)
+            logging.error(f"[{datetime.now().isoformat()}] Market poll failed: {e}")
+        if data is None or data.empty:
+            self.failures += 1
+            self.last_error = error
+            return False
+
+        previous = self._snapshot
+        rates_ready = rates_task is None or rates_task.wait(RATES_WAIT)
+        rates = self._poll_rates(rates_task if rates_ready else None, previous)
+        # a single reference assignment: readers see the previous snapshot or this one, never a mix
+        self._snapshot = MarketSnapshot(data, datetime.now(), previous.version + 1 if previous else 1, rates)
+        self.failures = 0
+        self.last_error = None
+
+        if not rates_ready:
+            late_rates = self._poll_rates(rates_task, None)  # waits in the poller thread only
+            if late_rates is not None:
+                snapshot = self._snapshot
+                self._snapshot = MarketSnapshot(snapshot.data, snapshot.fetched_at, snapshot.version + 1, late_rates)
+        return True
+
+    def _poll_rates(self, rates_task, previous):
+        # a failed (or pending) fetch of the rates keeps the previous ones: the markets are published anyway
+        rates = None
+        if rates_task is not None:
+            try:
+                rates = rates_task.result()
+            except Exception:
+                pass  # logged by the task
+        if rates is None and previous is not None:
+            rates = previous.rates
+        return rates
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.poll_once()
+            if self.failures:
+                delay = min(self.interval, self.retry_interval * 2 ** (self.failures - 1))
+            else:
+                delay = self.interval
+            self._wake.wait(delay)
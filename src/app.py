@@ -1,7 +1,6 @@
 # src/app.py
 
 import streamlit as st
-import pandas as pd
 import os
 import sys
 # --- environment config ---
@@ -11,9 +10,13 @@ if project_root not in sys.path:
     sys.path.append(project_root)
     print(f"DEBUG: Added {project_root} to sys.path")
 
-# Module imports
-from src.api.getdata import get_top_cryptos
-from src.visualizations.plots import load_historical_data, plot_price_evolution_with_moving_averages
+# Module imports (light: pandas, numpy and plotly are imported by the panels and resources that use them)
+from src.resources import (
+    load_history, get_history_task, get_figure_cache, get_market_poller, get_current_market_view,
+    get_exchange_rates, get_metrics_server
+)
+from src.utils.fx import BASE_CURRENCY
+from src.utils.instrumentation import get_registry, instrumented, is_enabled, span
 
 # --- streamlit config ---
 st.set_page_config(
@@ -23,72 +26,307 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# --- Cache functions ---
-@st.cache_data(ttl=3600)
-def get_historical_data_cached():
-    return load_historical_data()
-
-@st.cache_data(ttl=60)
-def get_realtime_data_cached():
-    return get_top_cryptos(limit=100) 
-
-# --- Utility function for handling missing values and formatting ---
-# --- New formatting function for metrics (with HTML) ---
-# --- Cache and format_value functions  ---
-def format_metric_value(value, prefix="", suffix="", decimals=2):
-    """Formats a value for metrics, including HTML."""
-    if pd.isna(value):
-        return "N/A"
-    if isinstance(value, (int, float)):
-        if suffix == "%":
-            color = "green" if value >= 0 else "red"
-            return f"<span style='color:{color}'>{prefix}{value:,.{decimals}f}{suffix}</span>"
-        return f"{prefix}{value:,.{decimals}f}{suffix}"
-    return str(value)
-
-def format_dataframe_value(value, prefix="", suffix="", decimals=2):
-    """Formats a value for dataframes, without HTML."""
-    if pd.isna(value):
-        return "N/A"
-    if isinstance(value, (int, float)):
-        return f"{prefix}{value:,.{decimals}f}{suffix}"
-    return str(value)
-
-
-# --- Header and Refresh Button on the same line (unchanged) ---
-title_col, refresh_btn_col = st.columns([0.7, 0.3])
-
-with title_col:
-    st.markdown("## CryptoDashboard")
-
-with refresh_btn_col:
-    st.markdown("<br>", unsafe_allow_html=True)
-    if st.button("Refresh data", help="Update the data from the API"):
-        st.cache_data.clear()
-        st.rerun()
+# --- Panels ---
+# Each panel is a fragment: an interaction with one of its widgets only reruns that panel.
+# The market panels also rerun on their own to show the snapshots published by the poller.
+MARKET_PANEL_REFRESH = 30  # seconds
+LOADING_POLL = 0.25  # seconds between two checks of the data still loading in the background
+DEFAULT_CRYPTO_ID, DEFAULT_CRYPTO_NAME = 'bitcoin', 'Bitcoin'
+
+
+@st.fragment(key='header')
+@instrumented('panel.header')
+def header_panel():
+    # --- Header and Refresh Button on the same line ---
+    title_col, refresh_btn_col = st.columns([0.7, 0.3])
+
+    with title_col:
+        st.markdown("## CryptoDashboard")
+
+    with refresh_btn_col:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("Refresh data", help="Update the data from the API"):
+            # the poller fetches in the background; the market panels show the new prices at their next run
+            get_market_poller().request_refresh()
+            st.toast("Fetching the latest market data...")
+
+
+@st.fragment(key='key_indicators', run_every=MARKET_PANEL_REFRESH)
+@instrumented('panel.key_indicators')
+def key_indicators_panel(crypto_id, currency):
+    st.subheader("Key Indicators (24h)")
+    market_poller = get_market_poller()
+    market_snapshot = market_poller.snapshot()
+    if market_snapshot is not None:
+        st.caption(f"Market data of {market_snapshot.fetched_at.strftime('%H:%M:%S')}")
+        if market_poller.is_stale(market_snapshot):
+            st.warning(f"Market data is {market_snapshot.age() / 60:.0f} min old: the API cannot be reached.")
+
+    market_view = get_current_market_view(currency)
+    cards = market_view.metric_cards(crypto_id) if market_view is not None else None
+    if cards is not None:
+        st.markdown(f"**For {cards['name']} ({cards['symbol']}):**")
+
+        with st.container(border=True):
+            st.metric(label="Current Price", value=cards['price'])
+
+        with st.container(border=True):
+            st.markdown(f"**24h Change**: {cards['change']}", unsafe_allow_html=True)
+
+        with st.container(border=True):
+            st.metric(label="24h Trading Volume", value=cards['volume'])
+
+        with st.container(border=True):
+            st.metric(label="Market Cap", value=cards['market_cap'])
+
+    elif market_snapshot is None and market_poller.failures == 0:
+        st.info("Market data is loading...")
+    else:
+        st.info("Select a cryptocurrency or wait for the data to load.")
+
+
+@st.fragment(key='chart')
+@instrumented('panel.chart')
+def chart_panel(crypto_id, coin_index, historical_df, currency):
+    st.subheader("Historical Price Evolution")
+    if len(coin_index) == 0:
+        st.warning(
+            "No historical data available for analysis. "
+            "Make sure to run `python src/fetch_and_save.py` "
+            "and that JSON files are present in the `data/` folder."
+        )
+        return
+
+    from src.visualizations.plots import plot_price_evolution_with_moving_averages, plot_candlestick
+
+    # --- Chart filters: they only rerun this panel ---
+    filter_col, type_col = st.columns([0.5, 0.5])
+    with filter_col:
+        time_periods = ['7d', '1m', '1y', 'All']
+        chart_period = st.radio(
+            "Show history for:",
+            options=time_periods,
+            index=3, # 'All' is selected by default
+            horizontal=True, # Display buttons in a row
+            key='selected_time_period' # the selected period is kept in the session state
+        )
+    with type_col:
+        chart_type = st.radio(
+            "Chart type:",
+            options=['Line', 'Candlestick'],
+            horizontal=True,
+            key='chart_type'
+        )
+
+    indicator_labels = {
+        'ma': 'Moving Averages (7d/30d)', 'ema': 'EMA (12d/26d)', 'bollinger': 'Bollinger Bands',
+        'rsi': 'RSI (14d)', 'volatility': 'Volatility (30d)'
+    }
+    selected_indicators = st.multiselect(
+        "Indicators:",
+        options=list(indicator_labels),
+        default=['ma'],
+        format_func=indicator_labels.get,
+        disabled=chart_type == 'Candlestick',
+        key='selected_indicators'
+    )
+
+    # the USD history is converted locally at the latest rate: no API call and no reload of the history
+    rates = get_exchange_rates()
+    if currency not in rates:
+        currency = BASE_CURRENCY
+    currency_key = (currency, rates.factor(currency))
+
+    if chart_type == 'Candlestick':
+        # daily, weekly or monthly bars depending on the period
+        fig_price_evolution = get_figure_cache().get_or_build(
+            coin_index.version,
+            (crypto_id, chart_period, 'candlestick', currency_key),
+            lambda: plot_candlestick(coin_index, crypto_id, chart_period, currency=currency, rates=rates)
+        )
+    else:
+        fig_price_evolution = get_figure_cache().get_or_build(
+            coin_index.version,
+            (crypto_id, chart_period, tuple(sorted(selected_indicators)), currency_key),
+            lambda: plot_price_evolution_with_moving_averages(
+                historical_df,
+                crypto_id,
+                chart_period,
+                index=coin_index,
+                indicators=selected_indicators,
+                currency=currency,
+                rates=rates
+            )
+        )
+    st.plotly_chart(fig_price_evolution, use_container_width=True)
+
+
+@st.fragment(key='details', run_every=MARKET_PANEL_REFRESH)
+@instrumented('panel.details')
+def details_panel(crypto_id, currency):
+    # Line 2: Detailed Information/Insights (Styled Table)
+    st.subheader("Detailed Information")
+    market_view = get_current_market_view(currency)
+    details_df = market_view.details_table(crypto_id) if market_view is not None else None
+    if details_df is not None:
+        st.dataframe(details_df, use_container_width=True)
+    else:
+        st.info("Select a cryptocurrency to view detailed information.")
+
+
+@st.fragment(key='top10', run_every=MARKET_PANEL_REFRESH)
+@instrumented('panel.top10')
+def top10_panel(currency):
+    st.subheader("Top 10 Cryptos 🏆")
+    market_view = get_current_market_view(currency)
+    if market_view is not None and len(market_view) > 0:
+        import numpy as np
+        with span('tables.top10'):
+            final_top_10_df = market_view.ranking_table(limit=10).style.apply(
+                lambda changes: np.where(changes >= 0, "color: green", "color: red"),
+                subset=['24h Change (%)']
+            ).format(
+                {'24h Change (%)': "{:.2f}%"},
+                na_rep="N/A"
+            )
+
+        st.markdown("##### Ranking by Market Cap")
+        st.dataframe(
+            final_top_10_df,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Image": st.column_config.ImageColumn("Logo", width=40),
+                "Crypto": st.column_config.Column("Name (Symbol)", width="medium"),
+                "Current Price": st.column_config.Column(width="small"),
+                "24h Change (%)": st.column_config.Column("24h Change (%)", width="small", help="Price change over the last 24 hours"),
+                "Market Cap": st.column_config.Column(width="medium"),
+            }
+        )
+
+    elif market_view is None and get_market_poller().failures == 0:
+        st.info("Market data is loading...")
+    else:
+        st.warning("Unable to load the Top 10 cryptos.")
+
+
+@st.fragment(key='history_status')
+@instrumented('panel.history_status')
+def history_status_panel(coin_index):
+    st.subheader("History 🗓️")
+    # the latest day of the history already in memory: no scan of the data folder
+    if coin_index is None:
+        st.info("Loading the historical data...")
+    elif len(coin_index) > 0:
+        latest_date_str = str(coin_index.dates.max().astype('datetime64[D]'))
+        st.info(f"Latest saved historical data: **{latest_date_str}**")
+        st.write("These data are used for evolution charts.")
+    else:
+        st.info("No historical saves found.")
+        st.write("Run `python src/fetch_and_save.py` to start saving data.")
+
+
+@st.fragment(key='loading', run_every=LOADING_POLL)
+def loading_watcher(waiting_for_history, waiting_for_market):
+    # Only rendered while data is loading in the background: reruns the page as soon as it
+    # is ready, so the panels waiting for it are painted without a manual refresh
+    market_poller = get_market_poller()
+    history_ready = waiting_for_history and get_history_task().done()
+    market_ready = waiting_for_market and (market_poller.snapshot() is not None or market_poller.failures > 0)
+    if history_ready or market_ready:
+        st.rerun(scope='app')
+
+
+@st.fragment(key='debug')
+def debug_panel():
+    # Only shown while profiling (CRYPTODASH_PROFILE): the spans of every session of the process
+    registry = get_registry()
+    with st.expander("Performance 🔧"):
+        stats_tab, recent_tab = st.tabs(["Spans", "Recent"])
+        with stats_tab:
+            stats = registry.stats()
+            if stats:
+                st.dataframe(
+                    [{
+                        'Span': name,
+                        'Calls': span_stats['count'],
+                        'Mean (ms)': span_stats['mean_seconds'] * 1000,
+                        'Max (ms)': span_stats['max_seconds'] * 1000,
+                        'Last (ms)': span_stats['last_seconds'] * 1000,
+                        **({'Alloc (KiB)': span_stats['allocated_bytes_last'] / 1024} if registry.memory else {}),
+                    } for name, span_stats in stats.items()],
+                    hide_index=True,
+                    column_config={
+                        column: st.column_config.NumberColumn(format="%.1f")
+                        for column in ('Mean (ms)', 'Max (ms)', 'Last (ms)', 'Alloc (KiB)')
+                    }
+                )
+            else:
+                st.caption("No span recorded yet.")
+            traced = registry.traced_memory()
+            if traced is not None:
+                st.caption(f"Traced memory: {traced[0] / 2**20:.1f} MiB (peak {traced[1] / 2**20:.1f} MiB)")
+        with recent_tab:
+            st.dataframe(
+                [{
+                    'Span': recent['span'],
+                    'In': recent['parent'] or "",
+                    'ms': recent['seconds'] * 1000,
+                    'Thread': recent['thread'],
+                } for recent in registry.recent_spans()[:50]],
+                hide_index=True,
+                column_config={'ms': st.column_config.NumberColumn(format="%.1f")}
+            )
+
+        prometheus_col, json_col = st.columns(2)
+        with prometheus_col:
+            st.download_button("Prometheus", registry.to_prometheus(), file_name="cryptodash_metrics.prom",
+                               mime="text/plain", on_click='ignore')
+        with json_col:
+            st.download_button("JSON", registry.to_json(), file_name="cryptodash_metrics.json",
+                               mime="application/json", on_click='ignore')
+        st.button("Reset the spans", on_click=registry.reset)
+
+
+header_panel()
 st.markdown("---")
 
 # --- NAVIGATION ---
 st.sidebar.header("Navigation 🧭")
 
-historical_df = get_historical_data_cached()
-realtime_df = get_realtime_data_cached()
+market_poller = get_market_poller()
+history = load_history(wait=False)
+history_loader, historical_df, coin_index = history if history is not None else (None, None, None)
 
-if historical_df.empty:
+if coin_index is None:
+    # the market panels are already shown for the default coin while the history loads
     st.sidebar.warning("Loading historical data in progress...")
+    selected_crypto_name = DEFAULT_CRYPTO_NAME
+    selected_crypto_id = DEFAULT_CRYPTO_ID
+elif len(coin_index) == 0:
+    st.sidebar.warning("No historical data available.")
     selected_crypto_name = None
     selected_crypto_id = None
 else:
-    available_cryptos = sorted(historical_df['name'].unique())
-    crypto_name_to_id = historical_df[['name', 'id']].drop_duplicates().set_index('name')['id'].to_dict()
+    available_cryptos = coin_index.names
+    crypto_name_to_id = coin_index.name_to_id
 
     selected_crypto_name = st.sidebar.selectbox(
         "Select a cryptocurrency:",
         options=available_cryptos,
-        index=available_cryptos.index('Bitcoin') if 'Bitcoin' in available_cryptos else 0
+        index=available_cryptos.index(DEFAULT_CRYPTO_NAME) if DEFAULT_CRYPTO_NAME in available_cryptos else 0
     )
     selected_crypto_id = crypto_name_to_id.get(selected_crypto_name)
 
+# The currencies of the latest exchange rates: a change converts the USD data already in memory
+exchange_rates = get_exchange_rates()
+selected_currency = st.sidebar.selectbox(
+    "Currency:",
+    options=exchange_rates.currencies,
+    format_func=lambda code: f"{code.upper()} ({exchange_rates.unit(code)})",
+    key='currency'
+)
+
 st.sidebar.markdown("---")
 
 st.sidebar.header("Resources 📚")
@@ -100,54 +338,19 @@ st.sidebar.markdown(
 # --- MAIN STRUCTURE IN 3 COLUMNS ---
 col_left, col_center, col_right = st.columns([0.2, 0.55, 0.25])
 
-# --- LEFT COLUMN: Key Indicators (Selected Crypto) and TIME FILTERS ---
+# --- LEFT COLUMN: Key Indicators (Selected Crypto) ---
 with col_left:
-    st.subheader("Key Indicators (24h)")
-    if realtime_df is not None and not realtime_df.empty and selected_crypto_id:
-        selected_crypto_data_series = realtime_df[realtime_df['id'] == selected_crypto_id].iloc[0]
-        
-        st.markdown(f"**For {selected_crypto_data_series.get('name', 'N/A')} ({selected_crypto_data_series.get('symbol', 'N/A').upper()}):**")
-        
-        with st.container(border=True):
-            st.metric(label="Current Price", value=format_metric_value(selected_crypto_data_series.get('current_price'), prefix="$ ", decimals=4))
-        
-        with st.container(border=True):
-            st.markdown(f"**24h Change**: {format_metric_value(selected_crypto_data_series.get('price_change_percentage_24h'), suffix='%', decimals=2)}", unsafe_allow_html=True)
+    key_indicators_panel(selected_crypto_id, selected_currency)
 
-        with st.container(border=True):
-            st.metric(label="24h Trading Volume", value=format_metric_value(selected_crypto_data_series.get('total_volume'), prefix="$ ", decimals=0))
-        
-        with st.container(border=True):
-            st.metric(label="Market Cap", value=format_metric_value(selected_crypto_data_series.get('market_cap'), prefix="$ ", decimals=0))
-
-    else:
-        st.info("Select a cryptocurrency or wait for the data to load.")
-    
-    st.markdown("---")
-    st.subheader("Chart Filter")
-    
-    # --- Time filter buttons ---
-    time_periods = ['7d', '1m', '1y', 'All']
-    # Use st.radio or st.button in columns for buttons
-    selected_time_period = st.radio(
-        "Show history for:",
-        options=time_periods,
-        index=3, # 'All' is selected by default
-        horizontal=True # Display buttons in a row
-    )
-    # Store the selected period in Streamlit state for reuse
-    st.session_state.selected_time_period = selected_time_period
-    # --- End of time filter buttons ---
 
-
-# --- CENTER COLUMN: Price Evolution Chart + Detailed Info ---
+# --- CENTER COLUMN: Price Evolution Chart (with its filters) + Detailed Info ---
 with col_center:
     if selected_crypto_name and selected_crypto_id:
-        selected_crypto_info = realtime_df[realtime_df['id'] == selected_crypto_id].iloc[0] if realtime_df is not None and not realtime_df.empty else None
-        
-        if selected_crypto_info is not None:
-            image = selected_crypto_info.get('image', 'https://www.coingecko.com/favicon.ico')
-            symbol = selected_crypto_info.get('symbol', 'N/A').upper()
+        market_view = get_current_market_view(selected_currency)
+        cards = market_view.metric_cards(selected_crypto_id) if market_view is not None else None
+        if cards is not None:
+            image = cards['image']
+            symbol = cards['symbol']
             st.markdown(
                 f"## <img src='{image}' width='40'> {selected_crypto_name} ({symbol})",
                 unsafe_allow_html=True
@@ -156,99 +359,39 @@ with col_center:
              st.subheader(f"{selected_crypto_name}: Price Evolution")
 
         # Line 1: Evolution chart
-        if not historical_df.empty:
-            st.subheader("Historical Price Evolution")
-            # --- Pass the selected period to the plotting function ---
-            fig_price_evolution = plot_price_evolution_with_moving_averages(
-                historical_df, 
-                selected_crypto_id, 
-                st.session_state.get('selected_time_period', 'All') # Use the stored period
-            )
-            st.plotly_chart(fig_price_evolution, use_container_width=True)
+        if coin_index is not None:
+            chart_panel(selected_crypto_id, coin_index, historical_df, selected_currency)
         else:
-            st.warning(
-                "No historical data available for analysis. "
-                "Make sure to run `python src/fetch_and_save.py` "
-                "and that JSON files are present in the `data/` folder."
-            )
-        
+            st.subheader("Historical Price Evolution")
+            st.info("Loading the price history...")
+
         st.markdown("---")
 
-        # Line 2: Detailed Information/Insights (Styled Table) 
-        st.subheader("Detailed Information")
-        if selected_crypto_info is not None:
-            details_df = pd.DataFrame({
-                "Characteristic": [
-                    "Current Price", "24h Change (%)", "Market Cap",
-                    "24h Volume", "Lowest Price (24h)", "Highest Price (24h)"
-                ],
-                "Value": [
-                    format_dataframe_value(selected_crypto_info.get('current_price'), prefix="$ ", decimals=4),
-                    format_dataframe_value(selected_crypto_info.get('price_change_percentage_24h'), suffix="%", decimals=2),
-                    format_dataframe_value(selected_crypto_info.get('market_cap'), prefix="$ ", decimals=0),
-                    format_dataframe_value(selected_crypto_info.get('total_volume'), prefix="$ ", decimals=0),
-                    format_dataframe_value(selected_crypto_info.get('low_24h'), prefix="$ ", decimals=4),
-                    format_dataframe_value(selected_crypto_info.get('high_24h'), prefix="$ ", decimals=4)
-                ]
-            })
-            st.dataframe(details_df.set_index("Characteristic"), use_container_width=True)
-        else:
-            st.info("Select a cryptocurrency to view detailed information.")
+        details_panel(selected_crypto_id, selected_currency)
     else:
         st.info("Please select a cryptocurrency to display the analysis.")
 
 
 # --- RIGHT COLUMN: Top 10 + Latest Daily Update ---
 with col_right:
-    st.subheader("Top 10 Cryptos 🏆")
-    if realtime_df is not None and not realtime_df.empty:
-        top_10_display_df = realtime_df.head(10).copy()
-        
-        top_10_display_df['Crypto'] = top_10_display_df.apply(
-            lambda row: f"{row.get('name', 'N/A')} ({row.get('symbol', 'N/A').upper()})",
-            axis=1
-        )
-        top_10_display_df['Current Price'] = top_10_display_df['current_price'].apply(lambda x: format_dataframe_value(x, prefix="$ ", decimals=2))
-        top_10_display_df['24h Change (%)'] = top_10_display_df['price_change_percentage_24h']
-        top_10_display_df['Market Cap'] = top_10_display_df['market_cap'].apply(lambda x: format_dataframe_value(x, prefix="$ ", decimals=0))
-        top_10_display_df['Image URL'] = top_10_display_df['image'].apply(lambda x: x if isinstance(x, str) else "https://www.coingecko.com/favicon.ico")
+    top10_panel(selected_currency)
 
-        final_top_10_df = top_10_display_df[['Image URL', 'Crypto', 'Current Price', '24h Change (%)', 'Market Cap']]
-        final_top_10_df.columns = ['Image', 'Crypto', 'Current Price', '24h Change (%)', 'Market Cap']
+    st.markdown("---")
 
-        st.markdown("##### Ranking by Market Cap")
-        st.dataframe(
-            final_top_10_df.style.map(
-                lambda x: f"color: {'green' if x >= 0 else 'red'}",
-                subset=['24h Change (%)']
-            ).format(
-                {'24h Change (%)': "{:.2f}%"},
-                na_rep="N/A"
-            ),
-            hide_index=True,
-            use_container_width=True,
-            column_config={
-                "Image": st.column_config.ImageColumn("Logo", width=40),
-                "Crypto": st.column_config.Column("Name (Symbol)", width="medium"),
-                "Current Price": st.column_config.Column(width="small"),
-                "24h Change (%)": st.column_config.Column("24h Change (%)", width="small", help="Price change over the last 24 hours"),
-                "Market Cap": st.column_config.Column(width="medium"),
-            }
-        )
+    history_status_panel(coin_index)
 
-    else:
-        st.warning("Unable to load the Top 10 cryptos.")
 
-    st.markdown("---")
+# --- The first load of the history starts once the placeholders are painted (a no-op if it
+# already started), and the page reruns when the data loading in the background is ready ---
+get_history_task().start()
+waiting_for_history = coin_index is None
+waiting_for_market = market_poller.snapshot() is None and market_poller.failures == 0
+if waiting_for_history or waiting_for_market:
+    loading_watcher(waiting_for_history, waiting_for_market)
 
-    st.subheader("History 🗓️")
-    data_dir = 'data'
-    json_files = [f for f in os.listdir(data_dir) if f.startswith('crypto_data_') and f.endswith('.json')]
-    if json_files:
-        latest_file = sorted(json_files, reverse=True)[0]
-        latest_date_str = latest_file.replace('crypto_data_', '').replace('.json', '')
-        st.info(f"Latest saved historical data: **{latest_date_str}**")
-        st.write("These data are used for evolution charts.")
-    else:
-        st.info("No historical saves found.")
-        st.write("Run `python src/fetch_and_save.py` to start saving data.")
\ No newline at end of file
+
+# --- Debug panel, after the other panels so that it shows the spans of this run ---
+if is_enabled():
+    get_metrics_server()
+    with st.sidebar:
+        debug_panel()
@@ -0,0 +1,279 @@
+# src/backfill.py
+
+import pandas as pd
+import requests
+import argparse
+import logging
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from src.api.client import CoinGeckoClient, get_default_client
+from src.fetch_and_save import save_data_to_json
+from src.utils.history_store import list_snapshot_files
+from src.utils.ingest import snapshot_date_from_filename
+
+PLAN_FILE = 'plan.json'
+
+
+def find_missing_dates(data_dir='data', start=None, end=None):
+    """
+    Lists the days between start and end (inclusive) that have no snapshot file.
+    Args:
+        data_dir (str): The directory where the JSON files are stored.
+        start (date): First day to check (default: the first snapshot of the archive).
+        end (date): Last day to check (default: yesterday, UTC).
+    Returns:
+        list: The missing days as 'YYYY-MM-DD' strings, sorted.
+    """
+    existing = {snapshot_date_from_filename(f) for f in list_snapshot_files(data_dir)}
+    if start is None:
+        if not existing:
+            return []
+        start = datetime.strptime(min(existing), '%Y-%m-%d').date()
+    end = end or (datetime.now(timezone.utc) - timedelta(days=1)).date()
+    days = pd.date_range(start, end, freq='D').strftime('%Y-%m-%d')
+    return [day for day in days if day not in existing]
+
+
+def load_coin_metadata(data_dir='data', limit=100):
+    """
+    Reads the coins (id, symbol, name, image) of the most recent snapshot.
+    Returns:
+        list: Up to `limit` coin records, in the order of the snapshot.
+    """
+    files = list_snapshot_files(data_dir)
+    if not files:
+        return []
+    with open(os.path.join(data_dir, files[-1]), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [
+        {'id': r['id'], 'symbol': r.get('symbol', r.get('symbole')), 'name': r.get('name'), 'image': r.get('image')}
+        for r in data[:limit]
+    ]
+
+
+def fetch_coin_days(client: CoinGeckoClient, coin_id, days, vs_currency='usd'):
+    """
+    Reconstructs the daily values of one coin for the given days from /market_chart/range.
+    The value of a day is the first point of that day (UTC), like the daily cron snapshot;
+    the 24h change and the 24h low/high are derived from the points of the previous 24 hours.
+    Args:
+        client (CoinGeckoClient): The API client (its token bucket is the global rate budget).
+        coin_id (str): The coin to fetch.
+        days (list): The 'YYYY-MM-DD' days to reconstruct.
+    Returns:
+        dict: 'YYYY-MM-DD' -> values, for the days the API returned data for.
+    """
+    first = datetime.strptime(days[0], '%Y-%m-%d').replace(tzinfo=timezone.utc) - timedelta(days=1)
+    last = datetime.strptime(days[-1], '%Y-%m-%d').replace(tzinfo=timezone.utc) + timedelta(days=1)
+    data = client.get_json(f"coins/{coin_id}/market_chart/range", {
+        'vs_currency': vs_currency, 'from': int(first.timestamp()), 'to': int(last.timestamp())
+    })
+    if not data or not data.get('prices'):
+        return {}
+
+    points = pd.DataFrame(data['prices'], columns=['ms', 'current_price'])
+    for key, column in (('market_caps', 'market_cap'), ('total_volumes', 'total_volume')):
+        values = dict(map(tuple, data.get(key, [])))
+        points[column] = points['ms'].map(values)
+    points['time'] = pd.to_datetime(points['ms'], unit='ms')
+    points = points.sort_values('time').set_index('time')
+
+    result = {}
+    for day in days:
+        day_start = pd.Timestamp(day)
+        today = points.loc[day_start:day_start + timedelta(days=1) - timedelta(microseconds=1)]
+        if today.empty:
+            continue
+        point = today.iloc[0]
+        previous = points.loc[point.name - timedelta(hours=24):point.name]
+        past = points.loc[:point.name - timedelta(hours=23, minutes=30)]
+        reference = past.iloc[-1] if not past.empty else None
+        result[day] = {
+            'current_price': float(point['current_price']),
+            'market_cap': None if pd.isna(point['market_cap']) else float(point['market_cap']),
+            'total_volume': None if pd.isna(point['total_volume']) else float(point['total_volume']),
+            # only meaningful with intraday points (ranges of up to 90 days)
+            'low_24h': float(previous['current_price'].min()) if len(previous) > 2 else None,
+            'high_24h': float(previous['current_price'].max()) if len(previous) > 2 else None,
+            'price_change_percentage_24h': _change(point['current_price'], reference, 'current_price'),
+            'market_cap_change_percentage_24h': _change(point['market_cap'], reference, 'market_cap'),
+            'collect_timestamp': point.name.isoformat(),
+        }
+    return result
+
+
+def _change(value, reference, column):
+    if reference is None or pd.isna(value) or pd.isna(reference[column]) or reference[column] == 0:
+        return None
+    return float((value - reference[column]) / reference[column] * 100)
+
+
+def _load_plan(checkpoint_dir, arguments):
+    """
+    Returns the saved plan if it was made with the same arguments, so that a killed run
+    resumes it even if its defaults moved meanwhile (yesterday, the latest snapshot).
+    """
+    path = os.path.join(checkpoint_dir, PLAN_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    return saved if saved.get('arguments') == arguments else None
+
+
+def _save_plan(checkpoint_dir, plan):
+    """
+    Saves a new plan. The checkpoints of the previous plan are kept if they still apply:
+    the coin is still planned and every planned day was fetched.
+    """
+    path = os.path.join(checkpoint_dir, PLAN_FILE)
+    previous = None
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    covered = previous is not None and set(plan['days']) <= set(previous.get('days', []))
+    kept = {_checkpoint_name(coin['id']) for coin in plan['coins']} if covered else set()
+    discarded = 0
+    for f in os.listdir(checkpoint_dir):
+        if f.endswith('.json') and f != PLAN_FILE and f[:-len('.json')] not in kept:
+            os.remove(os.path.join(checkpoint_dir, f))
+            discarded += 1
+    if discarded:
+        logging.warning(f"[{datetime.now().isoformat()}] Backfill plan changed, {discarded} checkpoints discarded.")
+    _write_json(path, plan)
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def backfill(data_dir='data', start=None, end=None, limit=100, workers=4, client=None, checkpoint_dir=None):
+    """
+    Reconstructs the missing daily snapshots of the archive.
+    The coins are fetched by a bounded pool of workers sharing the rate budget of
+    one client. Each finished coin is checkpointed, so a killed run resumes with
+    the coins that were not fetched yet: a run with the same arguments resumes the
+    saved plan (days and coins). A coin the API answers with a client error (e.g. a
+    delisted coin) is done with no days. Once every coin is done, one file per
+    missing day is written in the schema of the daily snapshots.
+    Args:
+        data_dir (str): The directory where the JSON files are stored.
+        start, end (date): The days to check (see find_missing_dates).
+        limit (int): Number of coins to backfill, taken from the most recent snapshot.
+        workers (int): Number of coins fetched concurrently.
+        client (CoinGeckoClient): The API client (default is the client shared by the process).
+        checkpoint_dir (str): Where the progress is saved (default: 'data/.backfill').
+    Returns:
+        list: The paths of the files written.
+    """
+    client = client or get_default_client()
+    checkpoint_dir = checkpoint_dir or os.path.join(data_dir, '.backfill')
+    arguments = {'start': start and str(start), 'end': end and str(end), 'limit': limit}
+    plan = _load_plan(checkpoint_dir, arguments)
+    resumed = plan is not None
+    if resumed:
+        # the days written since the plan was made (by the daily job) are left out
+        existing = {snapshot_date_from_filename(f) for f in list_snapshot_files(data_dir)}
+        days = [day for day in plan['days'] if day not in existing]
+        coins = plan['coins']
+    else:
+        days = find_missing_dates(data_dir, start, end)
+        coins = load_coin_metadata(data_dir, limit)
+    if not days or not coins:
+        logging.info(f"[{datetime.now().isoformat()}] Nothing to backfill.")
+        if resumed:
+            shutil.rmtree(checkpoint_dir)
+        return []
+    if not resumed:
+        _save_plan(checkpoint_dir, {'arguments': arguments, 'days': days, 'coins': coins})
+
+    done = {f[:-len('.json')] for f in os.listdir(checkpoint_dir) if f.endswith('.json') and f != PLAN_FILE}
+    todo = [coin['id'] for coin in coins if _checkpoint_name(coin['id']) not in done]
+    logging.info(f"[{datetime.now().isoformat()}] Backfilling {len(days)} days for {len(coins)} coins "
+                 f"({len(todo)} left{', resumed' if resumed else ''}).")
+
+    def fetch(coin_id):
+        try:
+            values = fetch_coin_days(client, coin_id, days)
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            # rate limits and server errors fail the run (it resumes), like the auth errors;
+            # another 4xx (e.g. a 404 for a delisted coin) would give the same answer again
+            if status is None or not 400 <= status < 500 or status in (401, 403, 408, 429):
+                raise
+            logging.warning(f"[{datetime.now().isoformat()}] {coin_id}: HTTP {status}, no days to reconstruct.")
+            values = {}
+        _write_json(os.path.join(checkpoint_dir, f"{_checkpoint_name(coin_id)}.json"), values)
+        return coin_id, len(values)
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch, coin_id): coin_id for coin_id in todo}
+        for future in as_completed(futures):
+            try:
+                coin_id, count = future.result()
+                logging.info(f"[{datetime.now().isoformat()}] {coin_id}: {count} days reconstructed.")
+            except (requests.exceptions.RequestException, ValueError) as e:
+                failed.append(futures[future])
+                logging.error(f"[{datetime.now().isoformat()}] Backfill of {futures[future]} failed: {e}")
+    if failed:
+        logging.error(f"[{datetime.now().isoformat()}] {len(failed)} coins failed, run the backfill again to resume.")
+        return []
+
+    written = write_backfilled_snapshots(data_dir, checkpoint_dir, days, coins)
+    shutil.rmtree(checkpoint_dir)
+    return written
+
+
+def _checkpoint_name(coin_id):
+    return coin_id.replace(os.sep, '_')
+
+
+def write_backfilled_snapshots(data_dir, checkpoint_dir, days, coins):
+    """Writes one 'crypto_data_YYYY-MM-DD.json' file per day from the coin checkpoints."""
+    by_day = {day: [] for day in days}
+    for coin in coins:
+        with open(os.path.join(checkpoint_dir, f"{_checkpoint_name(coin['id'])}.json"), 'r', encoding='utf-8') as f:
+            values = json.load(f)
+        for day, record in values.items():
+            if day in by_day:
+                by_day[day].append({**coin, **record})
+
+    columns = ['id', 'symbol', 'name', 'current_price', 'market_cap', 'market_cap_change_percentage_24h',
+               'total_volume', 'price_change_percentage_24h', 'image', 'low_24h', 'high_24h', 'collect_timestamp']
+    written = []
+    for day, records in by_day.items():
+        if not records:
+            continue
+        df = pd.DataFrame(records).reindex(columns=columns)
+        df = df.sort_values('market_cap', ascending=False, na_position='last')
+        df = df.astype(object).where(df.notna(), None)  # null instead of NaN in the JSON
+        file_path = os.path.join(data_dir, f"crypto_data_{day}.json")
+        tmp_path = f"{file_path}.tmp"
+        save_data_to_json(df, tmp_path)
+        if os.path.exists(tmp_path):
+            os.replace(tmp_path, file_path)
+            written.append(file_path)
+    logging.info(f"[{datetime.now().isoformat()}] {len(written)} backfilled snapshots written.")
+    return written
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Reconstruct the missing daily snapshots of data/.")
+    parser.add_argument('--start', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(), default=None,
+                        help="first day to backfill (default: first snapshot of the archive)")
+    parser.add_argument('--end', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(), default=None,
+                        help="last day to backfill (default: yesterday)")
+    parser.add_argument('--limit', type=int, default=100, help="number of coins, from the latest snapshot")
+    parser.add_argument('--workers', type=int, default=4, help="coins fetched concurrently")
+    parser.add_argument('--data-dir', default='data')
+    args = parser.parse_args()
+    backfill(args.data_dir, args.start, args.end, args.limit, args.workers)
@@ -1,11 +1,13 @@
 # src/fetch_and_save.py
 
 import pandas as pd
+import argparse
 import logging
 import json
 import os
 from datetime import datetime
 from src.api.getdata import get_top_cryptos 
+from src.utils.snapshot_log import append_snapshot, compact_finished_days
 
 
 def fetch_crypto_data(limit=100):
@@ -68,6 +70,26 @@ def main_save_daily_crypto_data():
     save_data_to_json(crypto_data, file_path)
 
 
+def main_save_intraday_crypto_data(data_dir='data'):
+    """
+    Appends a snapshot to the intraday log (can run every few minutes), then rolls
+    the finished days of the log into their daily files.
+    """
+    crypto_data = fetch_crypto_data(limit=100)
+    if crypto_data is not None:
+        segment_path = append_snapshot(crypto_data, os.path.join(data_dir, 'intraday'))
+        logging.info(f"[{datetime.now().isoformat()}] Snapshot appended to : {segment_path}")
+
+    compact_finished_days(os.path.join(data_dir, 'intraday'), data_dir)
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    main_save_daily_crypto_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Save the current top cryptocurrencies.")
+    parser.add_argument('--intraday', action='store_true',
+                        help="append to the intraday log (data/intraday) instead of overwriting the daily file")
+    args = parser.parse_args()
+    if args.intraday:
+        main_save_intraday_crypto_data()
+    else:
+        main_save_daily_crypto_data()
\ No newline at end of file
@@ -0,0 +1,145 @@
+# src/pages/analytics.py
+
+import streamlit as st
+import os
+import sys
+# --- environment config ---
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+# Module imports (light: the chart and table modules are imported by the panels)
+from src.resources import load_history, get_history_task, get_market_matrix, get_figure_cache
+
+# --- streamlit config ---
+st.set_page_config(
+    page_title="Market Analytics - CryptoDashboard",
+    page_icon="📊",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Days of each period of the filters (None: the whole archive)
+PERIODS = {'30d': 30, '90d': 90, '1y': 365, 'All': None}
+LOADING_POLL = 0.25  # seconds between two checks of the history loading in the background
+
+
+@st.fragment(key='loading', run_every=LOADING_POLL)
+def loading_watcher():
+    # Only rendered while the history loads in the background: reruns the page once it is loaded
+    if get_history_task().done():
+        st.rerun(scope='app')
+
+
+@st.fragment(key='correlations')
+def correlations_panel(market_matrix, names):
+    from src.visualizations.plots import plot_correlation_heatmap
+    st.subheader("Correlations")
+    period_col, coins_col = st.columns([0.5, 0.5])
+    with period_col:
+        period = st.radio("Returns over:", options=list(PERIODS), index=2, horizontal=True, key='correlation_period')
+    with coins_col:
+        top = st.slider("Largest coins:", min_value=5, max_value=30, value=10, key='correlation_top')
+    fig = get_figure_cache().get_or_build(
+        market_matrix.version,
+        ('correlations', period, top),
+        lambda: plot_correlation_heatmap(
+            market_matrix.correlations(market_matrix.largest(top), days=PERIODS[period]), names, period
+        )
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment(key='rolling_correlations')
+def rolling_correlations_panel(market_matrix, names):
+    from src.visualizations.plots import plot_rolling_correlation
+    st.subheader("Rolling Correlation")
+    largest = market_matrix.largest(10)
+    reference_col, window_col = st.columns([0.5, 0.5])
+    with reference_col:
+        reference = st.selectbox(
+            "Reference:", options=largest, format_func=lambda coin_id: names.get(coin_id, coin_id),
+            key='rolling_reference'
+        )
+    with window_col:
+        window = st.radio("Window:", options=[7, 30, 90], index=1, horizontal=True,
+                          format_func=lambda days: f"{days}d", key='rolling_window')
+    others = [coin_id for coin_id in largest if coin_id != reference][:5]
+    fig = get_figure_cache().get_or_build(
+        market_matrix.version,
+        ('rolling_correlations', reference, window),
+        lambda: plot_rolling_correlation(
+            market_matrix.rolling_correlations(others, reference, window=window, min_periods=max(5, window * 2 // 3)),
+            names.get(reference, reference), window, names
+        )
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment(key='dominance')
+def dominance_panel(market_matrix, names):
+    from src.visualizations.plots import plot_dominance
+    st.subheader("Market Cap Dominance")
+    period = st.radio("Show:", options=list(PERIODS), index=3, horizontal=True, key='dominance_period')
+    fig = get_figure_cache().get_or_build(
+        market_matrix.version,
+        ('dominance', period),
+        lambda: plot_dominance(market_matrix.dominance(top=10, days=PERIODS[period]), names, period)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment(key='return_ranking')
+def return_ranking_panel(market_matrix, names):
+    from src.utils.data_processing import format_numbers
+    st.subheader("Return Ranking")
+    period = st.radio("Returns over:", options=list(PERIODS), index=0, horizontal=True, key='ranking_period')
+    ranking = market_matrix.return_ranking(days=PERIODS[period])
+    if ranking.empty:
+        st.info("Not enough history to rank the returns.")
+        return
+    table = ranking.assign(
+        Crypto=ranking['id'].map(lambda coin_id: names.get(coin_id, coin_id)),
+        Start=format_numbers(ranking['start_price'], prefix="$ ", decimals=4),
+        End=format_numbers(ranking['end_price'], prefix="$ ", decimals=4),
+    )[['Crypto', 'Start', 'End', 'return']]
+    best_col, worst_col = st.columns([0.5, 0.5])
+    column_config = {'return': st.column_config.NumberColumn("Return", format="%.2f%%")}
+    with best_col:
+        st.markdown("##### Best performers")
+        st.dataframe(table.head(10), hide_index=True, use_container_width=True, column_config=column_config)
+    with worst_col:
+        st.markdown("##### Worst performers")
+        st.dataframe(table.tail(10).iloc[::-1], hide_index=True, use_container_width=True, column_config=column_config)
+
+
+st.markdown("## Market Analytics")
+st.markdown("---")
+
+# the page is painted with a placeholder while the first load of the history runs in the background
+history = load_history(wait=False)
+history_loader, historical_df, coin_index = history if history is not None else (None, None, None)
+market_matrix = get_market_matrix(coin_index) if coin_index is not None else None
+
+if market_matrix is None:
+    st.info("Loading the historical data...")
+    get_history_task().start()
+    loading_watcher()
+elif len(market_matrix) == 0:
+    st.warning(
+        "No historical data available for analysis. "
+        "Make sure to run `python src/fetch_and_save.py` "
+        "and that JSON files are present in the `data/` folder."
+    )
+else:
+    dates = market_matrix.dates  # read once: another session may extend the matrices meanwhile
+    st.caption(f"{len(market_matrix)} coins over {len(dates)} days ({dates[0]} to {dates[-1]})")
+    names = coin_index.id_to_name
+    left_col, right_col = st.columns([0.5, 0.5])
+    with left_col:
+        correlations_panel(market_matrix, names)
+        dominance_panel(market_matrix, names)
+    with right_col:
+        rolling_correlations_panel(market_matrix, names)
+        return_ranking_panel(market_matrix, names)
@@ -0,0 +1,154 @@
+# src/pages/screener.py
+
+import streamlit as st
+import os
+import sys
+# --- environment config ---
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+# Module imports (light: the screener and table modules are imported by the panel)
+from src.resources import load_history, get_history_task, get_market_poller, get_current_screener, get_exchange_rates
+from src.utils.fx import BASE_CURRENCY
+from src.utils.instrumentation import instrumented
+
+# --- streamlit config ---
+st.set_page_config(
+    page_title="Coin Screener - CryptoDashboard",
+    page_icon="🔎",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+MARKET_PANEL_REFRESH = 30  # seconds
+LOADING_POLL = 0.25  # seconds between two checks of the data still loading in the background
+# Ends of the range sliders (percent): a slider at its end means no bound
+CHANGE_LIMIT = 25
+MA_DISTANCE_LIMIT = 50
+# Minimal 24h volume (USD)
+VOLUME_FLOORS = {'Any': None, '> $1M': 1e6, '> $10M': 1e7, '> $100M': 1e8, '> $1B': 1e9}
+RESULT_LIMITS = [50, 100, 250, 1000]
+
+
+def _bounds(values, limit):
+    low, high = values
+    return (None if low <= -limit else low, None if high >= limit else high)
+
+
+@st.fragment(key='loading', run_every=LOADING_POLL)
+def loading_watcher(waiting_for_history, waiting_for_market):
+    # Only rendered while data is loading in the background: reruns the page as soon as it is ready
+    market_poller = get_market_poller()
+    history_ready = waiting_for_history and get_history_task().done()
+    market_ready = waiting_for_market and (market_poller.snapshot() is not None or market_poller.failures > 0)
+    if history_ready or market_ready:
+        st.rerun(scope='app')
+
+
+@st.fragment(key='screener', run_every=MARKET_PANEL_REFRESH)
+@instrumented('panel.screener')
+def screener_panel(coin_index):
+    screener = get_current_screener(coin_index)
+    if screener is None:
+        if get_market_poller().failures == 0:
+            st.info("Market data is loading...")
+        else:
+            st.warning("Unable to load the market data.")
+        return
+
+    from src.utils.data_processing import format_numbers
+    from src.utils.screener import MARKET_CAP_BANDS, SORT_KEYS
+
+    # --- Filters: a query only reads the precomputed orders and index of the snapshot ---
+    search_col, bands_col, volume_col = st.columns([0.3, 0.5, 0.2])
+    with search_col:
+        search = st.text_input("Search (name or symbol):", key='screener_search')
+    with bands_col:
+        bands = st.multiselect("Market cap:", options=list(MARKET_CAP_BANDS), key='screener_bands')
+    with volume_col:
+        volume_floor = st.selectbox("24h volume:", options=list(VOLUME_FLOORS), key='screener_volume')
+
+    change_col, ma_col = st.columns([0.5, 0.5])
+    with change_col:
+        change_range = st.slider("24h change (%):", min_value=-CHANGE_LIMIT, max_value=CHANGE_LIMIT,
+                                 value=(-CHANGE_LIMIT, CHANGE_LIMIT), key='screener_change')
+    with ma_col:
+        ma_distance_range = st.slider(
+            "Distance from the 30-day MA (%):", min_value=-MA_DISTANCE_LIMIT, max_value=MA_DISTANCE_LIMIT,
+            value=(-MA_DISTANCE_LIMIT, MA_DISTANCE_LIMIT), disabled=not screener.has_ma, key='screener_ma_distance',
+            help=None if screener.has_ma else "Available once the historical data is loaded."
+        )
+
+    rates = get_exchange_rates()
+    sort_col, order_col, currency_col, limit_col = st.columns([0.35, 0.25, 0.2, 0.2])
+    with sort_col:
+        sort_label = st.selectbox("Sort by:", options=list(SORT_KEYS), key='screener_sort')
+    with order_col:
+        descending = st.radio("Order:", options=[True, False], horizontal=True, key='screener_descending',
+                              format_func=lambda value: "Descending" if value else "Ascending")
+    with currency_col:
+        currency = st.selectbox("Currency:", options=rates.currencies, key='screener_currency',
+                                format_func=lambda code: f"{code.upper()} ({rates.unit(code)})")
+    with limit_col:
+        limit = st.selectbox("Show:", options=RESULT_LIMITS, index=1, key='screener_limit')
+
+    results, matches = screener.query(
+        search=search,
+        market_cap_bands=bands,
+        change_range=_bounds(change_range, CHANGE_LIMIT),
+        min_volume=VOLUME_FLOORS[volume_floor],
+        ma_distance_range=_bounds(ma_distance_range, MA_DISTANCE_LIMIT) if screener.has_ma else (None, None),
+        sort_by=SORT_KEYS[sort_label],
+        descending=descending,
+        limit=limit
+    )
+    st.caption(f"{matches:,} of {len(screener):,} coins match"
+               + (f", the first {limit:,} are shown" if matches > limit else ""))
+    if results.empty:
+        st.info("No coin matches the filters.")
+        return
+
+    # only the rows shown are converted and formatted
+    if currency not in rates:
+        currency = BASE_CURRENCY
+    results = rates.convert(results, currency, ['current_price', 'market_cap', 'total_volume'])
+    unit = rates.unit(currency)
+    table = results.assign(
+        Crypto=results['name'] + " (" + results['symbol'] + ")",
+        Price=format_numbers(results['current_price'], prefix=f"{unit} ", decimals=4),
+        MarketCap=format_numbers(results['market_cap'], prefix=f"{unit} ", decimals=0),
+        Volume=format_numbers(results['total_volume'], prefix=f"{unit} ", decimals=0),
+    )[['rank', 'image', 'Crypto', 'Price', 'price_change_percentage_24h', 'MarketCap', 'Volume', 'ma_30_distance']]
+    st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'rank': st.column_config.NumberColumn("#", width=40),
+            'image': st.column_config.ImageColumn("Logo", width=40),
+            'Crypto': st.column_config.Column("Name (Symbol)", width="medium"),
+            'price_change_percentage_24h': st.column_config.NumberColumn("24h Change", format="%.2f%%"),
+            'MarketCap': st.column_config.Column("Market Cap"),
+            'Volume': st.column_config.Column("24h Volume"),
+            'ma_30_distance': st.column_config.NumberColumn("vs MA 30d", format="%.2f%%"),
+        }
+    )
+
+
+st.markdown("## Coin Screener")
+st.markdown("---")
+
+# the screener is shown as soon as the markets are fetched; the history only adds the 30-day MA
+history = load_history(wait=False)
+coin_index = history[2] if history is not None else None
+
+screener_panel(coin_index)
+
+get_history_task().start()
+market_poller = get_market_poller()
+waiting_for_history = coin_index is None
+waiting_for_market = market_poller.snapshot() is None and market_poller.failures == 0
+if waiting_for_history or waiting_for_market:
+    loading_watcher(waiting_for_history, waiting_for_market)
@@ -0,0 +1,170 @@
+# src/resources.py
+#
+# Cached resources shared by every page of the app (and every session of the process).
+#
+# The heavy modules (pandas, numpy, plotly, requests) are imported inside the functions
+# that need them: the first paint of a cold worker only waits for Streamlit, and the
+# first load of the history runs in a background thread (get_history_task).
+
+import importlib
+import streamlit as st
+from src.api.poller import MARKET_COINS, MarketPoller, poll_interval
+from src.utils.background import BackgroundTask
+from src.utils.fx import BASE_CURRENCY, DISPLAY_CURRENCIES, ExchangeRates
+from src.utils.instrumentation import METRICS_PORT, is_enabled, span, start_metrics_server
+
+
+def _build_coin_index(version, historical_df, indicator_engine):
+    from src.utils.coin_index import CoinIndex
+    with span('history.coin_index'):
+        coin_index = CoinIndex(historical_df, version=version)
+    with span('indicators.sync'):
+        indicator_engine.sync(coin_index)
+        indicator_engine.save()
+    return coin_index
+
+def _first_history_load():
+    # Runs in the history-load thread, without any Streamlit call: the cached resources
+    # below hand out the loader, the indicator engine and the index it built
+    from src.utils.history_loader import IncrementalHistoryLoader
+    from src.utils.indicators import IndicatorEngine
+    with span('app.first_history_load'):
+        history_loader = IncrementalHistoryLoader(min_interval=60, shared=True)
+        historical_df = history_loader.refresh(force=True)
+        indicator_engine = IndicatorEngine()
+        coin_index = _build_coin_index(history_loader.version, historical_df, indicator_engine)
+        _preload_chart_modules()
+    return history_loader, indicator_engine, coin_index
+
+def _preload_chart_modules():
+    # The chart panels import the plots module (and plotly) as soon as the history is there:
+    # importing it in the history-load thread keeps that cost out of the first full run
+    importlib.import_module('src.visualizations.plots')
+
+@st.cache_resource
+def get_history_task():
+    # The first load of the history (parsing, index, indicators) runs once per process in
+    # a background thread, started by the first page once its placeholders are painted
+    return BackgroundTask(_first_history_load, name='history-load')
+
+@st.cache_resource
+def get_history_loader():
+    # One loader per process: new snapshots are appended to the data it already holds,
+    # and the frame is memory-mapped so that every worker process shares the same pages
+    return get_history_task().start().result()[0]
+
+@st.cache_resource
+def get_indicator_engine():
+    # Indicators saved next to the history store, updated day by day
+    return get_history_task().start().result()[1]
+
+@st.cache_resource(max_entries=2)
+def get_coin_index(version, _historical_df):
+    # Built once per version of the historical data, shared by every session
+    first_index = get_history_task().start().result()[2]
+    if first_index.version == version:
+        return first_index
+    return _build_coin_index(version, _historical_df, get_indicator_engine())
+
+@st.cache_resource
+def get_figure_cache():
+    # Charts shared by every session until a new snapshot changes the history version
+    from src.visualizations.figure_cache import FigureCache
+    return FigureCache(max_entries=64)
+
+@st.cache_resource(on_release=lambda poller: poller.stop(timeout=0))
+def get_market_poller():
+    # One poller per process: it fetches the markets in the background and every session
+    # reads its latest snapshot, so a script run never waits on the API (every minute per page of coins)
+    return MarketPoller(interval=poll_interval(MARKET_COINS), limit=MARKET_COINS).start()
+
+@st.cache_resource(max_entries=2 * len(DISPLAY_CURRENCIES))
+def get_market_view(version, fetched_at, currency, _market_snapshot):
+    # Display tables formatted once per market snapshot and currency, shared by every session:
+    # the amounts are converted locally with the exchange rates of the snapshot
+    from src.utils.data_processing import MarketView
+    return MarketView(_market_snapshot.data, version=version, currency=currency, rates=_market_snapshot.rates)
+
+def get_current_market_view(currency=BASE_CURRENCY):
+    """
+    Returns the MarketView of the latest market snapshot in a display currency (USD if the
+    snapshot has no rate for it), None until the first snapshot is published.
+    """
+    market_snapshot = get_market_poller().snapshot()
+    if market_snapshot is None:
+        return None
+    if currency not in market_snapshot.rates:
+        currency = BASE_CURRENCY
+    return get_market_view(market_snapshot.version, market_snapshot.fetched_at, currency, market_snapshot)
+
+def get_exchange_rates():
+    """Returns the exchange rates of the latest market snapshot (USD alone until the first one)."""
+    market_snapshot = get_market_poller().snapshot()
+    return market_snapshot.rates if market_snapshot is not None else ExchangeRates.base_only()
+
+@st.cache_resource(max_entries=2)
+def get_screener(market_version, history_version, _market_snapshot, _coin_index):
+    # Sort orders and prefix index built once per market snapshot and history version, shared by every session
+    from src.utils.screener import Screener
+    ma_30 = None
+    if _coin_index is not None and 'ma_30' in _coin_index.values:
+        ma_30 = _coin_index.latest('ma_30')
+    return Screener(_market_snapshot.data, ma_30=ma_30, version=(market_version, history_version))
+
+def get_current_screener(coin_index=None):
+    """
+    Returns the Screener of the latest market snapshot, None until the first one is published.
+    Args:
+        coin_index (CoinIndex): The history, for the distance from the 30-day MA (None while it loads).
+    """
+    market_snapshot = get_market_poller().snapshot()
+    if market_snapshot is None:
+        return None
+    history_version = coin_index.version if coin_index is not None else None
+    return get_screener(market_snapshot.version, history_version, market_snapshot, coin_index)
+
+@st.cache_resource
+def get_market_matrix_store():
+    # One matrix per process, extended with the new days of each version of the history
+    from src.utils.market_matrix import MarketMatrix
+    return MarketMatrix()
+
+def get_market_matrix(coin_index):
+    """Returns the date × coin matrices, synced with the given CoinIndex."""
+    market_matrix = get_market_matrix_store()
+    if market_matrix.version != coin_index.version:
+        with span('analytics.matrix_sync'):
+            market_matrix.sync(coin_index)
+    return market_matrix
+
+@st.cache_resource(on_release=lambda server: server.shutdown() if server is not None else None)
+def get_metrics_server():
+    # One metrics endpoint per process, only while profiling and when CRYPTODASH_METRICS_PORT is set
+    if not is_enabled() or not METRICS_PORT:
+        return None
+    return start_metrics_server(METRICS_PORT)
+
+
+def load_history(wait=True):
+    """
+    Returns the up-to-date history loader, its frame and the CoinIndex of its version.
+    Args:
+        wait (bool): Start the first load of the process if needed and wait for it; with
+            wait=False, None is returned until it is done (get_history_task().start() starts it).
+    Returns:
+        tuple: (IncrementalHistoryLoader, pd.DataFrame, CoinIndex), None while loading (wait=False)
+        or if the first load failed: the error is shown and the next start() loads again.
+    """
+    if not wait and not get_history_task().done():
+        return None
+    try:
+        history_loader = get_history_loader()
+    except Exception as e:
+        # the failed task would stay cached (and raise on every run): a new one retries the load
+        st.error(f"Error loading the historical data: {e}")
+        get_history_task.clear()
+        return None
+    with span('app.load_history'):
+        historical_df = history_loader.refresh()
+        coin_index = get_coin_index(history_loader.version, historical_df)
+    return history_loader, historical_df, coin_index
@@ -0,0 +1,65 @@
+# src/utils/background.py
+
+import logging
+import threading
+from datetime import datetime
+
+
+class BackgroundTask:
+    """
+    Runs a function once in a daemon thread and keeps its result, so that a page can be
+    painted while a slow load runs and read the result once it is ready.
+    """
+
+    def __init__(self, function, name='background-task'):
+        """
+        Args:
+            function (callable): Called without arguments in the thread.
+            name (str): Name of the thread.
+        """
+        self.function = function
+        self.name = name
+        self.error = None  # the exception raised by the function, if any
+        self.started_at = None
+        self.finished_at = None
+        self._result = None
+        self._done = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts the thread (once); returns the task."""
+        with self._lock:
+            if self._thread is None:
+                self.started_at = datetime.now()
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self._result = self.function()
+        except Exception as e:  # reported by the page instead of killing the thread silently
+            self.error = e
+            logging.error(f"[{datetime.now().isoformat()}] {self.name} failed: {e}")
+        finally:
+            self.finished_at = datetime.now()
+            self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Waits for the function (at most `timeout` seconds, forever with None); returns done()."""
+        return self._done.wait(timeout)
+
+    def result(self):
+        """
+        Waits for the function and returns its result.
+        Raises:
+            The exception raised by the function, if it failed.
+        """
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self._result
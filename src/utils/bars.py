@@ -0,0 +1,141 @@
+# src/utils/bars.py
+
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+# Pandas period of each rollup resolution ('D' bars are built from the snapshots)
+ROLLUP_PERIODS = {'W': 'W-SUN', 'M': 'M'}
+RESOLUTION_LABELS = {'D': 'Daily', 'W': 'Weekly', 'M': 'Monthly'}
+
+
+def _column(df, column):
+    if column in df.columns:
+        return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+    return np.full(len(df), np.nan)
+
+
+def _group_starts(*keys):
+    """Start positions of the runs of equal consecutive keys (the rows must be sorted by them)."""
+    change = np.zeros(len(keys[0]), dtype=bool)
+    change[0] = True
+    for key in keys:
+        change[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(change)
+
+
+def _aggregate(starts, n, first, high, low, last, volume, volume_sum):
+    """OHLC reductions over the contiguous groups [starts[i], starts[i + 1])."""
+    ends = np.append(starts[1:], n) - 1
+    if volume_sum:
+        present = np.add.reduceat(~np.isnan(volume), starts)
+        volume = np.where(present > 0, np.add.reduceat(np.nan_to_num(volume), starts), np.nan)
+    else:
+        volume = volume[ends]
+    return {
+        'open': first[starts],
+        'high': np.fmax.reduceat(high, starts),
+        'low': np.fmin.reduceat(low, starts),
+        'close': last[ends],
+        'volume': volume,
+    }
+
+
+def daily_bars(df: pd.DataFrame):
+    """
+    Builds one OHLC and volume bar per coin and day from the snapshots.
+    - open: day_open of a compacted intraday day, else the first snapshot of the day; a day
+      with a single snapshot opens at the close of the previous day of the coin
+    - high/low: the extremes of the snapshot prices, of their low_24h/high_24h and of the
+      day_high/day_low of a compacted intraday day
+    - close: the last snapshot of the day
+    - volume: the 24h volume of the last snapshot of the day
+    Args:
+        df (pd.DataFrame): Historical data (one row per coin and snapshot) with 'id', 'date',
+            'collect_timestamp', 'current_price' and optionally the other numeric columns.
+    Returns:
+        pd.DataFrame: 'id' (categorical), 'date' and BAR_COLUMNS, the days of a coin contiguous
+        and in date order.
+    """
+    df = df.dropna(subset=['current_price']) if 'current_price' in df.columns else df.iloc[:0]
+    if df.empty:
+        empty = pd.DataFrame({'id': pd.Categorical([]), 'date': np.array([], dtype='datetime64[ns]')})
+        for column in BAR_COLUMNS:
+            empty[column] = np.array([], dtype=np.float64)
+        return empty
+
+    codes, uniques = pd.factorize(df['id'])
+    dates = df['date'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    time = df['collect_timestamp'] if 'collect_timestamp' in df.columns else pd.Series(pd.NaT, index=df.index)
+    if not pd.api.types.is_datetime64_any_dtype(time):
+        time = pd.to_datetime(time, errors='coerce', format='ISO8601')
+    time = time.to_numpy(dtype='datetime64[ns]').astype(np.int64)  # NaT sorts first
+    # snapshots of a coin and day in time order (row order when the times are equal)
+    order = np.lexsort((time, dates, codes))
+    codes, dates = codes[order], dates[order]
+    price = _column(df, 'current_price')[order]
+    day_open = _column(df, 'day_open')[order]
+    starts = _group_starts(codes, dates)
+    bars = _aggregate(
+        starts, len(order),
+        first=np.where(np.isnan(day_open), price, day_open),
+        high=np.fmax(np.fmax(price, _column(df, 'high_24h')[order]), _column(df, 'day_high')[order]),
+        low=np.fmin(np.fmin(price, _column(df, 'low_24h')[order]), _column(df, 'day_low')[order]),
+        last=price,
+        volume=_column(df, 'total_volume')[order],
+        volume_sum=False,
+    )
+
+    # a day with a single snapshot (and no day_open) opens at the previous close of the coin
+    counts = np.diff(np.append(starts, len(order)))
+    same_coin = np.append(False, codes[starts][1:] == codes[starts][:-1])
+    previous_close = np.append(np.nan, bars['close'][:-1])
+    use_previous = (counts == 1) & np.isnan(day_open[starts]) & same_coin & ~np.isnan(previous_close)
+    bars['open'] = np.where(use_previous, previous_close, bars['open'])
+    # the open of the day extends the range of the day
+    bars['high'] = np.fmax(bars['high'], bars['open'])
+    bars['low'] = np.fmin(bars['low'], bars['open'])
+
+    result = pd.DataFrame({
+        'id': pd.Categorical.from_codes(codes[starts], categories=uniques),
+        'date': dates[starts].astype('datetime64[ns]'),
+    })
+    for column in BAR_COLUMNS:
+        result[column] = bars[column]
+    return result
+
+
+def rollup_bars(bars: pd.DataFrame, resolution):
+    """
+    Aggregates daily bars into weekly ('W', weeks starting on Monday) or monthly ('M') bars.
+    The volume of a rollup is the sum of the daily volumes.
+    Args:
+        bars (pd.DataFrame): Daily bars as returned by daily_bars.
+    Returns:
+        pd.DataFrame: Same layout as daily_bars, date being the first day of the period.
+    """
+    if bars.empty:
+        return bars.copy()
+    codes = bars['id'].cat.codes.to_numpy()
+    period_start = pd.DatetimeIndex(bars['date']).to_period(ROLLUP_PERIODS[resolution]).start_time
+    period_start = period_start.to_numpy(dtype='datetime64[ns]')
+    starts = _group_starts(codes, period_start)
+    values = {column: bars[column].to_numpy(dtype=np.float64) for column in BAR_COLUMNS}
+    rolled = _aggregate(starts, len(bars), values['open'], values['high'], values['low'], values['close'],
+                        values['volume'], volume_sum=True)
+    result = pd.DataFrame({
+        'id': pd.Categorical.from_codes(codes[starts], categories=bars['id'].cat.categories),
+        'date': period_start[starts],
+    })
+    for column in BAR_COLUMNS:
+        result[column] = rolled[column]
+    return result
+
+
+def resolution_for_days(days):
+    """Bar resolution of a chart spanning `days` days: about 30 to 160 candles."""
+    if days <= 120:
+        return 'D'
+    if days <= 3 * 365:
+        return 'W'
+    return 'M'
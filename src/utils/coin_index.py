@@ -0,0 +1,168 @@
+# src/utils/coin_index.py
+
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from src.utils.ingest import NUMERIC_COLUMNS, INTRADAY_COLUMNS
+from src.utils.bars import BAR_COLUMNS, ROLLUP_PERIODS, daily_bars, resolution_for_days, rollup_bars
+
+# Number of days shown by each period of the chart filter ('All' means no filtering)
+PERIOD_DAYS = {'7d': 7, '1m': 30, '1y': 365}
+
+
+class _SeriesTable:
+    """Per-coin time series stored in shared arrays sorted by coin then date."""
+
+    def __init__(self, ids, dates, values):
+        self.dates = dates
+        self.values = values
+
+        # coin id -> (first row, last row + 1)
+        boundaries = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+        starts = np.concatenate([[0], boundaries]) if len(ids) else np.array([], dtype=int)
+        stops = np.concatenate([boundaries, [len(ids)]]) if len(ids) else np.array([], dtype=int)
+        self._ranges = {coin_id: (int(start), int(stop)) for coin_id, start, stop in zip(ids[starts], starts, stops)}
+        self.ids = list(self._ranges)  # in row order
+
+    def __contains__(self, coin_id):
+        return coin_id in self._ranges
+
+    def __len__(self):
+        return len(self._ranges)
+
+    def range(self, coin_id, time_period='All'):
+        """
+        Returns the (start, stop) rows of a coin for a period of the chart filter,
+        or None if the coin has no history. The period ends at the last date of the coin.
+        """
+        if coin_id not in self._ranges:
+            return None
+        start, stop = self._ranges[coin_id]
+        days = PERIOD_DAYS.get(time_period)
+        if days is not None:
+            start_date = self.dates[stop - 1] - np.timedelta64(timedelta(days=days))
+            start += int(np.searchsorted(self.dates[start:stop], start_date, side='left'))
+        return start, stop
+
+    def series(self, coin_id, time_period='All', columns=None):
+        """
+        Returns the history of a coin for a period of the chart filter.
+        The returned frame is built on views of the index arrays: it must not be modified in place.
+        Args:
+            coin_id (str): The ID of the cryptocurrency (e.g., 'bitcoin').
+            time_period (str): '7d', '1m', '1y' or 'All'.
+            columns (list): The metrics to return (default: all of them).
+        Returns:
+            pd.DataFrame: A 'date' column and one column per metric, sorted by date (empty if unknown coin).
+        """
+        columns = list(self.values) if columns is None else columns
+        rows = self.range(coin_id, time_period)
+        if rows is None:
+            return pd.DataFrame(columns=['date'] + columns)
+        start, stop = rows
+        data = {'date': self.dates[start:stop]}
+        data.update({column: self.values[column][start:stop] for column in columns})
+        return pd.DataFrame(data, copy=False)
+
+
+def _bar_table(bars):
+    ids = bars['id'].cat.categories.to_numpy(dtype=object)[bars['id'].cat.codes.to_numpy()]
+    dates = bars['date'].to_numpy(dtype='datetime64[ns]')
+    return _SeriesTable(ids, dates, {column: bars[column].to_numpy(dtype=np.float64) for column in BAR_COLUMNS})
+
+
+class CoinIndex(_SeriesTable):
+    """
+    Per-coin daily time series built once per version of the historical data.
+
+    The daily values (mean of the snapshots of the day) of all the coins are
+    stored in shared arrays sorted by coin then date, so the history of a coin
+    is a contiguous range of rows and a period is a binary search inside it.
+    The daily OHLC and volume bars are built at the same time, along with their
+    weekly and monthly rollups (see bars()).
+    """
+
+    def __init__(self, df: pd.DataFrame, version=None):
+        """
+        Args:
+            df (pd.DataFrame): Historical data as returned by load_historical_data.
+            version: Token of the data version the index was built from.
+        """
+        self.version = version
+        columns = [c for c in NUMERIC_COLUMNS if c in df.columns and c not in INTRADAY_COLUMNS]
+        if df.empty:
+            daily = pd.DataFrame(columns=columns, index=pd.MultiIndex.from_arrays([[], []], names=['id', 'date']))
+        else:
+            daily = df.groupby(['id', 'date'], sort=True, observed=True)[columns].mean()
+
+        ids = daily.index.get_level_values('id').to_numpy(dtype=object)
+        dates = daily.index.get_level_values('date').to_numpy(dtype='datetime64[ns]')
+        super().__init__(ids, dates, {column: daily[column].to_numpy(dtype=np.float64) for column in columns})
+
+        # OHLC bars on the rows of the index, then the coarser resolutions
+        bars = daily_bars(df)
+        self.add_columns(self._align(bars, BAR_COLUMNS))
+        self.resolutions = {'D': self}
+        for resolution in ROLLUP_PERIODS:
+            self.resolutions[resolution] = _bar_table(rollup_bars(bars, resolution))
+
+        # the most recent name of each coin (df is sorted by date)
+        if df.empty:
+            latest = pd.DataFrame(columns=['id', 'name'])
+        else:
+            latest = df[['id', 'name']].drop_duplicates('id', keep='last')
+        self.id_to_name = dict(zip(latest['id'], latest['name']))
+        self.name_to_id = {name: coin_id for coin_id, name in self.id_to_name.items()}
+        self.names = sorted(self.name_to_id)
+
+    def _align(self, frame, columns):
+        """
+        Reorders per-coin daily rows (the days of a coin contiguous and in date order, the same
+        days as the index, coins in any order) into the row order of the index.
+        """
+        aligned = {column: np.full(len(self.dates), np.nan) for column in columns}
+        if frame.empty:
+            return aligned
+        codes = frame['id'].cat.codes.to_numpy()
+        categories = frame['id'].cat.categories.to_numpy(dtype=object)
+        starts = np.flatnonzero(np.append(True, codes[1:] != codes[:-1]))
+        lengths = np.diff(np.append(starts, len(codes)))
+        targets = np.array([self._ranges[categories[code]][0] for code in codes[starts]])
+        positions = np.repeat(targets - starts, lengths) + np.arange(len(codes))
+        for column in columns:
+            aligned[column][positions] = frame[column].to_numpy(dtype=np.float64)
+        return aligned
+
+    def add_columns(self, columns):
+        """Adds precomputed columns (e.g. indicators) aligned with the rows of the index."""
+        for column, values in columns.items():
+            if len(values) != len(self.dates):
+                raise ValueError(f"Column {column} has {len(values)} rows, the index has {len(self.dates)}")
+            self.values[column] = values
+
+    def latest(self, column):
+        """
+        Returns the value of a column on the last day of every coin (e.g. its latest 30-day MA).
+        Returns:
+            pd.Series: Indexed by coin id, in the row order of the index.
+        """
+        stops = np.fromiter((stop for _, stop in self._ranges.values()), dtype=np.int64, count=len(self._ranges))
+        return pd.Series(self.values[column][stops - 1] if len(stops) else np.array([]),
+                         index=pd.Index(self.ids, dtype=object, name='id'), dtype=np.float64)
+
+    def bars(self, coin_id, time_period='All', resolution=None):
+        """
+        Returns the OHLC and volume bars of a coin for a period of the chart filter.
+        Args:
+            resolution (str): 'D', 'W' or 'M' (default: matched to the length of the period,
+                see resolution_for_days).
+        Returns:
+            tuple: (resolution, pd.DataFrame with a 'date' column and BAR_COLUMNS)
+        """
+        if resolution is None:
+            rows = self.range(coin_id, time_period)
+            days = 0
+            if rows is not None and rows[1] > rows[0]:
+                days = int((self.dates[rows[1] - 1] - self.dates[rows[0]]) / np.timedelta64(1, 'D')) + 1
+            resolution = resolution_for_days(days)
+        return resolution, self.resolutions[resolution].series(coin_id, time_period, columns=BAR_COLUMNS)
@@ -0,0 +1,174 @@
+# src/utils/data_processing.py
+
+import numpy as np
+import pandas as pd
+from src.utils.fx import BASE_CURRENCY, MONEY_COLUMNS
+from src.utils.instrumentation import instrumented
+
+DEFAULT_IMAGE = "https://www.coingecko.com/favicon.ico"
+RANKING_COLUMNS = ['Image', 'Crypto', 'Current Price', '24h Change (%)', 'Market Cap']
+# (label, column, suffix, decimals) of the rows of the details table; the amounts
+# (MONEY_COLUMNS) are prefixed with the unit of the display currency
+DETAILS_ROWS = [
+    ("Current Price", 'current_price', "", 4),
+    ("24h Change (%)", 'price_change_percentage_24h', "%", 2),
+    ("Market Cap", 'market_cap', "", 0),
+    ("24h Volume", 'total_volume', "", 0),
+    ("Lowest Price (24h)", 'low_24h', "", 4),
+    ("Highest Price (24h)", 'high_24h', "", 4),
+]
+
+
+def _numbers(values):
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _escape(text):
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def format_numbers(values, prefix="", suffix="", decimals=2, na_rep="N/A"):
+    """
+    Formats a whole column of numbers like f"{prefix}{value:,.{decimals}f}{suffix}".
+    One format string is built for the column and its format method is mapped over the
+    floats as a plain list: still one str.format call per cell, but no per-cell type
+    checks or string building, and the NaNs are replaced once for the whole column.
+    Args:
+        values (array-like): The numbers (non-numeric values and NaNs are shown as na_rep).
+        decimals (int): Number of decimals.
+    Returns:
+        np.ndarray: The formatted strings (object array).
+    """
+    values = _numbers(values)
+    template = f"{_escape(prefix)}{{:,.{decimals}f}}{_escape(suffix)}"
+    text = np.array(list(map(template.format, values.tolist())), dtype=object)
+    text[np.isnan(values)] = na_rep
+    return text
+
+
+def format_changes_html(values, decimals=2, na_rep="N/A"):
+    """Formats a column of percentage changes as HTML, green when positive, red when negative."""
+    values = _numbers(values)
+    color = np.where(values >= 0, "<span style='color:green'>", "<span style='color:red'>").astype(object)
+    html = color + format_numbers(values, suffix="%", decimals=decimals) + "</span>"
+    html[np.isnan(values)] = na_rep
+    return html
+
+
+def _text(df, column, default=""):
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[column].astype(object).where(df[column].notna(), default)
+
+
+def build_ranking_table(data_df: pd.DataFrame, details=None, unit="$"):
+    """
+    Builds the ranking table (one row per coin, in the order of the snapshot).
+    Args:
+        details (pd.DataFrame): The details of the same coins, whose market cap is reused.
+        unit (str): Symbol of the currency the amounts of data_df are in.
+    Returns:
+        pd.DataFrame: RANKING_COLUMNS; '24h Change (%)' stays numeric for the colors.
+    """
+    crypto = (_text(data_df, 'name', 'N/A').astype(str) + " ("
+              + _text(data_df, 'symbol', 'N/A').astype(str).str.upper() + ")")
+    return pd.DataFrame({
+        'Image': _text(data_df, 'image', DEFAULT_IMAGE).to_numpy(),
+        'Crypto': crypto.to_numpy(dtype=object),
+        'Current Price': format_numbers(data_df['current_price'], prefix=f"{unit} ", decimals=2),
+        '24h Change (%)': _numbers(data_df['price_change_percentage_24h']),
+        'Market Cap': (format_numbers(data_df['market_cap'], prefix=f"{unit} ", decimals=0) if details is None
+                       else details["Market Cap"].to_numpy()),
+    }, index=pd.RangeIndex(len(data_df)))
+
+
+def build_metric_cards(data_df: pd.DataFrame, details=None):
+    """
+    Builds the values of the key indicator cards of every coin.
+    Args:
+        details (pd.DataFrame): The details of the same coins (build_details_values), whose
+            price, volume and market cap columns are reused instead of formatted again.
+    Returns:
+        pd.DataFrame: Indexed by id: name, symbol (upper case), image, price, change (HTML),
+        volume and market_cap, all formatted.
+    """
+    details = build_details_values(data_df) if details is None else details
+    return pd.DataFrame({
+        'name': _text(data_df, 'name', 'N/A').to_numpy(),
+        'symbol': _text(data_df, 'symbol', 'N/A').astype(str).str.upper().to_numpy(dtype=object),
+        'image': _text(data_df, 'image', DEFAULT_IMAGE).to_numpy(),
+        'price': details["Current Price"].to_numpy(),
+        'change': format_changes_html(data_df['price_change_percentage_24h'], decimals=2),
+        'volume': details["24h Volume"].to_numpy(),
+        'market_cap': details["Market Cap"].to_numpy(),
+    }, index=details.index)
+
+
+def build_details_values(data_df: pd.DataFrame, unit="$"):
+    """
+    Builds the values of the details table of every coin.
+    Args:
+        unit (str): Symbol of the currency the amounts of data_df are in.
+    Returns:
+        pd.DataFrame: Indexed by id, one column per label of DETAILS_ROWS.
+    """
+    return pd.DataFrame({
+        label: format_numbers(data_df[column] if column in data_df.columns else np.full(len(data_df), np.nan),
+                              prefix=f"{unit} " if column in MONEY_COLUMNS else "", suffix=suffix, decimals=decimals)
+        for label, column, suffix, decimals in DETAILS_ROWS
+    }, index=pd.Index(data_df['id'].to_numpy(dtype=object), name='id'))
+
+
+class MarketView:
+    """
+    Display-ready tables of one market snapshot: the ranking table, the key indicator cards
+    and the details of every coin, formatted once in bulk and then only looked up. Built once
+    per snapshot version and display currency and shared by every session; the tables must
+    not be modified.
+    """
+
+    @instrumented('tables.market_view')
+    def __init__(self, data_df: pd.DataFrame, version=None, currency=BASE_CURRENCY, rates=None):
+        """
+        Args:
+            data_df (pd.DataFrame): The snapshot, in the schema of get_top_cryptos (market cap order), in USD.
+            version: Version of the snapshot the view was built from.
+            currency (str): The display currency; the amounts are converted from USD with `rates`.
+            rates (ExchangeRates): The exchange rates of the snapshot (required for a currency other than USD).
+        """
+        self.version = version
+        self.currency = currency
+        data_df = data_df.drop_duplicates(subset='id') if data_df is not None else pd.DataFrame(columns=['id'])
+        data_df = data_df.reindex(columns=data_df.columns.union(
+            ['id', 'name', 'symbol', 'image', 'current_price', 'price_change_percentage_24h',
+             'market_cap', 'total_volume'], sort=False))
+        unit = "$"
+        if rates is not None:
+            data_df = rates.convert(data_df, currency, MONEY_COLUMNS)
+            unit = rates.unit(currency)
+        self.details = build_details_values(data_df, unit)
+        self.cards = build_metric_cards(data_df, self.details)
+        self.ranking = build_ranking_table(data_df, self.details, unit)
+
+    def __len__(self):
+        return len(self.ranking)
+
+    def __contains__(self, coin_id):
+        return coin_id in self.cards.index
+
+    def ranking_table(self, limit=10):
+        """The first `limit` rows of the ranking table (all of them with limit=None)."""
+        return self.ranking if limit is None else self.ranking.head(limit)
+
+    def metric_cards(self, coin_id):
+        """Returns the formatted card values of a coin (dict), None if it is not in the snapshot."""
+        if coin_id not in self:
+            return None
+        return self.cards.loc[coin_id].to_dict()
+
+    def details_table(self, coin_id):
+        """Returns the details table of a coin (indexed by 'Characteristic'), None if it is not in the snapshot."""
+        if coin_id not in self:
+            return None
+        values = self.details.loc[coin_id]
+        return pd.DataFrame({'Value': values.to_numpy()}, index=pd.Index(values.index, name='Characteristic'))
@@ -0,0 +1,102 @@
+# src/utils/fx.py
+#
+# Display currencies. The markets are fetched and the history is stored in USD only;
+# the other currencies are converted locally from one /exchange_rates table per poll.
+# No pandas or numpy import here: the poller imports this module at startup.
+
+BASE_CURRENCY = 'usd'  # the currency of the markets, of the stored history and of the indicators
+# Currencies offered by the currency selector, when the exchange rates have them
+DISPLAY_CURRENCIES = ['usd', 'eur', 'gbp', 'jpy', 'chf', 'cad', 'aud', 'cny', 'inr', 'krw', 'brl']
+# Columns of a market snapshot (get_top_cryptos) expressed in the base currency
+MONEY_COLUMNS = ['current_price', 'market_cap', 'total_volume', 'low_24h', 'high_24h']
+
+
+class ExchangeRates:
+    """
+    Factors from the base currency (USD) to the display currencies, from one answer of the
+    /exchange_rates endpoint. A currency change multiplies the USD columns by one factor
+    instead of fetching the markets again or reloading the history.
+    Never modified once built: shared by every session through the market snapshots.
+    """
+
+    __slots__ = ('factors', 'units', 'names', 'fetched_at')
+
+    def __init__(self, factors, units=None, names=None, fetched_at=None):
+        """
+        Args:
+            factors (dict): Currency code -> value of 1 USD in that currency ('usd' -> 1.0).
+            units (dict): Currency code -> symbol shown before the amounts ('$', '€'...).
+            names (dict): Currency code -> name of the currency.
+            fetched_at (datetime): When the rates were fetched (None for the base currency alone).
+        """
+        self.factors = dict(factors)
+        self.units = dict(units or {})
+        self.names = dict(names or {})
+        self.fetched_at = fetched_at
+
+    @classmethod
+    def base_only(cls):
+        """The table used until the first exchange rates are fetched: USD alone."""
+        return cls({BASE_CURRENCY: 1.0}, units={BASE_CURRENCY: '$'}, names={BASE_CURRENCY: 'US Dollar'})
+
+    @classmethod
+    def from_api(cls, payload, currencies=DISPLAY_CURRENCIES, fetched_at=None):
+        """
+        Builds the table from an answer of /exchange_rates, whose values are the price of
+        one bitcoin in each currency.
+        Args:
+            payload (dict): {'rates': {code: {'name', 'unit', 'value', 'type'}}}.
+            currencies (list): The currencies to keep, in the order of the selector.
+        Returns:
+            ExchangeRates: None if the answer has no valid USD rate.
+        """
+        rates = (payload or {}).get('rates') or {}
+        base_value = _rate_value(rates.get(BASE_CURRENCY))
+        if not base_value:
+            return None
+        factors, units, names = {}, {}, {}
+        for code in currencies:
+            value = _rate_value(rates.get(code))
+            if value:
+                factors[code] = value / base_value
+                units[code] = rates[code].get('unit') or code.upper()
+                names[code] = rates[code].get('name') or code.upper()
+        factors[BASE_CURRENCY] = 1.0
+        return cls(factors, units, names, fetched_at)
+
+    @property
+    def currencies(self):
+        """The currency codes of the table, in the order of the selector."""
+        return list(self.factors)
+
+    def __contains__(self, currency):
+        return currency in self.factors
+
+    def factor(self, currency):
+        """Value of 1 USD in `currency`."""
+        return self.factors[currency]
+
+    def unit(self, currency):
+        return self.units.get(currency) or currency.upper()
+
+    def convert(self, frame, currency, columns):
+        """
+        Converts USD columns of a DataFrame to `currency`, one vectorized multiplication per column.
+        Args:
+            frame (pd.DataFrame): Left unchanged (it may be shared, or a view of a cached index).
+            columns (list): The USD columns; those missing from the frame are ignored.
+        Returns:
+            pd.DataFrame: A new frame with the converted columns (the frame itself for USD).
+        """
+        factor = self.factor(currency)
+        if factor == 1.0:
+            return frame
+        return frame.assign(**{column: frame[column] * factor for column in columns if column in frame.columns})
+
+
+def _rate_value(rate):
+    try:
+        value = float(rate['value'])
+    except (TypeError, KeyError, ValueError):
+        return None
+    return value if value > 0 else None
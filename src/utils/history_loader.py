@@ -0,0 +1,96 @@
+# src/utils/history_loader.py
+
+import pandas as pd
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from src.utils.history_store import update_history_store, read_history_store, read_coin_table, manifest_token
+from src.utils.shared_history import publish_shared_history, open_shared_history
+from src.utils.instrumentation import instrumented
+
+
+class IncrementalHistoryLoader:
+    """
+    Keeps the historical data in memory and extends it as new snapshots arrive.
+
+    The file manifest (name, mtime, size, sha1) lives in the history store: a
+    refresh only stats the snapshot files, parses the new or modified ones and
+    appends their rows to the frame already in memory. The whole store is only
+    read again when an existing snapshot was modified or deleted.
+
+    With shared=True, each version of the frame is published as memory-mapped
+    column files: every worker process loading the same archive maps the same
+    pages instead of holding its own copy.
+    """
+
+    def __init__(self, data_dir='data', store_dir=None, min_interval=60, shared=False):
+        """
+        Args:
+            data_dir (str): The directory where the JSON files are stored.
+            store_dir (str): The directory of the history store (default: 'data/store').
+            min_interval (float): Minimum number of seconds between two scans of data_dir.
+            shared (bool): Back the frame with memory-mapped files shared between processes.
+        """
+        self.data_dir = data_dir
+        self.store_dir = store_dir or os.path.join(data_dir, 'store')
+        self.shared_dir = os.path.join(self.store_dir, 'shared') if shared else None
+        self.min_interval = min_interval
+        self.df = pd.DataFrame()
+        self.coins = pd.DataFrame()
+        self.version = 0  # incremented every time the frame changes
+        self.token = None  # identifies the content of the archive the frame was built from
+        self._last_scan = None
+        self._lock = threading.Lock()
+
+    @instrumented('history.refresh')
+    def refresh(self, force=False):
+        """
+        Scans data_dir and ingests the new snapshots.
+        Args:
+            force (bool): Scan even if the last scan is more recent than min_interval.
+        Returns:
+            pd.DataFrame: The up-to-date historical data.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_scan is not None and now - self._last_scan < self.min_interval:
+                return self.df
+            self._last_scan = now
+
+            if not os.path.exists(self.data_dir):
+                return self.df
+
+            manifest, appended, rewritten = update_history_store(self.data_dir, self.store_dir)
+            token = manifest_token(manifest)
+            if token == self.token:
+                return self.df
+
+            shared_df = open_shared_history(token, self.shared_dir) if self.shared_dir else None
+            if shared_df is not None:
+                # another worker already published this version
+                self.df = shared_df
+            elif self.version == 0 or rewritten or appended is None:
+                # cold start, or an existing snapshot was modified: read the (already synced) store
+                self.df = read_history_store(self.store_dir)
+            else:
+                self.df = self._append(appended)
+                logging.info(f"[{datetime.now().isoformat()}] {len(appended)} new historical records loaded.")
+
+            if self.shared_dir and shared_df is None and not self.df.empty:
+                publish_shared_history(self.df, token, self.shared_dir)
+                self.df = open_shared_history(token, self.shared_dir)
+            self.coins = read_coin_table(self.store_dir)
+            self.token = token
+            self.version += 1
+            return self.df
+
+    def _append(self, appended):
+        # the new snapshots usually come after the data in memory, so no sort is needed
+        if self.df.empty:
+            return appended
+        df = pd.concat([self.df, appended], ignore_index=True)
+        if appended['date'].min() < self.df['date'].max():
+            df = df.sort_values(by=['date', 'name'], kind='stable').reset_index(drop=True)
+        return df
@@ -0,0 +1,334 @@
+# src/utils/history_store.py
+
+import numpy as np
+import pandas as pd
+import logging
+import os
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from src.utils.ingest import (
+    NUMERIC_COLUMNS, METADATA_COLUMNS, ingest_snapshot_files, snapshot_date_from_filename
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks, one worker process per store
+    fcntl = None
+
+# The JSON snapshots in data/ stay the source of truth: the store below is a
+# derived, typed copy of them that can be rebuilt (or deleted) at any time.
+STORE_DIR = os.path.join('data', 'store')
+MANIFEST_FILE = 'manifest.json'
+COINS_FILE = 'coins.json'
+LOCK_FILE = '.lock'
+STORE_FORMAT_VERSION = 3
+
+
+def list_snapshot_files(data_dir='data'):
+    """
+    Lists the daily snapshot files ('crypto_data_YYYY-MM-DD.json') of the archive, sorted by name.
+    Args:
+        data_dir (str): The directory where the JSON files are stored.
+    Returns:
+        list: The file names (not the full paths).
+    """
+    if not os.path.exists(data_dir):
+        return []
+    return sorted(
+        f for f in os.listdir(data_dir)
+        if f.startswith('crypto_data_') and f.endswith('.json')
+    )
+
+
+def atomic_write(path, write):
+    """
+    Writes a file through a temporary file and an atomic rename. The temporary name is
+    unique to the process and thread, so that concurrent writers never share it.
+    """
+    tmp_path = f"{path}.tmp{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def store_lock(store_dir=STORE_DIR, shared=False):
+    """
+    Holds the lock of a store directory (flock of store_dir/.lock): the worker processes
+    syncing the same store take turns, and readers (shared=True) see a whole sync or none.
+    """
+    if shared and not os.path.isdir(store_dir):
+        yield  # nothing to read yet
+        return
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, LOCK_FILE), 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield  # released when the file is closed
+
+
+def _load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return default
+
+
+def _file_fingerprint(file_path):
+    stat = os.stat(file_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _file_hash(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _segment_path(store_dir, month):
+    return os.path.join(store_dir, f"segment_{month}.npz")
+
+
+def _segment_arrays(df, coin_codes):
+    """Converts parsed rows into the typed arrays of a segment (one array per column)."""
+    arrays = {
+        'date': df['date'].to_numpy(dtype='datetime64[D]'),
+        'timestamp': df['timestamp'].to_numpy(dtype='datetime64[us]'),
+        'coin': df['id'].map(coin_codes).to_numpy(dtype=np.int32),
+    }
+    for column in NUMERIC_COLUMNS:
+        arrays[column] = df[column].to_numpy(dtype=np.float64)
+    return arrays
+
+
+def _write_segment(path, arrays):
+    """Writes the rows of one month as an uncompressed npz segment."""
+    atomic_write(path, lambda f: np.savez(f, **arrays))
+
+
+def _update_coin_table(coins, coin_codes, df, overwrite):
+    """Registers the new coin ids of df; codes never change once assigned."""
+    latest = df.sort_values('timestamp').drop_duplicates('id', keep='last')
+    for record in latest[METADATA_COLUMNS].to_dict(orient='records'):
+        if record['id'] not in coin_codes:
+            coin_codes[record['id']] = len(coins)
+            coins.append(record)
+        elif overwrite:
+            # only the most recent snapshots update the name, symbol and image
+            coins[coin_codes[record['id']]] = record
+
+
+def _parse_files(data_dir, filenames):
+    df = ingest_snapshot_files([os.path.join(data_dir, f) for f in filenames], canonical=True)
+    if df is None:
+        return None
+    df['date'] = df['date_processed']
+    df = df.dropna(subset=['current_price', 'id'])
+    return df if not df.empty else None
+
+
+def _sync_store(data_dir, store_dir):
+    """
+    Synchronizes the store and reports what changed.
+    Returns:
+        tuple: (manifest, the appended rows as segment arrays or None, True if rows were rewritten or removed)
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    coins_path = os.path.join(store_dir, COINS_FILE)
+
+    manifest = _load_json(manifest_path, {})
+    if manifest.get('format') != STORE_FORMAT_VERSION:
+        manifest = {'format': STORE_FORMAT_VERSION, 'segments': {}}
+    segments = manifest['segments']
+    coins = _load_json(coins_path, [])
+    coin_codes = {coin['id']: code for code, coin in enumerate(coins)}
+
+    months = {}
+    for filename in list_snapshot_files(data_dir):
+        month = snapshot_date_from_filename(filename)[:7]
+        months.setdefault(month, {})[filename] = _file_fingerprint(os.path.join(data_dir, filename))
+    newest_month = max(months, default=None)
+
+    dirty = False
+    rewritten = False
+    appended = []
+    for month in sorted(set(segments) - set(months)):
+        if os.path.exists(_segment_path(store_dir, month)):
+            os.remove(_segment_path(store_dir, month))
+        del segments[month]
+        dirty = rewritten = True
+
+    for month, fingerprints in sorted(months.items()):
+        segment_path = _segment_path(store_dir, month)
+        segment = segments.get(month, {})
+        known = segment.get('files', {}) if os.path.exists(segment_path) else {}
+
+        # A file is only re-ingested when its content hash changed, so that a
+        # checkout touching every mtime does not trigger a rebuild.
+        files = {}
+        changed = []
+        for filename, fingerprint in fingerprints.items():
+            entry = known.get(filename)
+            if entry is not None and entry[:2] == fingerprint:
+                files[filename] = entry
+                continue
+            digest = _file_hash(os.path.join(data_dir, filename))
+            files[filename] = fingerprint + [digest]
+            if entry is None or entry[2] != digest:
+                changed.append(filename)
+        removed = set(known) - set(fingerprints)
+
+        if not changed and not removed:
+            if files != known:
+                segment['files'] = files
+                dirty = True
+            continue
+
+        # (a segment the manifest does not know, e.g. from an older store format, is rebuilt)
+        append_only = not removed and bool(known) and all(f not in known for f in changed)
+        parsed = _parse_files(data_dir, sorted(changed if append_only else files))
+        if parsed is not None:
+            _update_coin_table(coins, coin_codes, parsed, overwrite=month == newest_month)
+            arrays = _segment_arrays(parsed, coin_codes)
+        else:
+            arrays = _segment_arrays(pd.DataFrame(columns=['date', 'timestamp', 'id'] + NUMERIC_COLUMNS), coin_codes)
+
+        if append_only:
+            # new snapshots of the month are appended to the existing segment
+            with np.load(segment_path) as npz:
+                arrays = {column: np.concatenate([npz[column], arrays[column]]) for column in arrays}
+            if parsed is not None:
+                appended.append(_segment_arrays(parsed, coin_codes))
+        else:
+            rewritten = True
+        _write_segment(segment_path, arrays)
+
+        dates = arrays['date']
+        segments[month] = {
+            'files': files,
+            'rows': int(len(dates)),
+            'min_date': str(dates.min()) if len(dates) else None,
+            'max_date': str(dates.max()) if len(dates) else None,
+        }
+        dirty = True
+        logging.info(f"[{datetime.now().isoformat()}] History segment {month} updated ({len(changed)} new or modified files).")
+
+    if dirty or not os.path.exists(manifest_path):
+        atomic_write(coins_path, lambda f: f.write(json.dumps(coins, ensure_ascii=False).encode('utf-8')))
+        atomic_write(manifest_path, lambda f: f.write(json.dumps(manifest, indent=4).encode('utf-8')))
+    if appended:
+        appended = {column: np.concatenate([a[column] for a in appended]) for column in appended[0]}
+    return manifest, appended or None, rewritten
+
+
+def sync_history_store(data_dir='data', store_dir=None):
+    """
+    Brings the columnar history store up to date with the JSON snapshots.
+    Snapshots are grouped into one segment per month. New snapshot files are
+    appended to their segment; a segment is only rebuilt when one of its files
+    was removed or its content changed. The worker processes sharing the store
+    take turns (store_lock).
+    Args:
+        data_dir (str): The directory where the JSON files are stored.
+        store_dir (str): The directory of the store (default: 'data/store').
+    Returns:
+        dict: The store manifest.
+    """
+    store_dir = store_dir or os.path.join(data_dir, 'store')
+    with store_lock(store_dir):
+        manifest, _, _ = _sync_store(data_dir, store_dir)
+    return manifest
+
+
+def manifest_token(manifest):
+    """
+    Returns a short identifier of the content of the archive described by a manifest:
+    two processes syncing the same snapshot files get the same token.
+    """
+    digest = hashlib.sha1(f"format:{manifest.get('format')};".encode('utf-8'))
+    for month, segment in sorted(manifest.get('segments', {}).items()):
+        for filename, entry in sorted(segment.get('files', {}).items()):
+            digest.update(f"{filename}:{entry[2]};".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def update_history_store(data_dir='data', store_dir=None):
+    """
+    Same as sync_history_store, but also returns the rows that were appended so
+    that an in-memory copy of the history can be extended without reading the store again.
+    Returns:
+        tuple: (manifest, appended rows as a DataFrame or None, True if existing rows were
+        rewritten or removed, in which case the store has to be read again)
+    """
+    store_dir = store_dir or os.path.join(data_dir, 'store')
+    with store_lock(store_dir):
+        manifest, appended, rewritten = _sync_store(data_dir, store_dir)
+        if appended is None:
+            return manifest, None, rewritten
+        return manifest, _history_frame(appended, read_coin_table(store_dir)), rewritten
+
+
+def _history_frame(arrays, coins):
+    """Builds the history DataFrame (load_historical_data layout) from segment arrays."""
+    codes = arrays['coin']
+    df = pd.DataFrame({
+        column: coins[column].to_numpy()[codes] for column in METADATA_COLUMNS
+    })
+    df['date'] = pd.to_datetime(arrays['date'])
+    df['collect_timestamp'] = pd.to_datetime(arrays['timestamp'])
+    for column in NUMERIC_COLUMNS:
+        df[column] = arrays[column]
+    return df.sort_values(by=['date', 'name'], kind='stable').reset_index(drop=True)
+
+
+def read_coin_table(store_dir=STORE_DIR):
+    """
+    Reads the coin table of the store.
+    Returns:
+        pd.DataFrame: One row per coin id ('id', 'name', 'symbol', 'image'), in code order.
+    """
+    coins = _load_json(os.path.join(store_dir, COINS_FILE), [])
+    return pd.DataFrame(coins, columns=METADATA_COLUMNS)
+
+
+def read_history_store(store_dir=STORE_DIR):
+    """
+    Reads the historical data of the columnar store, every segment and every column:
+    the history loader keeps the whole archive in one (shared) frame, and the charts and
+    analytics slice it in memory (CoinIndex, MarketMatrix).
+    Args:
+        store_dir (str): The directory of the store.
+    Returns:
+        pd.DataFrame: The same layout as load_historical_data, sorted by date and name.
+    """
+    with store_lock(store_dir, shared=True):
+        manifest = _load_json(os.path.join(store_dir, MANIFEST_FILE), {})
+        coins = read_coin_table(store_dir)
+        if not manifest.get('segments') or coins.empty:
+            return pd.DataFrame()
+
+        parts = []
+        for month, segment in sorted(manifest['segments'].items()):
+            if not segment.get('rows'):
+                continue
+            with np.load(os.path.join(store_dir, f"segment_{month}.npz")) as npz:
+                parts.append({column: npz[column] for column in ['date', 'coin', 'timestamp'] + NUMERIC_COLUMNS})
+
+    if not parts:
+        return pd.DataFrame()
+    arrays = {column: np.concatenate([p[column] for p in parts]) for column in parts[0]}
+    return _history_frame(arrays, coins)
@@ -0,0 +1,268 @@
+# src/utils/indicators.py
+
+import numpy as np
+import pandas as pd
+import logging
+import os
+import threading
+from datetime import datetime
+from src.utils.history_store import atomic_write, store_lock
+
+INDICATORS_FILE = 'indicators.npz'
+
+# Public indicator columns, all computed on the daily prices of a coin
+INDICATOR_COLUMNS = [
+    'ma_7', 'ma_30', 'ema_12', 'ema_26', 'rsi_14',
+    'bb_middle', 'bb_upper', 'bb_lower', 'volatility_30'
+]
+# Wilder averages of the gains and losses, kept so that the RSI can be updated
+_RSI_STATE_COLUMNS = ['rsi_avg_gain', 'rsi_avg_loss']
+_COLUMNS = ['current_price'] + INDICATOR_COLUMNS + _RSI_STATE_COLUMNS
+_COLUMN_INDEX = {column: i for i, column in enumerate(_COLUMNS)}
+
+RSI_PERIOD = 14
+BOLLINGER_PERIOD = 20
+BOLLINGER_WIDTH = 2
+VOLATILITY_PERIOD = 30
+# number of trailing prices an incremental update needs (30 log returns)
+_TAIL = VOLATILITY_PERIOD + 1
+
+
+def _rsi(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def compute_indicators(prices):
+    """
+    Computes the indicators of a daily price series in one vectorized pass.
+    - ma_7, ma_30: moving averages (computed on the available days at the start of the series)
+    - ema_12, ema_26: exponential moving averages (span of 12 and 26 days)
+    - rsi_14: Wilder's relative strength index (NaN for the first 14 days)
+    - bb_middle, bb_upper, bb_lower: 20-day Bollinger bands at 2 standard deviations
+    - volatility_30: annualized standard deviation of the last 30 daily log returns, in %
+    Args:
+        prices (array-like): Daily prices sorted by date.
+    Returns:
+        dict: One float64 array per column (including the internal RSI averages).
+    """
+    prices = pd.Series(np.asarray(prices, dtype=np.float64))
+    result = {'current_price': prices.to_numpy()}
+    result['ma_7'] = prices.rolling(window=7, min_periods=1).mean().to_numpy()
+    result['ma_30'] = prices.rolling(window=30, min_periods=1).mean().to_numpy()
+    result['ema_12'] = prices.ewm(span=12, adjust=False).mean().to_numpy()
+    result['ema_26'] = prices.ewm(span=26, adjust=False).mean().to_numpy()
+
+    # Wilder's smoothing, seeded with the simple average of the first 14 changes
+    diff = prices.diff()
+    averages = []
+    for moves in (diff.clip(lower=0), -diff.clip(upper=0)):
+        seeded = pd.Series(np.nan, index=prices.index)
+        if len(prices) > RSI_PERIOD:
+            seeded.iloc[RSI_PERIOD] = moves.iloc[1:RSI_PERIOD + 1].mean()
+            seeded.iloc[RSI_PERIOD + 1:] = moves.iloc[RSI_PERIOD + 1:]
+        averages.append(seeded.ewm(alpha=1 / RSI_PERIOD, adjust=False).mean().to_numpy())
+    result['rsi_avg_gain'], result['rsi_avg_loss'] = averages
+    result['rsi_14'] = _rsi(*averages)
+
+    window = prices.rolling(window=BOLLINGER_PERIOD, min_periods=BOLLINGER_PERIOD)
+    middle = window.mean().to_numpy()
+    width = BOLLINGER_WIDTH * window.std(ddof=0).to_numpy()
+    result['bb_middle'] = middle
+    result['bb_upper'] = middle + width
+    result['bb_lower'] = middle - width
+
+    log_returns = np.log(prices / prices.shift(1))
+    volatility = log_returns.rolling(window=VOLATILITY_PERIOD, min_periods=VOLATILITY_PERIOD).std()
+    result['volatility_30'] = (volatility * np.sqrt(365) * 100).to_numpy()
+    return result
+
+
+def _next_row(tail, previous, count):
+    """
+    Computes the indicators of a new day from the rolling state of the coin.
+    Args:
+        tail (np.ndarray): The last prices of the coin, the new price included (at most _TAIL).
+        previous (np.ndarray): The previous row (all the columns), None for the first day.
+        count (int): The number of days of the coin, the new day included.
+    """
+    row = np.full(len(_COLUMNS), np.nan)
+    price = tail[-1]
+    row[_COLUMN_INDEX['current_price']] = price
+    row[_COLUMN_INDEX['ma_7']] = tail[-7:].mean()
+    row[_COLUMN_INDEX['ma_30']] = tail[-30:].mean()
+    for column, span in (('ema_12', 12), ('ema_26', 26)):
+        alpha = 2 / (span + 1)
+        index = _COLUMN_INDEX[column]
+        row[index] = price if previous is None else alpha * price + (1 - alpha) * previous[index]
+
+    changes = count - 1
+    if changes >= RSI_PERIOD:
+        if changes == RSI_PERIOD:
+            moves = np.diff(tail[-(RSI_PERIOD + 1):])
+            gain, loss = np.clip(moves, 0, None).mean(), -np.clip(moves, None, 0).mean()
+        else:
+            move = tail[-1] - tail[-2]
+            gain = (previous[_COLUMN_INDEX['rsi_avg_gain']] * (RSI_PERIOD - 1) + max(move, 0)) / RSI_PERIOD
+            loss = (previous[_COLUMN_INDEX['rsi_avg_loss']] * (RSI_PERIOD - 1) + max(-move, 0)) / RSI_PERIOD
+        row[_COLUMN_INDEX['rsi_avg_gain']] = gain
+        row[_COLUMN_INDEX['rsi_avg_loss']] = loss
+        row[_COLUMN_INDEX['rsi_14']] = _rsi(np.float64(gain), np.float64(loss))
+
+    if count >= BOLLINGER_PERIOD:
+        window = tail[-BOLLINGER_PERIOD:]
+        middle, width = window.mean(), BOLLINGER_WIDTH * window.std()
+        row[_COLUMN_INDEX['bb_middle']] = middle
+        row[_COLUMN_INDEX['bb_upper']] = middle + width
+        row[_COLUMN_INDEX['bb_lower']] = middle - width
+
+    if count > VOLATILITY_PERIOD:
+        log_returns = np.diff(np.log(tail[-_TAIL:]))
+        row[_COLUMN_INDEX['volatility_30']] = log_returns.std(ddof=1) * np.sqrt(365) * 100
+    return row
+
+
+class _CoinSeries:
+    """Growable daily series of a coin (dates + one row of values per day)."""
+
+    def __init__(self, dates, values):
+        self.dates = dates
+        self.values = values  # shape (len(_COLUMNS), capacity)
+        self.count = len(dates)
+
+    def append(self, date, row):
+        if self.count == len(self.dates):
+            # capacity doubling keeps the appends O(1) amortized
+            capacity = max(2 * self.count, 8)
+            self.dates = np.resize(self.dates, capacity)
+            values = np.full((len(_COLUMNS), capacity), np.nan)
+            values[:, :self.count] = self.values[:, :self.count]
+            self.values = values
+        self.dates[self.count] = date
+        self.values[:, self.count] = row
+        self.count += 1
+
+    def column(self, column):
+        return self.values[_COLUMN_INDEX[column], :self.count]
+
+
+class IndicatorEngine:
+    """
+    Keeps the indicators of every coin and updates them as new days arrive.
+
+    The indicators of a coin are computed once with compute_indicators. A new
+    daily value is then an O(1) update from the rolling state of the coin (its
+    last prices and last row), and a new value for the last day replaces it.
+    The series are saved next to the history store and reloaded at startup.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): The npz file the indicators are saved to (default: 'data/store/indicators.npz').
+        """
+        self.path = path or os.path.join('data', 'store', INDICATORS_FILE)
+        self._series = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def update(self, coin_id, date, price):
+        """Adds the daily price of a coin, or replaces it if the date is the last day of the coin."""
+        date = np.datetime64(date, 'D')
+        series = self._series.get(coin_id)
+        if series is None:
+            self._series[coin_id] = series = _CoinSeries(np.array([], dtype='datetime64[D]'), np.empty((len(_COLUMNS), 0)))
+        if series.count and series.dates[series.count - 1] == date:
+            series.count -= 1  # new value for the last day
+        elif series.count and series.dates[series.count - 1] > date:
+            raise ValueError(f"{coin_id}: {date} is older than the last day of the series")
+
+        prices = series.column('current_price')
+        tail = np.append(prices[-(_TAIL - 1):], price)
+        previous = series.values[:, series.count - 1] if series.count else None
+        series.append(date, _next_row(tail, previous, series.count + 1))
+
+    def _recompute(self, coin_id, dates, prices):
+        result = compute_indicators(prices)
+        values = np.vstack([result[column] for column in _COLUMNS])
+        self._series[coin_id] = _CoinSeries(dates.astype('datetime64[D]'), values)
+
+    def sync(self, index):
+        """
+        Brings the indicators up to date with a CoinIndex and adds them to its columns.
+        A coin whose history only gained days (or a new value for its last day) is updated
+        incrementally, any other change of its history recomputes it.
+        Returns:
+            int: The number of coins that were recomputed.
+        """
+        recomputed = 0
+        with self._lock:
+            for coin_id in list(self._series):
+                if coin_id not in index:
+                    del self._series[coin_id]
+
+            for coin_id in index.ids:
+                start, stop = index.range(coin_id)
+                dates = index.dates[start:stop].astype('datetime64[D]')
+                prices = index.values['current_price'][start:stop]
+                series = self._series.get(coin_id)
+
+                known = series.count if series is not None else 0
+                last = known - 1
+                # every known day but the last must be unchanged (a corrected older snapshot
+                # changes the indicators of all the following days): one vectorized comparison
+                incremental = (
+                    known > 0 and known <= len(dates)
+                    and np.array_equal(dates[:known], series.dates[:known])
+                    and np.array_equal(prices[:last], series.column('current_price')[:last], equal_nan=True)
+                )
+                if not incremental:
+                    self._recompute(coin_id, dates, prices)
+                    recomputed += 1
+                    continue
+                if prices[last] != series.column('current_price')[last]:
+                    self.update(coin_id, dates[last], prices[last])
+                for position in range(known, len(dates)):
+                    self.update(coin_id, dates[position], prices[position])
+
+            index.add_columns({
+                column: np.concatenate([self._series[coin_id].column(column) for coin_id in index.ids])
+                if len(index) else np.array([])
+                for column in INDICATOR_COLUMNS
+            })
+        return recomputed
+
+    def save(self):
+        """Saves the series of every coin to self.path (atomic rename, under the lock of the store)."""
+        with self._lock:
+            ids = list(self._series)
+            counts = np.array([self._series[coin_id].count for coin_id in ids], dtype=np.int64)
+            dates = [self._series[coin_id].dates[:self._series[coin_id].count] for coin_id in ids]
+            values = [self._series[coin_id].values[:, :self._series[coin_id].count] for coin_id in ids]
+            with store_lock(os.path.dirname(self.path) or '.'):
+                atomic_write(self.path, lambda f: np.savez(
+                    f,
+                    columns=np.array(_COLUMNS),
+                    ids=np.array(ids, dtype=str),
+                    counts=counts,
+                    dates=np.concatenate(dates) if dates else np.array([], dtype='datetime64[D]'),
+                    values=np.hstack(values) if values else np.empty((len(_COLUMNS), 0)),
+                ))
+
+    def load(self):
+        """Loads the series saved in self.path, if any (and if they have the current columns)."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with store_lock(os.path.dirname(self.path) or '.', shared=True), np.load(self.path) as npz:
+                if list(npz['columns']) != _COLUMNS:
+                    return
+                offsets = np.concatenate([[0], np.cumsum(npz['counts'])])
+                dates, values = npz['dates'], npz['values']
+                self._series = {
+                    str(coin_id): _CoinSeries(dates[start:stop].copy(), values[:, start:stop].copy())
+                    for coin_id, start, stop in zip(npz['ids'], offsets[:-1], offsets[1:])
+                }
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"[{datetime.now().isoformat()}] Error loading the indicators from {self.path}: {e}")
+            self._series = {}
@@ -0,0 +1,123 @@
+# src/utils/ingest.py
+
+import numpy as np
+import pandas as pd
+import logging
+import os
+import json
+from datetime import datetime
+from src.utils.instrumentation import instrumented
+
+# Written by the compaction of the intraday log (src/utils/snapshot_log.py)
+INTRADAY_COLUMNS = ['day_open', 'day_high', 'day_low']
+NUMERIC_COLUMNS = [
+    'current_price', 'market_cap', 'total_volume',
+    'market_cap_change_percentage_24h', 'price_change_percentage_24h',
+    'low_24h', 'high_24h'
+] + INTRADAY_COLUMNS
+METADATA_COLUMNS = ['id', 'name', 'symbol', 'image']
+
+# The first snapshots of the archive were saved with French column names
+LEGACY_COLUMNS = {
+    'symbole': 'symbol',
+    'pourrcentage_de_prix_24h': 'price_change_percentage_24h',
+    'prix_le_plus_bas_24h': 'low_24h',
+    'prix_le_plus_haut_24h': 'high_24h',
+}
+
+
+def snapshot_date_from_filename(filename):
+    """Returns the 'YYYY-MM-DD' part of a snapshot file name."""
+    return filename.replace('crypto_data_', '').replace('.json', '')
+
+
+def _read_records(file_path):
+    """Reads the list of records of one snapshot file, None if it is empty or unreadable."""
+    filename = os.path.basename(file_path)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        logging.error(f"[{datetime.now().isoformat()}] Error loading data from {file_path}: {e}")
+        return None
+    if not data:
+        logging.warning(f"[{datetime.now().isoformat()}] file {filename} does not contain any data or incorrectly formatted.")
+        return None
+    return data
+
+
+def _canonicalize(df):
+    """Merges the legacy (French) columns into their current names and adds the missing columns."""
+    for legacy, column in LEGACY_COLUMNS.items():
+        if legacy not in df.columns:
+            continue
+        df[column] = df[legacy] if column not in df.columns else df[column].fillna(df[legacy])
+        df = df.drop(columns=legacy)
+    for column in METADATA_COLUMNS + NUMERIC_COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+    return df
+
+
+def _ingest_batch(file_paths, canonical):
+    """Parses a batch of snapshot files with one vectorized conversion per column."""
+    records = []
+    lengths = []
+    fallback_dates = []
+    for file_path in file_paths:
+        data = _read_records(file_path)
+        if data is None:
+            continue
+        records.extend(data)
+        lengths.append(len(data))
+        fallback_dates.append(snapshot_date_from_filename(os.path.basename(file_path)))
+    if not records:
+        return None
+
+    df = pd.DataFrame.from_records(records)
+    if canonical:
+        df = _canonicalize(df)
+    if 'collect_timestamp' not in df.columns:
+        df['collect_timestamp'] = None
+
+    # One parse for all the timestamps of the batch; the file name date is
+    # broadcast to the records of its file and used where the timestamp is invalid.
+    timestamps = pd.to_datetime(df['collect_timestamp'], errors='coerce', format='ISO8601')
+    fallback = pd.to_datetime(pd.Series(fallback_dates), errors='coerce', format='%Y-%m-%d')
+    fallback = pd.Series(np.repeat(fallback.to_numpy(), lengths), index=df.index)
+    timestamps = timestamps.fillna(fallback)
+    df['timestamp'] = timestamps
+    df['date_processed'] = timestamps.dt.normalize()
+
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+
+    invalid = df['date_processed'].isna()
+    if invalid.any():
+        logging.warning(f"[{datetime.now().isoformat()}] {int(invalid.sum())} records without a valid timestamp or file date were skipped.")
+        df = df[~invalid]
+    return df
+
+
+@instrumented('history.parse_json')
+def ingest_snapshot_files(file_paths, batch_size=64, canonical=False):
+    """
+    Parses snapshot files in batches: the records of a batch are built into one
+    DataFrame and the timestamps and numeric columns are converted column-wise.
+    Args:
+        file_paths (list): The JSON files to parse.
+        batch_size (int): The number of files parsed together.
+        canonical (bool): Rename the legacy columns and add the missing ones.
+    Returns:
+        pd.DataFrame or None: The records with a 'timestamp' and a 'date_processed'
+        (timestamp normalized to the start of the day) column, None if no file had data.
+    """
+    frames = []
+    for start in range(0, len(file_paths), batch_size):
+        frame = _ingest_batch(file_paths[start:start + batch_size], canonical)
+        if frame is not None:
+            frames.append(frame)
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
@@ -0,0 +1,307 @@
+# src/utils/instrumentation.py
+
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# '' or '0': disabled, '1': timing spans, 'memory': timing spans and tracemalloc sampling
+PROFILE = os.environ.get('CRYPTODASH_PROFILE', '').strip().lower()
+# Port of the metrics endpoint (/metrics and /metrics.json), served only while profiling
+METRICS_PORT = os.environ.get('CRYPTODASH_METRICS_PORT')
+# Interface it listens on: local only by default ('0.0.0.0' to let a remote Prometheus scrape it)
+METRICS_HOST = os.environ.get('CRYPTODASH_METRICS_HOST', '127.0.0.1')
+# Upper bounds (seconds) of the histogram buckets of the span durations
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT_SPANS = 200  # spans kept for the debug panel
+METRIC_PREFIX = 'cryptodash'
+
+_NO_SPAN = nullcontext()
+
+
+class SpanStats:
+    """Aggregated durations (and net allocations, with memory sampling) of one span name."""
+
+    __slots__ = ('count', 'total', 'max', 'last', 'buckets', 'allocated_last', 'allocated_max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.buckets = [0] * len(BUCKETS)  # not cumulative
+        self.allocated_last = None
+        self.allocated_max = None
+
+    def add(self, seconds, allocated=None):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        if allocated is not None:
+            self.allocated_last = allocated
+            self.allocated_max = allocated if self.allocated_max is None else max(self.allocated_max, allocated)
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_seconds': self.total,
+            'mean_seconds': self.total / self.count if self.count else 0.0,
+            'max_seconds': self.max,
+            'last_seconds': self.last,
+            'buckets': dict(zip(BUCKETS, self.buckets)),
+            'allocated_bytes_last': self.allocated_last,
+            'allocated_bytes_max': self.allocated_max,
+        }
+
+
+class Instrumentation:
+    """
+    Registry of timing spans around the hot stages of a request (history parsing, chart
+    filtering and indicators, API calls, table building).
+
+    Disabled, span() returns a shared no-op context and an instrumented function only checks
+    one attribute before calling through. Enabled, every span records its duration (and with
+    memory=True the net memory it allocated, sampled with tracemalloc) into per-name stats,
+    exported in the Prometheus text format or as JSON.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.started_at = datetime.now()
+        self._stats = {}
+        self._recent = deque(maxlen=RECENT_SPANS)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def enable(self, memory=False):
+        """Starts recording the spans; memory=True also samples the allocations with tracemalloc."""
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.memory = memory
+        self.enabled = True
+
+    def disable(self):
+        """Stops recording (the stats recorded so far are kept)."""
+        self.enabled = False
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.memory = False
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+            self._recent.clear()
+            self.started_at = datetime.now()
+
+    def span(self, name):
+        """Context manager timing the block under `name` (a shared no-op while disabled)."""
+        if not self.enabled:
+            return _NO_SPAN
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        memory = self.memory and tracemalloc.is_tracing()
+        allocated = tracemalloc.get_traced_memory()[0] if memory else None
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            if memory:
+                allocated = tracemalloc.get_traced_memory()[0] - allocated
+            stack.pop()
+            self.record(name, seconds, allocated, parent)
+
+    def instrumented(self, name):
+        """Decorator timing every call of a function under `name`."""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self._span(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds, allocated=None, parent=None):
+        """Adds one measurement of `name` (for durations measured outside of a span)."""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = SpanStats()
+            stats.add(seconds, allocated)
+            self._recent.append({
+                'span': name,
+                'parent': parent,
+                'at': datetime.now().isoformat(timespec='milliseconds'),
+                'seconds': seconds,
+                'allocated_bytes': allocated,
+                'thread': threading.current_thread().name,
+            })
+
+    def stats(self):
+        """Returns the stats of every span name (dict of dicts, sorted by total time)."""
+        with self._lock:
+            items = [(name, stats.to_dict()) for name, stats in self._stats.items()]
+        return dict(sorted(items, key=lambda item: item[1]['total_seconds'], reverse=True))
+
+    def recent_spans(self):
+        """Returns the last RECENT_SPANS spans, most recent first."""
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def traced_memory(self):
+        """Returns (current, peak) bytes traced by tracemalloc, None without memory sampling."""
+        if not (self.memory and tracemalloc.is_tracing()):
+            return None
+        return tracemalloc.get_traced_memory()
+
+    def to_json(self):
+        """Exports the stats as a JSON document."""
+        traced = self.traced_memory()
+        return json.dumps({
+            'started_at': self.started_at.isoformat(),
+            'exported_at': datetime.now().isoformat(),
+            'memory_sampling': traced is not None,
+            'traced_memory_bytes': None if traced is None else {'current': traced[0], 'peak': traced[1]},
+            'spans': {
+                name: dict(stats, buckets={str(bound): count for bound, count in stats['buckets'].items()})
+                for name, stats in self.stats().items()
+            },
+        }, indent=2)
+
+    def to_prometheus(self):
+        """Exports the stats in the Prometheus text exposition format."""
+        stats = self.stats()
+        duration = f"{METRIC_PREFIX}_span_duration_seconds"
+        lines = [
+            f"# HELP {duration} Time spent in each instrumented stage.",
+            f"# TYPE {duration} histogram",
+        ]
+        for name, span_stats in stats.items():
+            label = f'span="{_escape_label(name)}"'
+            cumulative = 0
+            for bound, count in span_stats['buckets'].items():
+                cumulative += count
+                lines.append(f'{duration}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{duration}_bucket{{{label},le="+Inf"}} {span_stats["count"]}')
+            lines.append(f'{duration}_sum{{{label}}} {span_stats["total_seconds"]:.9f}')
+            lines.append(f'{duration}_count{{{label}}} {span_stats["count"]}')
+
+        sampled = {name: span_stats for name, span_stats in stats.items()
+                   if span_stats['allocated_bytes_last'] is not None}
+        for suffix, key, help_text in (
+            ('last', 'allocated_bytes_last', "Net memory allocated by the last run of each stage (tracemalloc)."),
+            ('max', 'allocated_bytes_max', "Largest net memory allocated by a run of each stage (tracemalloc)."),
+        ):
+            if not sampled:
+                break
+            metric = f"{METRIC_PREFIX}_span_allocated_bytes_{suffix}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            lines += [f'{metric}{{span="{_escape_label(name)}"}} {span_stats[key]}'
+                      for name, span_stats in sampled.items()]
+
+        traced = self.traced_memory()
+        if traced is not None:
+            metric = f"{METRIC_PREFIX}_traced_memory_bytes"
+            lines += [
+                f"# HELP {metric} Memory traced by tracemalloc.",
+                f"# TYPE {metric} gauge",
+                f'{metric}{{kind="current"}} {traced[0]}',
+                f'{metric}{{kind="peak"}} {traced[1]}',
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# --- The registry of the process, configured from CRYPTODASH_PROFILE ---
+_registry = Instrumentation()
+if PROFILE not in ('', '0', 'false', 'off'):
+    _registry.enable(memory=PROFILE == 'memory')
+
+
+def get_registry():
+    """Returns the instrumentation registry shared by the process."""
+    return _registry
+
+
+def is_enabled():
+    return _registry.enabled
+
+
+def span(name):
+    """Times a block under `name` in the registry of the process (no-op while disabled)."""
+    return _registry.span(name)
+
+
+def instrumented(name):
+    """Decorator timing every call of a function under `name` in the registry of the process."""
+    return _registry.instrumented(name)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = _registry
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            body, content_type = self.registry.to_prometheus(), 'text/plain; version=0.0.4; charset=utf-8'
+        elif path == '/metrics.json':
+            body, content_type = self.registry.to_json(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # one scrape every few seconds: no access log
+
+
+def start_metrics_server(port, host=METRICS_HOST, registry=None):
+    """
+    Serves the metrics of a registry on /metrics (Prometheus) and /metrics.json from a
+    daemon thread.
+    Args:
+        port (int): The port to listen on (0: any free port, see server.server_address).
+        host (str): The interface to listen on (default: CRYPTODASH_METRICS_HOST, else 127.0.0.1).
+        registry (Instrumentation): The registry to export (default: the one of the process).
+    Returns:
+        ThreadingHTTPServer: The server (server.shutdown() stops it), None if the port is unavailable.
+    """
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry or _registry})
+    try:
+        server = ThreadingHTTPServer((host, int(port)), handler)
+    except OSError as e:
+        logging.error(f"[{datetime.now().isoformat()}] Metrics endpoint unavailable on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
@@ -0,0 +1,342 @@
+# src/utils/market_matrix.py
+
+import numpy as np
+import pandas as pd
+import threading
+from src.utils.coin_index import CoinIndex
+
+# Matrix -> column of the CoinIndex it is filled from
+MATRIX_FIELDS = {'price': 'current_price', 'market_cap': 'market_cap', 'volume': 'total_volume'}
+ONE_DAY = np.timedelta64(1, 'D')
+# Days in which a coin must have a market cap to be ranked by largest()
+RECENT_DAYS = 7
+# Rows reserved past the last day on a rebuild, so the next days are written in place
+SPARE_DAYS = 31
+
+
+def log_returns(prices):
+    """Daily log returns of a (days × coins) price matrix: (days - 1) × coins, NaN around gaps."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.log(prices[1:] / prices[:-1])
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+
+def correlation_matrix(returns, min_periods=20):
+    """
+    Pearson correlations between the columns of a (days × coins) matrix, each pair over the
+    days where both have a value, computed with matrix products instead of one pass per pair.
+    Returns:
+        np.ndarray: coins × coins, NaN for the pairs with fewer than min_periods common days.
+    """
+    mask = ~np.isnan(returns)
+    x = np.where(mask, returns, 0.0)
+    m = mask.astype(np.float64)
+    n = m.T @ m
+    sums = x.T @ m  # sums[i, j]: sum of the returns of i over the days where j has one too
+    squares = (x * x).T @ m
+    products = x.T @ x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = products - sums * sums.T / n
+        variance = squares - sums * sums / n
+        correlation = covariance / np.sqrt(variance * variance.T)
+    correlation[n < min_periods] = np.nan
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def rolling_correlation(returns, reference, window=30, min_periods=20):
+    """
+    Trailing-window correlation of every column of a (days × coins) matrix with a reference
+    series, for every day at once (cumulative sums over the pairs where both have a value).
+    Returns:
+        np.ndarray: days × coins, NaN where the window has fewer than min_periods common days.
+    """
+    valid = ~np.isnan(returns) & ~np.isnan(reference)[:, None]
+    x = np.where(valid, returns, 0.0)
+    y = np.where(valid, reference[:, None], 0.0)
+
+    def windowed(values):
+        total = np.cumsum(values, axis=0)
+        total[window:] = total[window:] - total[:-window]
+        return total
+
+    n = windowed(valid.astype(np.float64))
+    sx, sy = windowed(x), windowed(y)
+    sxx, syy, sxy = windowed(x * x), windowed(y * y), windowed(x * y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = sxy - sx * sy / n
+        correlation = covariance / np.sqrt((sxx - sx * sx / n) * (syy - sy * sy / n))
+    correlation[n < min_periods] = np.nan
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def _last_valid_rows(values):
+    """Row of the last non-NaN value of each column (-1 for an all-NaN column)."""
+    present = ~np.isnan(values)
+    last = len(values) - 1 - np.argmax(present[::-1], axis=0)
+    return np.where(present.any(axis=0), last, -1)
+
+
+class MarketMatrix:
+    """
+    Dense, aligned date × coin matrices of the daily price, market cap and volume.
+
+    Row i is the day origin + i (every calendar day: a date is an offset, not a lookup)
+    and column j the coin ids[j]; a coin without a value on a day holds NaN. The market-wide
+    analytics (correlations, dominance, return rankings) are array operations on them
+    instead of pivots of the long historical frame.
+
+    sync() brings the matrices up to date with a new CoinIndex: when the history only gained
+    days (or a new value of its last day), only the cells from the last known day on are
+    written, after a check that the known cells did not change; the capacity grows by
+    doubling, so the arrays are not copied at every new day. Any other change rebuilds them.
+    The matrices are shared by every session and modified in place by sync(): the queries
+    hold the same lock.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._clear()
+        self._lock = threading.RLock()
+
+    def _clear(self):
+        self.origin = None  # datetime64[D] of row 0
+        self.days = 0
+        self.ids = []
+        self._columns = {}  # coin id -> column
+        self._data = {name: np.empty((0, 0)) for name in MATRIX_FIELDS}
+        self._known = np.zeros(0, dtype=np.int64)  # per column: cells before the last day
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, coin_id):
+        return coin_id in self._columns
+
+    @property
+    def dates(self):
+        with self._lock:
+            if self.origin is None:
+                return np.array([], dtype='datetime64[D]')
+            return self.origin + np.arange(self.days) * ONE_DAY
+
+    def matrix(self, name):
+        """A copy of the (days × coins) matrix of 'price', 'market_cap' or 'volume'."""
+        with self._lock:
+            return self._matrix(name).copy()
+
+    def _matrix(self, name):
+        # a view, modified by the next sync(): only read under the lock
+        return self._data[name][:self.days, :len(self.ids)]
+
+    def _reserve(self, days, coins, reset=False):
+        rows, columns = self._data['price'].shape
+        if not reset and days <= rows and coins <= columns:
+            return
+        rows = days + SPARE_DAYS if reset else max(days, 2 * rows)
+        columns = coins if reset else max(coins, columns + columns // 2)
+        for name, data in self._data.items():
+            grown = np.full((rows, columns), np.nan)
+            if not reset:
+                grown[:data.shape[0], :data.shape[1]] = data
+            self._data[name] = grown
+
+    def sync(self, index: CoinIndex):
+        """
+        Brings the matrices up to date with a CoinIndex.
+        Returns:
+            str: 'extended' if only the new days were written, 'rebuilt' otherwise.
+        """
+        with self._lock:
+            ranges = np.array([index.range(coin_id) for coin_id in index.ids], dtype=np.int64).reshape(-1, 2)
+            starts, stops = ranges[:, 0], ranges[:, 1]
+            values = {name: index.values[column] for name, column in MATRIX_FIELDS.items()}
+            if not len(index.dates):
+                self._clear()
+                self.version = index.version
+                return 'rebuilt'
+
+            mode = 'extended' if self._extend(index.ids, starts, stops, index.dates, values) else 'rebuilt'
+            if mode == 'rebuilt':
+                dates = index.dates.astype('datetime64[D]')
+                self.origin = dates.min()
+                self.days = int((dates.max() - self.origin) / ONE_DAY) + 1
+                self.ids = list(index.ids)
+                self._columns = {coin_id: j for j, coin_id in enumerate(self.ids)}
+                self._reserve(self.days, len(self.ids), reset=True)
+                rows = ((dates - self.origin) / ONE_DAY).astype(np.int64)
+                columns = np.repeat(np.arange(len(self.ids)), stops - starts)
+                for name, data in self._data.items():
+                    data[rows, columns] = values[name]
+                self._mark(np.arange(len(self.ids)), starts, stops, index.dates)
+            self.version = index.version
+            return mode
+
+    def _row(self, dates):
+        return (dates - self.origin) // ONE_DAY
+
+    def _mark(self, columns, starts, stops, dates):
+        """
+        Records, for every coin, how many of its cells are before the last day (those an
+        extension must find unchanged).
+        """
+        last = self.days - 1
+        lengths = stops - starts
+        ends_last = (lengths > 0) & (self._row(dates[np.maximum(stops - 1, 0)]) == last)
+        self._known = np.zeros(len(self.ids), dtype=np.int64)
+        self._known[columns] = lengths - ends_last
+
+    def _extend(self, ids, starts, stops, dates, values):
+        """
+        Writes the days from the last known one on, if the earlier ones did not change: as in
+        IndicatorEngine.sync, every known coin must still have all its known cells, on the same
+        days and with the same values (a corrected older snapshot rebuilds the matrices), and
+        nothing between them and the last known day.
+        """
+        if self.origin is None or len(ids) < len(self.ids):
+            return False
+        last = self.days - 1
+        columns = np.array([self._columns.get(coin_id, -1) for coin_id in ids], dtype=np.int64)
+        is_new = columns < 0
+        if np.count_nonzero(~is_new) != len(self.ids):  # a known coin left the history
+            return False
+        lengths = stops - starts
+        known = np.where(is_new, 0, self._known[columns])
+        if (lengths < known).any() or self._row(dates[starts[lengths > 0]]).min() < 0:
+            return False
+        # every known cell, compared in one vectorized gather per matrix
+        known_positions = np.arange(known.sum()) + np.repeat(starts - np.cumsum(known) + known, known)
+        known_rows = self._row(dates[known_positions])
+        if (known_rows >= last).any():
+            return False
+        known_cells = known_rows * self._data['price'].shape[1] + np.repeat(columns, known)
+        for name, data in self._data.items():
+            # bitwise, so that a NaN cell matches a NaN value
+            if not np.array_equal(values[name].take(known_positions).view(np.int64),
+                                  data.ravel().take(known_cells).view(np.int64)):
+                return False
+        # the first cell after the known ones must not be before the last known day
+        first_new = starts + known
+        has_new = first_new < stops
+        if (self._row(dates[first_new[has_new]]) < last).any():
+            return False
+        recent = stops - first_new
+        positions = np.arange(recent.sum()) + np.repeat(first_new - np.cumsum(recent) + recent, recent)
+        rows = self._row(dates[positions])
+        if not len(rows) or rows.max() < last:  # the last known day is gone
+            return False
+
+        for j, coin_id in enumerate(ids):
+            if is_new[j]:
+                columns[j] = self._columns[coin_id] = len(self.ids)
+                self.ids.append(coin_id)
+        self.days = int(rows.max()) + 1
+        self._reserve(self.days, len(self.ids))
+        target = np.repeat(columns, recent)
+        for name, data in self._data.items():
+            data[last, :] = np.nan  # the last known day is written again from the new index
+            data[rows, target] = values[name][positions]
+        self._mark(columns, starts, stops, dates)
+        return True
+
+    def _window(self, days):
+        """First row of the trailing window of `days` days (all the rows when days is None)."""
+        return 0 if days is None else max(0, self.days - int(days))
+
+    def correlations(self, coin_ids, days=None, min_periods=20):
+        """
+        Correlations of the daily log returns of coins over the last `days` days.
+        Returns:
+            pd.DataFrame: coins × coins (the coins without history are left out).
+        """
+        with self._lock:
+            coin_ids = [coin_id for coin_id in coin_ids if coin_id in self._columns]
+            columns = [self._columns[coin_id] for coin_id in coin_ids]
+            prices = self._matrix('price')[self._window(days):, columns]
+        correlation = correlation_matrix(log_returns(prices), min_periods=min_periods)
+        return pd.DataFrame(correlation, index=coin_ids, columns=coin_ids)
+
+    def rolling_correlations(self, coin_ids, reference='bitcoin', window=30, days=None, min_periods=20):
+        """
+        Trailing `window`-day correlation of the daily log returns of coins with a reference coin.
+        Returns:
+            pd.DataFrame: Indexed by date, one column per coin.
+        """
+        with self._lock:
+            coin_ids = [coin_id for coin_id in coin_ids if coin_id in self._columns]
+            if reference not in self._columns or self.days < 2:
+                return pd.DataFrame(columns=coin_ids)
+            prices = self._matrix('price')
+            returns = log_returns(prices[:, [self._columns[coin_id] for coin_id in coin_ids]])
+            reference_returns = log_returns(prices[:, [self._columns[reference]]])[:, 0]
+            start = max(0, self._window(days) - 1)
+            dates = self.dates[1:][start:]
+        correlation = rolling_correlation(returns, reference_returns, window=window, min_periods=min_periods)
+        return pd.DataFrame(correlation[start:], index=dates, columns=coin_ids)
+
+    def _latest(self, name, start=0):
+        """Latest value of every coin in the rows from `start` on (NaN if it has none)."""
+        values = self._matrix(name)[start:]
+        last = _last_valid_rows(values)
+        return np.where(last >= 0, values[np.maximum(last, 0), np.arange(values.shape[1])], np.nan)
+
+    def largest(self, top=10):
+        """
+        The `top` coins with the largest latest market cap, largest first. Only the coins with a
+        market cap in the last RECENT_DAYS days are ranked: a coin that left the archive is not.
+        """
+        with self._lock:
+            latest = self._latest('market_cap', self._window(RECENT_DAYS))
+            order = np.argsort(np.where(np.isnan(latest), np.inf, -latest), kind='stable')
+            return [self.ids[j] for j in order[:top] if not np.isnan(latest[j])]
+
+    def dominance(self, top=10, days=None):
+        """
+        Share of the total market cap (of the coins in the archive) of the `top` largest coins,
+        the rest summed as 'Others', for every day.
+        Returns:
+            pd.DataFrame: Indexed by date, one column per coin plus 'Others', in percent.
+        """
+        with self._lock:
+            start = self._window(days)
+            caps = self._matrix('market_cap')[start:]
+            if not caps.size:
+                return pd.DataFrame()
+            largest = [self._columns[coin_id] for coin_id in self.largest(top)]
+            total = np.nansum(caps, axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                shares = np.nan_to_num(caps[:, largest]) / total[:, None] * 100
+                others = 100 - shares.sum(axis=1)
+            shares[total == 0] = np.nan
+            others[total == 0] = np.nan
+            data = {self.ids[j]: shares[:, i] for i, j in enumerate(largest)}
+            data['Others'] = others
+            return pd.DataFrame(data, index=self.dates[start:])
+
+    def return_ranking(self, days=30):
+        """
+        Return of every coin over the last `days` days: from its first price in the window to
+        its last one.
+        Returns:
+            pd.DataFrame: 'id', 'start_price', 'end_price', 'return' (percent) and 'days'
+            (days between the two prices), sorted by return, best first.
+        """
+        with self._lock:
+            prices = self._matrix('price')[self._window(days):]
+            if not prices.size:
+                return pd.DataFrame(columns=['id', 'start_price', 'end_price', 'return', 'days'])
+            present = ~np.isnan(prices)
+            first = np.argmax(present, axis=0)
+            last = _last_valid_rows(prices)
+            coins = np.arange(prices.shape[1])
+            start_price, end_price = prices[first, coins], prices[last, coins]
+            ids = list(self.ids)
+        ranking = pd.DataFrame({
+            'id': ids,
+            'start_price': start_price,
+            'end_price': end_price,
+            'return': (end_price / start_price - 1) * 100,
+            'days': last - first,
+        })
+        ranking = ranking[(last >= 0) & (last > first)]
+        return ranking.sort_values('return', ascending=False, kind='stable').reset_index(drop=True)
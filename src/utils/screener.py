@@ -0,0 +1,163 @@
+# src/utils/screener.py
+
+import numpy as np
+import pandas as pd
+from src.utils.instrumentation import instrumented
+
+# Columns the results can be sorted by: label -> column of the screener
+SORT_KEYS = {
+    'Market Cap': 'market_cap',
+    '24h Volume': 'total_volume',
+    '24h Change (%)': 'price_change_percentage_24h',
+    'Distance from MA 30d (%)': 'ma_30_distance',
+    'Price': 'current_price',
+}
+# Market cap bands (USD): label -> [low, high)
+MARKET_CAP_BANDS = {
+    'Mega (> $100B)': (1e11, np.inf),
+    'Large ($10B - $100B)': (1e10, 1e11),
+    'Mid ($1B - $10B)': (1e9, 1e10),
+    'Small ($100M - $1B)': (1e8, 1e9),
+    'Micro (< $100M)': (0, 1e8),
+}
+RESULT_COLUMNS = ['rank', 'id', 'name', 'symbol', 'image', 'current_price', 'price_change_percentage_24h',
+                  'market_cap', 'total_volume', 'ma_30_distance']
+_PREFIX_END = '\U0010ffff'  # sorts after any character: the keys of a prefix are in [prefix, prefix + _PREFIX_END)
+
+
+def _numbers(values):
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _text(df, column):
+    if column not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[column].astype(object).where(df[column].notna(), "").astype(str)
+
+
+class Screener:
+    """
+    Filters and sorts the whole coin universe of one market snapshot.
+
+    Built once per snapshot (and version of the history, for the distance from the 30-day MA)
+    and shared by every session: the columns are numpy arrays, the order of every sort key is
+    precomputed in both directions, and the names, their words and the symbols are kept in a
+    sorted prefix index. A query is then a few vectorized masks, binary searches for the search
+    text and a pass over one precomputed order, without sorting or scanning strings.
+    Never modified once built, so concurrent queries need no lock.
+    """
+
+    @instrumented('screener.build')
+    def __init__(self, data_df: pd.DataFrame, ma_30=None, version=None):
+        """
+        Args:
+            data_df (pd.DataFrame): The snapshot, in the schema of get_top_cryptos (market cap order), in USD.
+            ma_30 (pd.Series): The latest 30-day MA of the coins, indexed by id (CoinIndex.latest('ma_30')),
+                None while the history is not loaded.
+            version: Version of the snapshot and history the screener was built from.
+        """
+        self.version = version
+        data_df = data_df.drop_duplicates(subset='id') if data_df is not None else pd.DataFrame(columns=['id'])
+        self.ids = data_df['id'].to_numpy(dtype=object)
+        self.has_ma = ma_30 is not None
+        self.names = _text(data_df, 'name').to_numpy(dtype=object)
+        self.symbols = _text(data_df, 'symbol').str.upper().to_numpy(dtype=object)
+        self.images = _text(data_df, 'image').to_numpy(dtype=object)
+
+        self.values = {
+            column: _numbers(data_df[column]) if column in data_df.columns else np.full(len(data_df), np.nan)
+            for column in ('current_price', 'price_change_percentage_24h', 'market_cap', 'total_volume')
+        }
+        ma = (ma_30.reindex(self.ids).to_numpy(dtype=np.float64, na_value=np.nan) if self.has_ma
+              else np.full(len(self.ids), np.nan))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.values['ma_30_distance'] = np.where(ma > 0, (self.values['current_price'] / ma - 1) * 100, np.nan)
+
+        # the order of every sort key, NaNs last in both directions
+        self._orders = {}
+        for column in SORT_KEYS.values():
+            values = self.values[column]
+            self._orders[column, False] = np.argsort(values, kind='stable')
+            self._orders[column, True] = np.argsort(-values, kind='stable')
+
+        # prefix index: the lower-case name, each following word of the name, and the symbol
+        keys, rows = [], []
+        for row, (name, symbol) in enumerate(zip(self.names, self.symbols)):
+            words = name.lower().split()
+            for key in {name.lower(), *words[1:], symbol.lower()} - {""}:
+                keys.append(key)
+                rows.append(row)
+        keys = np.array(keys, dtype=str)
+        order = np.argsort(keys, kind='stable')
+        self._prefix_keys = keys[order]
+        self._prefix_rows = np.array(rows, dtype=np.int64)[order]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, prefix):
+        """
+        Rows of the coins whose name, a word of their name or symbol starts with `prefix` (case-insensitive).
+        Returns:
+            np.ndarray: The rows, sorted (every row for an empty prefix).
+        """
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return np.arange(len(self.ids))
+        start = np.searchsorted(self._prefix_keys, prefix, side='left')
+        stop = np.searchsorted(self._prefix_keys, prefix + _PREFIX_END, side='left')
+        return np.unique(self._prefix_rows[start:stop])
+
+    def _in_range(self, mask, column, low, high):
+        # a NaN is outside every range, None means no bound
+        values = self.values[column]
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+
+    @instrumented('screener.query')
+    def query(self, search="", market_cap_bands=(), change_range=(None, None), min_volume=None,
+              ma_distance_range=(None, None), sort_by='market_cap', descending=True, limit=100):
+        """
+        Filters and sorts the coins.
+        Args:
+            search (str): Prefix of the name, of a word of the name or of the symbol.
+            market_cap_bands (list): Labels of MARKET_CAP_BANDS (any band if empty).
+            change_range (tuple): (low, high) of the 24h change in percent, None for no bound.
+            min_volume (float): Minimal 24h volume (USD).
+            ma_distance_range (tuple): (low, high) of the distance from the 30-day MA in percent.
+            sort_by (str): A column of SORT_KEYS (the coins without a value come last).
+            descending (bool): Sort order.
+            limit (int): Number of coins returned (all of them with None).
+        Returns:
+            tuple: (pd.DataFrame of the RESULT_COLUMNS of the first `limit` matches, in USD;
+            the number of matches).
+        """
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[self.search(search)] = True
+        if market_cap_bands:
+            caps = self.values['market_cap']
+            in_bands = np.zeros(len(self.ids), dtype=bool)
+            for band in market_cap_bands:
+                low, high = MARKET_CAP_BANDS[band]
+                in_bands |= (caps >= low) & (caps < high)
+            mask &= in_bands
+        self._in_range(mask, 'price_change_percentage_24h', *change_range)
+        self._in_range(mask, 'total_volume', min_volume, None)
+        self._in_range(mask, 'ma_30_distance', *ma_distance_range)
+
+        order = self._orders[sort_by, descending]
+        matches = order[mask[order]]
+        return self.rows(matches if limit is None else matches[:limit]), len(matches)
+
+    def rows(self, rows):
+        """The RESULT_COLUMNS of some rows, in that order ('rank' is the market cap rank in the snapshot)."""
+        return pd.DataFrame({
+            'rank': rows + 1,
+            'id': self.ids[rows],
+            'name': self.names[rows],
+            'symbol': self.symbols[rows],
+            'image': self.images[rows],
+            **{column: self.values[column][rows] for column in RESULT_COLUMNS[5:]},
+        })
@@ -0,0 +1,101 @@
+# src/utils/shared_history.py
+
+import numpy as np
+import pandas as pd
+import logging
+import os
+import json
+import shutil
+from datetime import datetime
+
+SHARED_DIR = os.path.join('data', 'store', 'shared')
+CATEGORIES_FILE = 'categories.json'
+# string columns are stored as integer codes into a list of categories
+CATEGORICAL_COLUMNS = ['id', 'name', 'symbol', 'image']
+
+
+def _codes_dtype(n_categories):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def publish_shared_history(df: pd.DataFrame, token: str, shared_dir=SHARED_DIR, keep=2):
+    """
+    Writes the history as one .npy file per column in shared_dir/<token>/, so that
+    every worker process can memory-map the same files instead of holding its own copy.
+    The directory is written under a temporary name then renamed, so readers never see
+    a partial version. Only the `keep` most recent versions are kept on disk.
+    Args:
+        df (pd.DataFrame): The historical data (load_historical_data layout).
+        token (str): Identifier of the data version (e.g. a hash of the store manifest).
+        shared_dir (str): The directory holding the published versions.
+    Returns:
+        str: The directory of the published version.
+    """
+    target = os.path.join(shared_dir, token)
+    if os.path.exists(target):
+        return target
+    os.makedirs(shared_dir, exist_ok=True)
+    tmp_dir = f"{target}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    categories = {}
+    for column in df.columns:
+        values = df[column]
+        if column in CATEGORICAL_COLUMNS:
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            categories[column] = [str(u) for u in uniques]
+            array = codes.astype(_codes_dtype(len(uniques)))
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            array = values.to_numpy(dtype='datetime64[ns]')
+        else:
+            array = values.to_numpy(dtype=np.float64)
+        np.save(os.path.join(tmp_dir, f"{column}.npy"), array)
+
+    with open(os.path.join(tmp_dir, CATEGORIES_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'columns': list(df.columns), 'categories': categories}, f, ensure_ascii=False)
+    try:
+        os.rename(tmp_dir, target)
+    except OSError:
+        # another worker published the same version first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    versions = sorted(
+        (entry for entry in os.scandir(shared_dir) if entry.is_dir() and '.tmp' not in entry.name),
+        key=lambda entry: entry.stat().st_mtime, reverse=True
+    )
+    for entry in versions[keep:]:
+        # workers still mapping an old version keep their pages until they unmap them
+        shutil.rmtree(entry.path, ignore_errors=True)
+    logging.info(f"[{datetime.now().isoformat()}] Shared history {token} published ({len(df)} records).")
+    return target
+
+
+def open_shared_history(token: str, shared_dir=SHARED_DIR):
+    """
+    Opens a published version of the history as a read-only DataFrame.
+    The numeric and date columns are memory-mapped (the pages are shared by every
+    process mapping the same files); the string columns are rebuilt as categoricals.
+    Returns:
+        pd.DataFrame or None: The history, or None if the version was not published.
+    """
+    path = os.path.join(shared_dir, token)
+    if not os.path.exists(os.path.join(path, CATEGORIES_FILE)):
+        return None
+    try:
+        with open(os.path.join(path, CATEGORIES_FILE), 'r', encoding='utf-8') as f:
+            layout = json.load(f)
+        data = {}
+        for column in layout['columns']:
+            array = np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r')
+            if column in layout['categories']:
+                data[column] = pd.Categorical.from_codes(array, categories=layout['categories'][column])
+            else:
+                data[column] = array
+    except (OSError, ValueError, KeyError, json.JSONDecodeError) as e:
+        logging.warning(f"[{datetime.now().isoformat()}] Shared history {token} unavailable: {e}")
+        return None
+    return pd.DataFrame(data, copy=False)
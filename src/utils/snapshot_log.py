@@ -0,0 +1,173 @@
+# src/utils/snapshot_log.py
+
+import pandas as pd
+import numpy as np
+import logging
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime
+
+LOG_DIR = os.path.join('data', 'intraday')
+SEGMENT_SUFFIX = '.jsonl.gz'
+# Added by the compaction to the consolidated daily records
+DAY_COLUMNS = ['day_open', 'day_high', 'day_low', 'snapshot_count']
+
+
+def _json_value(value):
+    if isinstance(value, (float, np.floating)) and np.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def append_snapshot(data_df: pd.DataFrame, log_dir=LOG_DIR, collected_at=None):
+    """
+    Appends one market snapshot to the intraday log.
+    Each snapshot is a new gzip JSON Lines segment (one coin per line) in the directory of its
+    day, written to a temporary file and renamed: a crash never leaves a partial segment behind,
+    and existing segments are never rewritten.
+    Args:
+        data_df (pd.DataFrame): The snapshot, in the schema of fetch_crypto_data.
+        log_dir (str): Root of the log (one sub-directory per day).
+        collected_at (datetime): Time of the snapshot (default: now).
+    Returns:
+        str: The path of the segment, None if the snapshot is empty.
+    """
+    if data_df is None or data_df.empty:
+        return None
+    collected_at = collected_at or datetime.now()
+    day_dir = os.path.join(log_dir, collected_at.strftime('%Y-%m-%d'))
+    os.makedirs(day_dir, exist_ok=True)
+    path = os.path.join(day_dir, collected_at.strftime('%H%M%S%f') + SEGMENT_SUFFIX)
+    tmp_path = os.path.join(day_dir, f".{os.path.basename(path)}.tmp")
+
+    timestamp = collected_at.isoformat()
+    columns = list(data_df.columns)
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        for row in data_df.itertuples(index=False, name=None):
+            record = {column: _json_value(value) for column, value in zip(columns, row)}
+            record.setdefault('collect_timestamp', timestamp)
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+    os.replace(tmp_path, path)
+    return path
+
+
+def list_log_days(log_dir=LOG_DIR):
+    """Returns the 'YYYY-MM-DD' days that have segments in the log, sorted."""
+    if not os.path.exists(log_dir):
+        return []
+    return sorted(
+        day for day in os.listdir(log_dir)
+        if os.path.isdir(os.path.join(log_dir, day)) and _segments(os.path.join(log_dir, day))
+    )
+
+
+def _segments(day_dir):
+    return sorted(f for f in os.listdir(day_dir) if f.endswith(SEGMENT_SUFFIX))
+
+
+def read_log_day(day, log_dir=LOG_DIR):
+    """
+    Reads every snapshot of one day of the log.
+    Returns:
+        list: The records of the day, in the order they were collected.
+    """
+    day_dir = os.path.join(log_dir, day)
+    records = []
+    for segment in _segments(day_dir) if os.path.isdir(day_dir) else []:
+        try:
+            with gzip.open(os.path.join(day_dir, segment), 'rt', encoding='utf-8') as f:
+                records.extend(json.loads(line) for line in f if line.strip())
+        except (OSError, EOFError, json.JSONDecodeError) as e:
+            logging.error(f"[{datetime.now().isoformat()}] Unreadable segment {segment} of {day}: {e}")
+    return records
+
+
+def _consolidate(records):
+    """
+    One record per coin: the last snapshot of the day, with the price of the first snapshot
+    (day_open), the highest and lowest prices of the day and the number of snapshots.
+    Records that were already consolidated contribute their own day_open/high/low.
+    """
+    df = pd.DataFrame.from_records(records)
+    df['_time'] = pd.to_datetime(df['collect_timestamp'], errors='coerce', format='ISO8601')
+    df = df.dropna(subset=['id', '_time']).sort_values('_time', kind='stable')
+    price = pd.to_numeric(df['current_price'], errors='coerce')
+    for column in DAY_COLUMNS:
+        if column not in df.columns:
+            df[column] = np.nan
+    df['_open'] = pd.to_numeric(df['day_open'], errors='coerce').fillna(price)
+    df['_high'] = pd.to_numeric(df['day_high'], errors='coerce').fillna(price)
+    df['_low'] = pd.to_numeric(df['day_low'], errors='coerce').fillna(price)
+    df['_count'] = pd.to_numeric(df['snapshot_count'], errors='coerce').fillna(1)
+
+    groups = df.groupby('id', sort=False)
+    daily = groups.tail(1).set_index('id')
+    daily['day_open'] = groups['_open'].first()
+    daily['day_high'] = groups['_high'].max()
+    daily['day_low'] = groups['_low'].min()
+    daily['snapshot_count'] = groups['_count'].sum().astype(int)
+    daily = daily.reset_index().drop(columns=['_time', '_open', '_high', '_low', '_count'])
+    if 'market_cap' in daily.columns:
+        daily = daily.sort_values('market_cap', ascending=False, na_position='last', kind='stable')
+    return daily.astype(object).where(daily.notna(), None)
+
+
+def compact_day(day, log_dir=LOG_DIR, data_dir='data'):
+    """
+    Rolls the snapshots of one day into the consolidated file 'crypto_data_YYYY-MM-DD.json'.
+    A daily file that already exists (from the daily job or an earlier compaction) is merged in.
+    The file is written to a temporary file and renamed before the segments are removed, so a
+    crash at any point leaves the segments, the consolidated day, or both (the next compaction
+    then skips the segments that are already in the consolidated day).
+    Returns:
+        str: The path of the daily file, None if the day has no snapshot.
+    """
+    records = read_log_day(day, log_dir)
+    if not records:
+        return None
+    file_path = os.path.join(data_dir, f"crypto_data_{day}.json")
+    if os.path.exists(file_path):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logging.error(f"[{datetime.now().isoformat()}] Error loading data from {file_path}: {e}")
+            existing = []
+        if existing and 'snapshot_count' in existing[0]:
+            # already compacted: the segments it was made from are left over from a crash
+            compacted = pd.to_datetime([r.get('collect_timestamp') for r in existing], errors='coerce', format='ISO8601').max()
+            times = pd.to_datetime([r.get('collect_timestamp') for r in records], errors='coerce', format='ISO8601')
+            records = [r for r, t in zip(records, times) if t > compacted]
+        records = existing + records
+
+    daily = _consolidate(records)
+    os.makedirs(data_dir, exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(daily.to_dict(orient='records'), f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+    shutil.rmtree(os.path.join(log_dir, day))
+    logging.info(f"[{datetime.now().isoformat()}] {day}: {len(daily)} coins compacted into {file_path}")
+    return file_path
+
+
+def compact_finished_days(log_dir=LOG_DIR, data_dir='data', today=None):
+    """
+    Compacts every day of the log before `today` (default: the current day). The current day
+    stays in the log, so the daily files, which the history is read from, only change once a day.
+    Returns:
+        list: The paths of the daily files written.
+    """
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    written = []
+    for day in list_log_days(log_dir):
+        if day < today:
+            file_path = compact_day(day, log_dir, data_dir)
+            if file_path:
+                written.append(file_path)
+    return written
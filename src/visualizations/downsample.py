@@ -0,0 +1,98 @@
+# src/visualizations/downsample.py
+
+import numpy as np
+
+# A chart is about this many pixels wide in the center column of the app
+DEFAULT_CHART_WIDTH = 1000
+# Above this many points per trace, the traces are drawn with WebGL (go.Scattergl)
+WEBGL_THRESHOLD = 1000
+
+
+def points_for_width(width=DEFAULT_CHART_WIDTH):
+    """Number of points worth sending for a chart `width` pixels wide (4 per pixel column, see minmax_indices)."""
+    return 4 * int(width)
+
+
+def _as_numbers(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def minmax_indices(x, y, max_points):
+    """
+    Min/max (M4) bucketing: splits the x range into max_points / 4 equal buckets and keeps the
+    first, last, lowest and highest point of each one. With a bucket per pixel column, the line
+    drawn from these points covers the same pixels as the full series: every peak is kept, and
+    so are the values the line enters and leaves each column with.
+    Args:
+        x (array): The x values, increasing (numbers or datetimes).
+        y (array): The values (NaNs are only kept when a whole bucket is NaN).
+        max_points (int): Upper bound of the number of points kept.
+    Returns:
+        np.ndarray: The sorted positions of the points to keep.
+    """
+    x = _as_numbers(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    buckets = max_points // 4
+    if n <= max_points or buckets < 1 or x[-1] == x[0]:
+        return np.arange(n)
+    bucket = np.minimum(((x - x[0]) / (x[-1] - x[0]) * buckets).astype(np.int64), buckets - 1)
+    _, starts = np.unique(bucket, return_index=True)  # buckets without points are skipped
+    ends = np.append(starts[1:], n) - 1
+    # the lowest (highest) value of a bucket is the first (last) one of the bucket once sorted by value
+    low_order = np.lexsort((np.where(np.isnan(y), np.inf, y), bucket))
+    high_order = np.lexsort((np.where(np.isnan(y), -np.inf, y), bucket))
+    keep = np.concatenate((starts, ends, low_order[starts], high_order[ends]))
+    return np.unique(keep)
+
+
+def lttb_indices(x, y, max_points):
+    """
+    Largest-Triangle-Three-Buckets: keeps one point per bucket, the one forming the largest
+    triangle with the point kept in the previous bucket and the mean of the next bucket.
+    Gives a smooth shape with few points, but a peak can be flattened when its bucket has
+    a larger triangle elsewhere, and the line between buckets can cut through a pixel column.
+    Args:
+        x (array): The x values, increasing (numbers or datetimes).
+        y (array): The values.
+        max_points (int): Number of points kept.
+    Returns:
+        np.ndarray: The sorted positions of the points to keep.
+    """
+    x = _as_numbers(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    edges = (np.arange(max_points - 1) * (n - 2) // (max_points - 2) + 1).tolist() + [n - 1]
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:max(next_end, end + 1)].mean()
+        next_y = np.nanmean(y[end:max(next_end, end + 1)])
+        # twice the area of the triangle (previous point, candidate, next bucket mean)
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.nanargmax(area)) if not np.all(np.isnan(area)) else start
+        keep[i + 1] = previous
+    return keep
+
+
+def downsample_indices(x, y, max_points, method='minmax'):
+    """
+    Positions of the points to draw for a series of len(y) points, at most max_points of them.
+    Args:
+        method (str): 'minmax' (keeps every peak, default) or 'lttb' (smoother shape, peaks not guaranteed).
+    """
+    if method == 'lttb':
+        return lttb_indices(x, y, max_points)
+    if method == 'minmax':
+        return minmax_indices(x, y, max_points)
+    raise ValueError(f"Unknown downsampling method: {method}")
@@ -0,0 +1,70 @@
+# src/visualizations/figure_cache.py
+
+import threading
+from collections import OrderedDict
+
+
+class FigureCache:
+    """
+    Bounded LRU cache of built figures, shared by every session of the process.
+
+    Entries are keyed by the version of the history they were drawn from, so a new
+    snapshot makes the previous figures unreachable and the LRU order evicts them.
+    The cached figures are shared: they must not be modified by the caller.
+    """
+
+    def __init__(self, max_entries=64):
+        """
+        Args:
+            max_entries (int): Number of figures kept; the least recently used one is evicted first.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, version, key, build):
+        """
+        Returns the figure cached for (version, key), building it with build() on a miss.
+        Args:
+            version (str): Version token of the history the figure is drawn from.
+            key (tuple): Everything else the figure depends on (coin, period, indicators...).
+            build (callable): Builds the figure, called without the lock held.
+        """
+        key = (version, *key)
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return figure
+            self.misses += 1
+
+        # built outside the lock: two sessions missing the same key at once both build it
+        figure = build()
+        with self._lock:
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+                self.evictions += 1
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+    def stats(self):
+        """Returns the hit/miss/eviction counters and the current size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'size': len(self._figures),
+                'max_entries': self.max_entries,
+            }
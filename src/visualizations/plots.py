@@ -2,12 +2,19 @@
 
 import pandas as pd
 import plotly.graph_objects as go
-import logging
+from plotly.subplots import make_subplots
 import os
-import json
-from datetime import datetime, timedelta # Importe timedelta for date calculations
+from datetime import timedelta # Importe timedelta for date calculations
+from src.utils.ingest import ingest_snapshot_files
+from src.utils.coin_index import CoinIndex
+from src.utils.indicators import compute_indicators
+from src.utils.bars import BAR_COLUMNS, RESOLUTION_LABELS
+from src.utils.fx import BASE_CURRENCY
+from src.utils.instrumentation import instrumented, span
+from src.visualizations.downsample import WEBGL_THRESHOLD, downsample_indices, points_for_width
 
 
+@instrumented('history.load_historical_data')
 def load_historical_data(data_dir='data'):
     """
     charge every JSON file that starts with 'crypto_data_' and ends with '.json' in the directory.
@@ -17,72 +24,33 @@ def load_historical_data(data_dir='data'):
     Returns:
         pd.DataFrame: A DataFrame containing the loaded data if available, otherwise an empty DataFrame.
     """
-    all_data = []
     if not os.path.exists(data_dir):
         return pd.DataFrame()
 
-    for filename in sorted(os.listdir(data_dir)):
-        if filename.startswith('crypto_data_') and filename.endswith('.json'):
-            file_path = os.path.join(data_dir, filename)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if not data:
-                        logging.warning(f"[{datetime.now().isoformat()}] file {filename} does not contain any data or incorrectly formatted.")
-                        continue
-
-                    for record in data:
-                        try:
-                                # Normalize the date to the start of the day using the timestamp
-                                record['date_processed'] = pd.to_datetime(record.get('collect_timestamp')).normalize()
-                        except ValueError:
-                                # If 'collect_timestamp' is not available or invalid, use the filename as a fallback
-                                record['date_processed'] = pd.to_datetime(filename.replace('crypto_data_', '').replace('.json', ''), errors='coerce').normalize()
-                        
-                        if pd.isna(record['date_processed']):
-                            logging.warning(f"[{datetime.now().isoformat()}] Problem with file {filename} or timestamp.") 
-                            continue
-                    all_data.extend(data)
-            except (json.JSONDecodeError, IOError) as e:
-                logging.error(f"[{datetime.now().isoformat()}] Error loading data from {file_path}: {e}")
-                continue
-    
-    if not all_data:
+    file_paths = [
+        os.path.join(data_dir, filename) for filename in sorted(os.listdir(data_dir))
+        if filename.startswith('crypto_data_') and filename.endswith('.json')
+    ]
+    # Records are parsed in batches of files, with one vectorized timestamp and numeric conversion per batch
+    df = ingest_snapshot_files(file_paths)
+    if df is None:
         return pd.DataFrame()
 
-    df = pd.DataFrame(all_data)
-    df['date'] = pd.to_datetime(df['date_processed'], errors='coerce')
-    df['current_price'] = pd.to_numeric(df['current_price'], errors='coerce')
+    df = df.drop(columns='timestamp')
+    df['date'] = df['date_processed']
     df = df.dropna(subset=['current_price', 'date'])
-    
+
     return df.sort_values(by=['date', 'name'])
 
 
-def plot_price_evolution_with_moving_averages(df: pd.DataFrame, crypto_id: str, time_period: str = 'Tout'):
+def _daily_prices(df: pd.DataFrame, crypto_id: str, time_period: str):
     """
-    Generates a chart of a cryptocurrency's price evolution using moving averages,
-    filtered by a given time period.
-
-    Args:
-    df(pd.DataFrame): DataFrame containing consolidated historical data.
-    crypto_id(str): The ID of the cryptocurrency to display (e.g., 'bitcoin').
-    time_period(str): The time period to filter on ('24h', '7d', '1m', '1y', 'All').
-
-    Returns:
-    go.Figure: A Plotly figure.
+    Scans the consolidated history for one coin and averages its prices per day.
+    Returns None if the coin is not in the DataFrame.
     """
     crypto_df = df[df['id'] == crypto_id].copy()
-    
     if crypto_df.empty:
-        fig = go.Figure()
-        fig.add_annotation(
-            text=f" No data found for {crypto_id}",
-            xref="paper", yref="paper",
-            showarrow=False,
-            font=dict(size=20, color="gray")
-        )
-        fig.update_layout(title=f"Price Evolution for {crypto_id.capitalize()}")
-        return fig
+        return None
 
     # filtring by date based on the selected time period
     end_date = crypto_df['date'].max() # recent date in the data
@@ -103,7 +71,68 @@ def plot_price_evolution_with_moving_averages(df: pd.DataFrame, crypto_id: str,
     crypto_df = crypto_df.sort_values(by='date')
     
     # Calculate the average price for each day   
-    daily_prices = crypto_df.groupby('date')['current_price'].mean().reset_index()
+    return crypto_df.groupby('date')['current_price'].mean().reset_index()
+
+
+# Indicators that can be added to the price chart, and the columns each one reads
+INDICATOR_OPTIONS = {
+    'ma': ['ma_7', 'ma_30'],
+    'ema': ['ema_12', 'ema_26'],
+    'bollinger': ['bb_middle', 'bb_upper', 'bb_lower'],
+    'rsi': ['rsi_14'],
+    'volatility': ['volatility_30'],
+}
+# Indicators drawn in their own panel below the price
+OSCILLATORS = {'rsi': ('RSI (14)', 'purple'), 'volatility': ('Volatility 30d (%)', 'teal')}
+# Columns in USD, converted to the display currency (the oscillators do not depend on the currency)
+PRICE_COLUMNS = ['current_price', 'ma_7', 'ma_30', 'ema_12', 'ema_26', 'bb_middle', 'bb_upper', 'bb_lower']
+
+
+@instrumented('chart.price_evolution')
+def plot_price_evolution_with_moving_averages(df: pd.DataFrame, crypto_id: str, time_period: str = 'Tout', index: CoinIndex = None, indicators=('ma',), max_points=None, downsampling='minmax', currency=BASE_CURRENCY, rates=None):
+    """
+    Generates a chart of a cryptocurrency's price evolution using moving averages,
+    filtered by a given time period.
+
+    Args:
+    df(pd.DataFrame): DataFrame containing consolidated historical data (unused if index is given).
+    crypto_id(str): The ID of the cryptocurrency to display (e.g., 'bitcoin').
+    time_period(str): The time period to filter on ('24h', '7d', '1m', '1y', 'All').
+    index(CoinIndex): Optional per-coin index of the same data; the period is then a slice instead of a scan,
+        and the indicators precomputed on the whole history are read from it.
+    indicators(tuple): Keys of INDICATOR_OPTIONS to draw (moving averages only by default).
+    max_points(int): Points sent to the browser per trace (default: enough for a chart of DEFAULT_CHART_WIDTH pixels).
+        Longer series are downsampled after the indicators are computed; above WEBGL_THRESHOLD points,
+        the traces are drawn with WebGL.
+    downsampling(str): 'minmax' (keeps every peak) or 'lttb', see downsample_indices.
+    currency(str): The display currency; the USD history is converted at the rate of `rates`.
+    rates(ExchangeRates): The latest exchange rates (required for a currency other than USD).
+
+    Returns:
+    go.Figure: A Plotly figure.
+    """
+    indicators = [key for key in INDICATOR_OPTIONS if key in indicators]
+    needed = [column for key in indicators for column in INDICATOR_OPTIONS[key]]
+    with span('chart.filter'):
+        if index is not None:
+            columns = ['current_price'] + [column for column in needed if column in index.values]
+            daily_prices = index.series(crypto_id, time_period, columns=columns) if crypto_id in index else None
+        else:
+            daily_prices = _daily_prices(df, crypto_id, time_period)
+    if daily_prices is not None and rates is not None:
+        daily_prices = rates.convert(daily_prices, currency, PRICE_COLUMNS)
+
+    if daily_prices is None:
+        fig = go.Figure()
+        fig.add_annotation(
+            text=f" No data found for {crypto_id}",
+            xref="paper", yref="paper",
+            showarrow=False,
+            font=dict(size=20, color="gray")
+        )
+        fig.update_layout(title=f"Price Evolution for {crypto_id.capitalize()}")
+        return fig
+
     daily_prices['date_for_plot'] = daily_prices['date'] # Use 'date' for plotting
 
     if daily_prices.empty or len(daily_prices['date_for_plot'].unique()) <= 1 :
@@ -116,15 +145,38 @@ def plot_price_evolution_with_moving_averages(df: pd.DataFrame, crypto_id: str,
          return fig
 
 
-    # Using rolling mean to calculate the moving averages
-    daily_prices['MA_7J'] = daily_prices['current_price'].rolling(window=7, min_periods=1).mean() # min_periods for short data
-    daily_prices['MA_30J'] = daily_prices['current_price'].rolling(window=30, min_periods=1).mean()
+    # Without precomputed indicators, they are computed on the displayed days
+    if any(column not in daily_prices for column in needed):
+        with span('chart.rolling'):
+            computed = compute_indicators(daily_prices['current_price'])
+            for column in needed:
+                daily_prices[column] = computed[column]
 
+    days = len(daily_prices)
+    # Every trace keeps the same days, so that the unified hover still lines them up
+    with span('chart.downsample'):
+        keep = downsample_indices(daily_prices['date_for_plot'].to_numpy(), daily_prices['current_price'].to_numpy(),
+                                  max_points or points_for_width(), method=downsampling)
+        if len(keep) < days:
+            daily_prices = daily_prices.iloc[keep]
+    Scatter = go.Scattergl if len(daily_prices) > WEBGL_THRESHOLD else go.Scatter
 
-    fig = go.Figure()
+    oscillators = [key for key in indicators if key in OSCILLATORS]
+    rows = 1 + len(oscillators)
+    if rows > 1:
+        fig = make_subplots(rows=rows, cols=1, shared_xaxes=True, vertical_spacing=0.05,
+                            row_heights=[0.6] + [0.4 / len(oscillators)] * len(oscillators))
+    else:
+        fig = go.Figure()
+
+    def add_trace(trace, row=1):
+        if rows > 1:
+            fig.add_trace(trace, row=row, col=1)
+        else:
+            fig.add_trace(trace)
 
     # Curent price trace
-    fig.add_trace(go.Scatter(
+    add_trace(Scatter(
         x=daily_prices['date_for_plot'],
         y=daily_prices['current_price'],
         mode='lines',
@@ -132,31 +184,61 @@ def plot_price_evolution_with_moving_averages(df: pd.DataFrame, crypto_id: str,
         line=dict(color='blue')
     ))
 
-    # adding the moving averages to the plot
-    if len(daily_prices) >= 7: # No MA if less than 7 days
-        fig.add_trace(go.Scatter(
-            x=daily_prices['date_for_plot'],
-            y=daily_prices['MA_7J'],
-            mode='lines',
-            name='7 Days Moving Average',
-            line=dict(color='orange', dash='dot')
-        ))
+    if 'ma' in indicators:
+        # adding the moving averages to the plot
+        if days >= 7: # No MA if less than 7 days
+            add_trace(Scatter(
+                x=daily_prices['date_for_plot'],
+                y=daily_prices['ma_7'],
+                mode='lines',
+                name='7 Days Moving Average',
+                line=dict(color='orange', dash='dot')
+            ))
 
-    # adding the 30 days moving average to the plot
-    if len(daily_prices) >= 30: # No MA if less than 30 days
-        fig.add_trace(go.Scatter(
-            x=daily_prices['date_for_plot'],
-            y=daily_prices['MA_30J'],
-            mode='lines',
-            name='30 Days Moving Average',
-            line=dict(color='red', dash='dash')
+        # adding the 30 days moving average to the plot
+        if days >= 30: # No MA if less than 30 days
+            add_trace(Scatter(
+                x=daily_prices['date_for_plot'],
+                y=daily_prices['ma_30'],
+                mode='lines',
+                name='30 Days Moving Average',
+                line=dict(color='red', dash='dash')
+            ))
+
+    if 'ema' in indicators:
+        for column, label, color in (('ema_12', '12 Days EMA', 'green'), ('ema_26', '26 Days EMA', 'brown')):
+            add_trace(Scatter(
+                x=daily_prices['date_for_plot'], y=daily_prices[column],
+                mode='lines', name=label, line=dict(color=color, width=1)
+            ))
+
+    if 'bollinger' in indicators:
+        add_trace(Scatter(
+            x=daily_prices['date_for_plot'], y=daily_prices['bb_upper'],
+            mode='lines', name='Bollinger Upper', line=dict(color='gray', width=1)
         ))
+        add_trace(Scatter(
+            x=daily_prices['date_for_plot'], y=daily_prices['bb_lower'],
+            mode='lines', name='Bollinger Lower', line=dict(color='gray', width=1),
+            fill='tonexty', fillcolor='rgba(128, 128, 128, 0.1)'
+        ))
+
+    for row, key in enumerate(oscillators, start=2):
+        label, color = OSCILLATORS[key]
+        column = INDICATOR_OPTIONS[key][0]
+        add_trace(Scatter(
+            x=daily_prices['date_for_plot'], y=daily_prices[column],
+            mode='lines', name=label, line=dict(color=color)
+        ), row=row)
+        fig.update_yaxes(title_text=label, row=row, col=1)
+        if key == 'rsi':
+            fig.update_yaxes(range=[0, 100], row=row, col=1)
 
     # Adding the layout and formatting
     fig.update_layout(
         title=f"Price Evolution for {crypto_id.capitalize()} ({time_period})",
         xaxis_title="Date",
-        yaxis_title="Price (USD)",
+        yaxis_title=f"Price ({currency.upper()})",
         hovermode="x unified",
         template="plotly_white",
         legend=dict(
@@ -170,3 +252,148 @@ def plot_price_evolution_with_moving_averages(df: pd.DataFrame, crypto_id: str,
     
     return fig
 
+
+
+@instrumented('chart.candlestick')
+def plot_candlestick(index: CoinIndex, crypto_id: str, time_period: str = 'All', resolution=None, currency=BASE_CURRENCY, rates=None):
+    """
+    Generates a candlestick chart of a cryptocurrency with its volume below, from the
+    pre-aggregated bars of the index: daily bars for short periods, weekly or monthly
+    bars for the long ones, so a chart always has a few dozen candles.
+
+    Args:
+    index(CoinIndex): Per-coin index of the historical data.
+    crypto_id(str): The ID of the cryptocurrency to display (e.g., 'bitcoin').
+    time_period(str): The time period to filter on ('7d', '1m', '1y', 'All').
+    resolution(str): 'D', 'W' or 'M' to force the bar resolution (default: matched to the period).
+    currency(str): The display currency; the USD bars are converted at the rate of `rates`.
+    rates(ExchangeRates): The latest exchange rates (required for a currency other than USD).
+
+    Returns:
+    go.Figure: A Plotly figure.
+    """
+    resolution, bars = index.bars(crypto_id, time_period, resolution) if crypto_id in index else (None, None)
+    if bars is None or len(bars) <= 1:
+        fig = go.Figure()
+        fig.add_annotation(
+            text=f"No data found for {crypto_id}.",
+            xref="paper", yref="paper", showarrow=False, font=dict(size=16, color="gray")
+        )
+        fig.update_layout(title=f"Price Evolution for {crypto_id.capitalize()} ({time_period})")
+        return fig
+    if rates is not None:
+        bars = rates.convert(bars, currency, BAR_COLUMNS)
+
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05, row_heights=[0.75, 0.25])
+    fig.add_trace(go.Candlestick(
+        x=bars['date'],
+        open=bars['open'], high=bars['high'], low=bars['low'], close=bars['close'],
+        name='Price',
+        increasing_line_color='green', decreasing_line_color='red'
+    ), row=1, col=1)
+    fig.add_trace(go.Bar(
+        x=bars['date'], y=bars['volume'],
+        name='Volume', marker_color='rgba(100, 100, 200, 0.5)'
+    ), row=2, col=1)
+    fig.update_yaxes(title_text=f"Price ({currency.upper()})", row=1, col=1)
+    fig.update_yaxes(title_text=f"Volume ({currency.upper()})", row=2, col=1)
+
+    fig.update_layout(
+        title=f"{RESOLUTION_LABELS[resolution]} Candles for {crypto_id.capitalize()} ({time_period})",
+        xaxis_rangeslider_visible=False,
+        hovermode="x unified",
+        template="plotly_white",
+        showlegend=False
+    )
+    return fig
+
+
+def _no_data_figure(title, message):
+    fig = go.Figure()
+    fig.add_annotation(
+        text=message,
+        xref="paper", yref="paper", showarrow=False, font=dict(size=16, color="gray")
+    )
+    fig.update_layout(title=title, template="plotly_white")
+    return fig
+
+
+def plot_correlation_heatmap(correlations: pd.DataFrame, names=None, period_label='All'):
+    """
+    Generates a heatmap of the correlations of the daily returns of several cryptocurrencies.
+
+    Args:
+    correlations(pd.DataFrame): coins × coins correlations (MarketMatrix.correlations).
+    names(dict): Display name of each coin ID (default: the IDs).
+    period_label(str): The period the correlations were computed on, for the title.
+
+    Returns:
+    go.Figure: A Plotly figure.
+    """
+    title = f"Correlation of Daily Returns ({period_label})"
+    if correlations.empty:
+        return _no_data_figure(title, "Not enough history to compute correlations.")
+    labels = [(names or {}).get(coin_id, coin_id) for coin_id in correlations.index]
+    fig = go.Figure(go.Heatmap(
+        z=correlations.to_numpy(), x=labels, y=labels,
+        zmin=-1, zmax=1, colorscale='RdBu', reversescale=True,
+        hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>"
+    ))
+    fig.update_layout(title=title, template="plotly_white", yaxis_autorange='reversed')
+    return fig
+
+
+def plot_rolling_correlation(rolling: pd.DataFrame, reference_name, window, names=None):
+    """
+    Generates a line chart of the rolling correlation of several cryptocurrencies with a reference one.
+
+    Args:
+    rolling(pd.DataFrame): Indexed by date, one column per coin (MarketMatrix.rolling_correlations).
+    reference_name(str): Display name of the reference coin.
+    window(int): Length of the rolling window, in days.
+    names(dict): Display name of each coin ID (default: the IDs).
+
+    Returns:
+    go.Figure: A Plotly figure.
+    """
+    title = f"{window}-Day Rolling Correlation with {reference_name}"
+    if rolling.empty:
+        return _no_data_figure(title, "Not enough history to compute correlations.")
+    fig = go.Figure()
+    for coin_id in rolling.columns:
+        fig.add_trace(go.Scatter(
+            x=rolling.index, y=rolling[coin_id], mode='lines', name=(names or {}).get(coin_id, coin_id)
+        ))
+    fig.update_layout(
+        title=title, xaxis_title="Date", yaxis_title="Correlation", yaxis_range=[-1, 1],
+        hovermode="x unified", template="plotly_white"
+    )
+    return fig
+
+
+def plot_dominance(dominance: pd.DataFrame, names=None, period_label='All'):
+    """
+    Generates a stacked area chart of the market cap dominance of the largest cryptocurrencies.
+
+    Args:
+    dominance(pd.DataFrame): Indexed by date, shares in percent (MarketMatrix.dominance).
+    names(dict): Display name of each coin ID (default: the IDs).
+    period_label(str): The period shown, for the title.
+
+    Returns:
+    go.Figure: A Plotly figure.
+    """
+    title = f"Market Cap Dominance ({period_label})"
+    if dominance.empty:
+        return _no_data_figure(title, "No market cap history available.")
+    fig = go.Figure()
+    for coin_id in dominance.columns:
+        fig.add_trace(go.Scatter(
+            x=dominance.index, y=dominance[coin_id], mode='lines', stackgroup='dominance',
+            name=(names or {}).get(coin_id, coin_id), hovertemplate="%{y:.2f}%"
+        ))
+    fig.update_layout(
+        title=title, xaxis_title="Date", yaxis_title="Share of the market cap (%)", yaxis_range=[0, 100],
+        hovermode="x unified", template="plotly_white"
+    )
+    return fig
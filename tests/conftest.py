@@ -0,0 +1,43 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.stub_coingecko import StubCoinGecko
+
+
+def _make_history(days=60, seed=0):
+    """Daily history of bitcoin and ethereum (random walks), in the load_historical_data layout."""
+    dates = pd.date_range('2024-01-01', periods=days, freq='D')
+    rng = np.random.default_rng(seed)
+    prices = np.concatenate([30000 * np.exp(np.cumsum(rng.normal(0, 0.02, days))),
+                             2000 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))])
+    return pd.DataFrame({
+        'id': np.repeat(['bitcoin', 'ethereum'], days),
+        'name': np.repeat(['Bitcoin', 'Ethereum'], days),
+        'date': np.tile(dates, 2),
+        'current_price': prices,
+        'market_cap': prices * np.repeat([19.5e6, 120e6], days),
+        'total_volume': rng.uniform(1e7, 2e7, 2 * days),
+    })
+
+
+@pytest.fixture
+def make_history():
+    """Factory of a synthetic history: make_history(days=60, seed=0)."""
+    return _make_history
+
+
+@pytest.fixture
+def stub():
+    """A local CoinGecko server (benchmarks/stub_coingecko.py) without latency."""
+    with StubCoinGecko(coins=1000, latency=0) as server:
+        yield server
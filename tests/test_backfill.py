@@ -0,0 +1,123 @@
+# tests/test_backfill.py
+
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import requests
+
+from src.api.client import CoinGeckoClient
+from src.backfill import PLAN_FILE, backfill
+
+
+class FakeClient:
+    """
+    Answers /market_chart/range with one point a day, 404 for the unknown coins and a
+    connection error for the unreachable ones.
+    """
+
+    def __init__(self, unknown=(), unreachable=()):
+        self.unknown = set(unknown)
+        self.unreachable = set(unreachable)
+        self.requests = []
+
+    def get_json(self, path, params=None):
+        coin_id = path.split('/')[1]
+        self.requests.append(coin_id)
+        if coin_id in self.unreachable:
+            raise requests.exceptions.ConnectionError('Connection refused')
+        if coin_id in self.unknown:
+            response = requests.Response()
+            response.status_code = 404
+            raise requests.exceptions.HTTPError('404 Client Error', response=response)
+        days = range(params['from'] * 1000, params['to'] * 1000, 86400 * 1000)
+        return {
+            'prices': [[ms, 100.0] for ms in days],
+            'market_caps': [[ms, 1e9] for ms in days],
+            'total_volumes': [[ms, 1e6] for ms in days],
+        }
+
+
+def write_snapshot(data_dir, day, coin_ids):
+    records = [{'id': coin_id, 'symbol': coin_id[:3], 'name': coin_id.title(), 'current_price': 1.0}
+               for coin_id in coin_ids]
+    with open(os.path.join(data_dir, f"crypto_data_{day}.json"), 'w', encoding='utf-8') as f:
+        json.dump(records, f)
+
+
+def read_ids(data_dir, day):
+    with open(os.path.join(data_dir, f"crypto_data_{day}.json"), 'r', encoding='utf-8') as f:
+        return [record['id'] for record in json.load(f)]
+
+
+def test_delisted_coin_does_not_fail_the_run(tmp_path):
+    data_dir = str(tmp_path)
+    write_snapshot(data_dir, '2024-01-01', ['bitcoin', 'ethereum', 'delisted'])
+    write_snapshot(data_dir, '2024-01-04', ['bitcoin', 'ethereum', 'delisted'])
+
+    written = backfill(data_dir, end=date(2024, 1, 4), workers=2, client=FakeClient(unknown=['delisted']))
+    assert sorted(os.path.basename(path) for path in written) == [
+        'crypto_data_2024-01-02.json', 'crypto_data_2024-01-03.json'
+    ]
+    assert sorted(read_ids(data_dir, '2024-01-02')) == ['bitcoin', 'ethereum']
+    assert not os.path.exists(os.path.join(data_dir, '.backfill'))
+
+
+def test_interrupted_run_resumes_its_plan(tmp_path):
+    data_dir = str(tmp_path)
+    checkpoint_dir = os.path.join(data_dir, '.backfill')
+    today = datetime.now(timezone.utc).date()
+    write_snapshot(data_dir, f"{today - timedelta(days=4)}", ['bitcoin', 'ethereum'])
+    write_snapshot(data_dir, f"{today - timedelta(days=2)}", ['bitcoin', 'ethereum'])
+
+    # ethereum fails: the run stops with the checkpoint of bitcoin
+    assert backfill(data_dir, workers=1, client=FakeClient(unreachable=['ethereum'])) == []
+    assert sorted(os.listdir(checkpoint_dir)) == ['bitcoin.json', PLAN_FILE]
+
+    # the defaults moved meanwhile (a new latest snapshot with other coins)
+    write_snapshot(data_dir, f"{today}", ['solana'])
+    client = FakeClient()
+    written = backfill(data_dir, workers=1, client=client)
+    assert client.requests == ['ethereum']
+    assert len(written) == 2
+    assert sorted(read_ids(data_dir, f"{today - timedelta(days=3)}")) == ['bitcoin', 'ethereum']
+    assert not os.path.exists(checkpoint_dir)
+
+
+def test_new_arguments_keep_the_checkpoints_that_still_apply(tmp_path):
+    data_dir = str(tmp_path)
+    write_snapshot(data_dir, '2024-01-01', ['bitcoin', 'ethereum'])
+    write_snapshot(data_dir, '2024-01-05', ['bitcoin', 'ethereum'])
+
+    backfill(data_dir, end=date(2024, 1, 5), workers=1, client=FakeClient(unreachable=['ethereum']))
+    # fewer days: the checkpoint of bitcoin covers them
+    client = FakeClient()
+    written = backfill(data_dir, start=date(2024, 1, 3), end=date(2024, 1, 5), workers=1, client=client)
+    assert client.requests == ['ethereum']
+    assert [os.path.basename(path) for path in written] == ['crypto_data_2024-01-03.json', 'crypto_data_2024-01-04.json']
+    assert not os.path.exists(os.path.join(data_dir, 'crypto_data_2024-01-02.json'))
+
+
+def test_killed_run_resumes_against_the_api(tmp_path, stub):
+    data_dir = str(tmp_path)
+    checkpoint_dir = os.path.join(data_dir, '.backfill')
+    coin_ids = ['bitcoin', 'ethereum', 'coin-3', 'delisted']
+    write_snapshot(data_dir, '2024-03-01', coin_ids)
+    write_snapshot(data_dir, '2024-03-04', coin_ids)
+
+    # coin-3 is unavailable: the run stops, the other coins are checkpointed (delisted with no days)
+    market_chart = stub.handlers['/api/v3/coins/']
+    stub.handlers['/api/v3/coins/'] = lambda path, query: (
+        (503, {'error': 'unavailable'}) if '/coin-3/' in path else market_chart(path, query)
+    )
+    client = CoinGeckoClient(base_url=stub.base_url, backoff=0.01, max_retries=1)
+    assert backfill(data_dir, end=date(2024, 3, 4), workers=2, client=client) == []
+    assert sorted(os.listdir(checkpoint_dir)) == ['bitcoin.json', 'delisted.json', 'ethereum.json', PLAN_FILE]
+
+    stub.handlers['/api/v3/coins/'] = market_chart
+    requests_before = stub.stats['requests']
+    written = backfill(data_dir, end=date(2024, 3, 4), workers=2, client=client)
+    assert stub.stats['requests'] - requests_before == 1  # only coin-3
+    assert [os.path.basename(path) for path in written] == ['crypto_data_2024-03-02.json', 'crypto_data_2024-03-03.json']
+    assert read_ids(data_dir, '2024-03-02') == ['bitcoin', 'ethereum', 'coin-3']  # by market cap
+    assert not os.path.exists(checkpoint_dir)
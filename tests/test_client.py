@@ -0,0 +1,61 @@
+# tests/test_client.py
+
+import pytest
+import requests
+
+from benchmarks.stub_coingecko import StubCoinGecko
+from src.api.client import CoinGeckoClient
+
+
+def make_client(monkeypatch, failing_pages=(), last_page=None):
+    def get_json(path, params=None):
+        page, per_page = params['page'], params['per_page']
+        if page in failing_pages:
+            raise requests.exceptions.ConnectionError('Connection refused')
+        if last_page is not None and page > last_page:
+            return []
+        return [{'id': f"coin-{(page - 1) * per_page + i}"} for i in range(per_page)]
+
+    client = CoinGeckoClient(max_workers=4)
+    monkeypatch.setattr(client, 'get_json', get_json)
+    return client
+
+
+def test_markets_over_several_pages(monkeypatch):
+    records = make_client(monkeypatch).get_markets(limit=10, offset=5, per_page=4)
+    assert [record['id'] for record in records] == [f"coin-{i}" for i in range(5, 15)]
+
+
+def test_failed_middle_page_returns_none(monkeypatch):
+    assert make_client(monkeypatch, failing_pages=[2]).get_markets(limit=12, per_page=4) is None
+
+
+def test_page_after_the_end_of_the_list_is_not_needed(monkeypatch):
+    client = make_client(monkeypatch, failing_pages=[3], last_page=1)
+    assert len(client.get_markets(limit=12, per_page=4)) == 4
+
+
+def test_server_errors_are_retried(stub):
+    stub.error_rate = 0.3  # 503 answers
+    client = CoinGeckoClient(base_url=stub.base_url, backoff=0.01, max_retries=8)
+    records = client.get_markets(limit=1000, per_page=250)
+    assert [record['market_cap_rank'] for record in records] == list(range(1, 1001))
+    assert stub.stats['errors'] > 0
+
+
+def test_rate_limited_requests_honour_retry_after():
+    # the client sends more than the server allows: the 429 answers are waited out
+    with StubCoinGecko(coins=1000, rate_per_minute=120, burst=2, latency=0) as stub:
+        client = CoinGeckoClient(base_url=stub.base_url, rate_per_minute=6000, burst=10, backoff=0.01)
+        records = client.get_markets(limit=1000, per_page=250)
+        assert [record['market_cap_rank'] for record in records] == list(range(1, 1001))
+        assert stub.stats['rate_limited'] > 0
+        assert stub.stats['requests'] == 4 + stub.stats['rate_limited']
+
+
+def test_unknown_coin_is_not_retried(stub):
+    client = CoinGeckoClient(base_url=stub.base_url, backoff=0.01)
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        client.get_json('coins/delisted/market_chart/range', {'vs_currency': 'usd', 'from': 0, 'to': 86400})
+    assert error.value.response.status_code == 404
+    assert stub.stats['requests'] == 1
@@ -0,0 +1,50 @@
+# tests/test_history_store.py
+
+import multiprocessing
+import os
+
+import numpy as np
+
+from benchmarks.generate_archive import generate_archive
+from src.utils.history_loader import IncrementalHistoryLoader
+from src.utils.history_store import read_history_store
+
+WORKERS = 4
+
+
+def load_like_a_worker(data_dir, barrier, results):
+    # what the first history load of every Streamlit worker process does on the same archive
+    from src.utils.coin_index import CoinIndex
+    from src.utils.indicators import IndicatorEngine
+    try:
+        barrier.wait()
+        loader = IncrementalHistoryLoader(data_dir=data_dir, shared=True)
+        df = loader.refresh(force=True)
+        engine = IndicatorEngine(path=os.path.join(data_dir, 'store', 'indicators.npz'))
+        engine.sync(CoinIndex(df, version=loader.version))
+        engine.save()
+        results.put(('ok', len(df)))
+    except Exception as e:
+        results.put(('error', repr(e)))
+
+
+def test_worker_processes_sync_the_same_store_at_once(tmp_path):
+    context = multiprocessing.get_context('spawn')
+    for trial in range(2):
+        data_dir = str(tmp_path / f"trial_{trial}")
+        generate_archive(data_dir, days=95, coins=40, seed=trial)
+        barrier, results = context.Barrier(WORKERS), context.Queue()
+        processes = [context.Process(target=load_like_a_worker, args=(data_dir, barrier, results))
+                     for _ in range(WORKERS)]
+        for process in processes:
+            process.start()
+        outcomes = [results.get(timeout=120) for _ in processes]
+        for process in processes:
+            process.join(timeout=30)
+
+        assert outcomes == [('ok', 95 * 40)] * WORKERS
+        store_dir = os.path.join(data_dir, 'store')
+        assert len(read_history_store(store_dir)) == 95 * 40
+        assert not [f for f in os.listdir(store_dir) if '.tmp' in f]
+        with np.load(os.path.join(store_dir, 'indicators.npz')) as npz:
+            assert npz['counts'].sum() == 95 * 40
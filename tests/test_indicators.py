@@ -0,0 +1,37 @@
+# tests/test_indicators.py
+
+import numpy as np
+
+from src.utils.coin_index import CoinIndex
+from src.utils.indicators import IndicatorEngine, compute_indicators
+
+
+def assert_matches_full_computation(index, coin_id):
+    start, stop = index.range(coin_id)
+    expected = compute_indicators(index.values['current_price'][start:stop])
+    for column in ('ma_30', 'ema_26', 'rsi_14', 'volatility_30'):
+        np.testing.assert_allclose(index.values[column][start:stop], expected[column], rtol=1e-9, equal_nan=True)
+
+
+def test_corrected_older_day_recomputes_the_coin(tmp_path, make_history):
+    df = make_history()
+    engine = IndicatorEngine(path=str(tmp_path / 'indicators.npz'))
+    assert engine.sync(CoinIndex(df, version=1)) == 2
+
+    # a corrected snapshot of an older day (not the last one) of bitcoin
+    edited = df.copy()
+    edited.loc[5, 'current_price'] *= 1.5
+    index = CoinIndex(edited, version=2)
+    assert engine.sync(index) == 1
+    assert_matches_full_computation(index, 'bitcoin')
+    assert_matches_full_computation(index, 'ethereum')
+
+
+def test_new_days_are_added_incrementally(tmp_path, make_history):
+    df = make_history(days=61)
+    engine = IndicatorEngine(path=str(tmp_path / 'indicators.npz'))
+    engine.sync(CoinIndex(df[df['date'] < df['date'].max()], version=1))
+
+    index = CoinIndex(df, version=2)
+    assert engine.sync(index) == 0
+    assert_matches_full_computation(index, 'bitcoin')
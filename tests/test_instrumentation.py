@@ -0,0 +1,21 @@
+# tests/test_instrumentation.py
+
+import json
+from urllib.request import urlopen
+
+from src.utils.instrumentation import Instrumentation, start_metrics_server
+
+
+def test_metrics_server_listens_on_localhost_by_default():
+    registry = Instrumentation()
+    registry.enable()
+    registry.record('api.get_markets', 0.2)
+    server = start_metrics_server(0, registry=registry)
+    try:
+        host, port = server.server_address[:2]
+        assert host == '127.0.0.1'
+        with urlopen(f"http://127.0.0.1:{port}/metrics.json", timeout=5) as response:
+            assert 'api.get_markets' in json.dumps(json.load(response))
+    finally:
+        server.shutdown()
+        server.server_close()
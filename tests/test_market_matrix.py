@@ -0,0 +1,43 @@
+# tests/test_market_matrix.py
+
+import numpy as np
+
+from src.utils.coin_index import CoinIndex
+from src.utils.market_matrix import MATRIX_FIELDS, MarketMatrix
+
+
+def assert_matches_a_fresh_build(market_matrix, index):
+    rebuilt = MarketMatrix()
+    rebuilt.sync(index)
+    assert market_matrix.ids == rebuilt.ids
+    for name in MATRIX_FIELDS:
+        assert np.array_equal(market_matrix.matrix(name), rebuilt.matrix(name), equal_nan=True), name
+
+
+def test_new_day_extends_the_matrices(make_history):
+    df = make_history(days=41)
+    market_matrix = MarketMatrix()
+    market_matrix.sync(CoinIndex(df[df['date'] < df['date'].max()], version=1))
+
+    index = CoinIndex(df, version=2)
+    assert market_matrix.sync(index) == 'extended'
+    assert_matches_a_fresh_build(market_matrix, index)
+
+
+def test_corrected_older_day_rebuilds_the_matrices(make_history):
+    df = make_history(days=41)
+    market_matrix = MarketMatrix()
+    market_matrix.sync(CoinIndex(df[df['date'] < df['date'].max()], version=1))
+
+    # a new day, and a corrected snapshot of an older day
+    edited = df.copy()
+    edited.loc[5, 'current_price'] *= 1.5
+    index = CoinIndex(edited, version=2)
+    assert market_matrix.sync(index) == 'rebuilt'
+    assert_matches_a_fresh_build(market_matrix, index)
+
+    # a corrected market cap alone is detected too
+    edited.loc[6, 'market_cap'] *= 2
+    index = CoinIndex(edited, version=3)
+    assert market_matrix.sync(index) == 'rebuilt'
+    assert_matches_a_fresh_build(market_matrix, index)
@@ -0,0 +1,53 @@
+# tests/test_poller.py
+
+import threading
+import time
+
+import pandas as pd
+
+import src.api.poller as poller_module
+from src.api.poller import MarketPoller
+from src.utils.fx import ExchangeRates
+
+
+def test_slow_exchange_rates_do_not_delay_the_markets(monkeypatch):
+    monkeypatch.setattr(poller_module, 'RATES_WAIT', 0.05)
+    rates_released = threading.Event()
+    rates = ExchangeRates({'usd': 1.0, 'eur': 0.9})
+
+    def fetch_rates():
+        rates_released.wait(10)  # e.g. retries after 429 answers
+        return rates
+
+    markets = pd.DataFrame({'id': ['bitcoin'], 'current_price': [100000.0]})
+    poller = MarketPoller(fetch=lambda: markets, fetch_rates=fetch_rates)
+    poll = threading.Thread(target=poller.poll_once)
+    poll.start()
+
+    deadline = time.monotonic() + 5
+    while poller.snapshot() is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    first = poller.snapshot()
+    assert first is not None and poll.is_alive()
+    assert first.rates.currencies == ['usd']
+
+    rates_released.set()
+    poll.join(10)
+    latest = poller.snapshot()
+    assert latest.rates is rates
+    assert latest.version == first.version + 1
+    assert latest.data is first.data and latest.fetched_at == first.fetched_at
+
+
+def test_rates_fetched_with_the_markets_are_published_with_them():
+    rates = ExchangeRates({'usd': 1.0, 'eur': 0.9})
+    markets = pd.DataFrame({'id': ['bitcoin'], 'current_price': [100000.0]})
+    poller = MarketPoller(fetch=lambda: markets, fetch_rates=lambda: rates)
+    assert poller.poll_once()
+    assert poller.snapshot().rates is rates and poller.snapshot().version == 1
+
+
+def test_poll_interval_grows_with_the_pages():
+    assert poller_module.poll_interval(100) == 60
+    assert poller_module.poll_interval(250) == 60
+    assert poller_module.poll_interval(1000) == 240
@@ -0,0 +1,43 @@
+# tests/test_resources.py
+
+from streamlit.testing.v1 import AppTest
+
+import src.resources as resources
+
+
+class FakeLoader:
+    version = 1
+
+    def refresh(self):
+        return 'historical frame'
+
+
+class FakeIndex:
+    version = 1
+
+
+def history_page():
+    from src.resources import load_history
+    history = load_history()
+    if history is not None:
+        import streamlit as st
+        st.write(history[1])
+
+
+def test_failed_first_load_is_retried_by_the_next_run(monkeypatch):
+    def failing_load():
+        raise OSError('disk unavailable')
+
+    resources.get_history_task.clear()
+    monkeypatch.setattr(resources, '_first_history_load', failing_load)
+    try:
+        app = AppTest.from_function(history_page).run()
+        assert not app.exception
+        assert 'disk unavailable' in app.error[0].value
+
+        monkeypatch.setattr(resources, '_first_history_load', lambda: (FakeLoader(), None, FakeIndex()))
+        app.run()
+        assert not app.exception and not app.error
+        assert app.markdown[0].value == 'historical frame'
+    finally:
+        resources.get_history_task.clear()